@@ -1,5 +1,8 @@
 """The Smartbox integration."""
+import asyncio
 import logging
+import time
+from typing import Any, Dict, List
 
 import voluptuous as vol
 
@@ -14,21 +17,42 @@ from .const import (
     CONF_ACCOUNTS,
     CONF_API_NAME,
     CONF_BASIC_AUTH_CREDS,
+    CONF_COMMAND_DEBOUNCE,
     CONF_DEVICE_IDS,
+    CONF_DEVICE_INIT_CONCURRENCY,
+    CONF_DEVICE_INIT_TIMEOUT,
+    CONF_NODE_FETCH_CONCURRENCY,
     CONF_PASSWORD,
-    CONF_SESSION_RETRY_ATTEMPTS,
+    CONF_PENDING_WRITE_TIMEOUT,
     CONF_SESSION_BACKOFF_FACTOR,
-    CONF_SOCKET_RECONNECT_ATTEMPTS,
+    CONF_SESSION_RETRY_ATTEMPTS,
     CONF_SOCKET_BACKOFF_FACTOR,
+    CONF_SOCKET_RECONNECT_ATTEMPTS,
+    CONF_UPDATE_COALESCE_WINDOW,
     CONF_USERNAME,
-    DEFAULT_SESSION_RETRY_ATTEMPTS,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_DEVICE_INIT_CONCURRENCY,
+    DEFAULT_DEVICE_INIT_TIMEOUT,
+    DEFAULT_NODE_FETCH_CONCURRENCY,
+    DEFAULT_PENDING_WRITE_TIMEOUT,
     DEFAULT_SESSION_BACKOFF_FACTOR,
-    DEFAULT_SOCKET_RECONNECT_ATTEMPTS,
+    DEFAULT_SESSION_RETRY_ATTEMPTS,
     DEFAULT_SOCKET_BACKOFF_FACTOR,
+    DEFAULT_SOCKET_RECONNECT_ATTEMPTS,
+    DEFAULT_UPDATE_COALESCE_WINDOW,
+    MAX_CONCURRENT_COMMANDS,
+    SMARTBOX_COMMAND_LIMIT,
     SMARTBOX_DEVICES,
+    SMARTBOX_DISCOVERY_CACHE,
+    SMARTBOX_NODE_INDEX,
     SMARTBOX_NODES,
 )
-from .model import get_devices, is_supported_node
+from .cache import DiscoveryCache
+from .command_queue import CommandLimit
+from .model import get_devices, is_supported_node, SmartboxDevice
+from .node_index import NodeIndex
+from .services import async_setup_services
+from .settings import SmartboxSettings
 
 __version__ = "2.0.0-beta.2"
 
@@ -55,6 +79,24 @@ ACCOUNT_SCHEMA = vol.Schema(
         vol.Required(
             CONF_SOCKET_BACKOFF_FACTOR, default=DEFAULT_SOCKET_BACKOFF_FACTOR
         ): cv.small_float,
+        vol.Required(
+            CONF_NODE_FETCH_CONCURRENCY, default=DEFAULT_NODE_FETCH_CONCURRENCY
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(
+            CONF_DEVICE_INIT_CONCURRENCY, default=DEFAULT_DEVICE_INIT_CONCURRENCY
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(
+            CONF_DEVICE_INIT_TIMEOUT, default=DEFAULT_DEVICE_INIT_TIMEOUT
+        ): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Required(
+            CONF_UPDATE_COALESCE_WINDOW, default=DEFAULT_UPDATE_COALESCE_WINDOW
+        ): cv.positive_float,
+        vol.Required(
+            CONF_COMMAND_DEBOUNCE, default=DEFAULT_COMMAND_DEBOUNCE
+        ): cv.positive_float,
+        vol.Required(
+            CONF_PENDING_WRITE_TIMEOUT, default=DEFAULT_PENDING_WRITE_TIMEOUT
+        ): cv.positive_float,
     }
 )
 
@@ -87,32 +129,28 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     basic_auth_creds = config[DOMAIN][CONF_BASIC_AUTH_CREDS]
     _LOGGER.debug(f"basic_auth_creds: {basic_auth_creds}")
 
+    hass.data[DOMAIN][SMARTBOX_COMMAND_LIMIT] = CommandLimit(MAX_CONCURRENT_COMMANDS)
     hass.data[DOMAIN][SMARTBOX_DEVICES] = []
     hass.data[DOMAIN][SMARTBOX_NODES] = []
-
-    for account in accounts_cfg:
-        devices = await get_devices(
-            hass,
-            account[CONF_API_NAME],
-            basic_auth_creds,
-            account[CONF_USERNAME],
-            account[CONF_PASSWORD],
-            account[CONF_SESSION_RETRY_ATTEMPTS],
-            account[CONF_SESSION_BACKOFF_FACTOR],
-            account[CONF_SOCKET_RECONNECT_ATTEMPTS],
-            account[CONF_SOCKET_BACKOFF_FACTOR],
+    hass.data[DOMAIN][SMARTBOX_NODE_INDEX] = NodeIndex()
+
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE] = cache
+
+    # Set up accounts concurrently, so startup is bounded by the slowest
+    # account rather than the sum of all of them
+    account_devices = await asyncio.gather(
+        *(
+            _async_setup_account(hass, account, basic_auth_creds, cache)
+            for account in accounts_cfg
         )
+    )
 
-        found_dev_ids = frozenset(dev.dev_id for dev in devices)
-        for dev_id in found_dev_ids.difference(account[CONF_DEVICE_IDS]):
-            _LOGGER.warning(
-                f"Found device {dev_id} which was not configured - ignoring"
-            )
-
+    for account, devices in zip(accounts_cfg, account_devices):
         for device in devices:
-            if device.dev_id in account[CONF_DEVICE_IDS]:
-                _LOGGER.info(f"Setting up configured device {device.dev_id}")
-                hass.data[DOMAIN][SMARTBOX_DEVICES].append(device)
+            _LOGGER.info(f"Setting up configured device {device.dev_id}")
+            hass.data[DOMAIN][SMARTBOX_DEVICES].append(device)
 
         setup_dev_ids = frozenset(
             dev.dev_id for dev in hass.data[DOMAIN][SMARTBOX_DEVICES]
@@ -130,18 +168,57 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
                     "no entities will be created. Please file an issue on GitHub."
                 )
         hass.data[DOMAIN][SMARTBOX_NODES].extend(nodes)
+        hass.data[DOMAIN][SMARTBOX_NODE_INDEX].extend(nodes)
 
     if hass.data[DOMAIN][SMARTBOX_DEVICES]:
         for component in PLATFORMS:
             await hass.helpers.discovery.async_load_platform(
                 component, DOMAIN, {}, config
             )
+        async_setup_services(hass)
 
     _LOGGER.debug("Finished setting up Smartbox integration")
 
     return True
 
 
+async def _async_setup_account(
+    hass: HomeAssistant,
+    account: Dict[str, Any],
+    basic_auth_creds: str,
+    cache: DiscoveryCache,
+) -> List[SmartboxDevice]:
+    """Set up the devices for a single account.
+
+    Errors are logged rather than raised, so that a failing account doesn't
+    prevent other accounts from being set up.
+    """
+    account_name = f"{account[CONF_USERNAME]} ({account[CONF_API_NAME]})"
+    start_time = time.monotonic()
+    try:
+        devices = await get_devices(
+            hass,
+            account[CONF_API_NAME],
+            basic_auth_creds,
+            account[CONF_USERNAME],
+            account[CONF_PASSWORD],
+            account[CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(account),
+            cache,
+        )
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception(
+            f"Error setting up account {account_name} after "
+            f"{time.monotonic() - start_time:.2f}s"
+        )
+        return []
+    _LOGGER.info(
+        f"Set up account {account_name} with {len(devices)} device(s) in "
+        f"{time.monotonic() - start_time:.2f}s"
+    )
+    return devices
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up Smartbox from a config entry."""
     # TODO: implement
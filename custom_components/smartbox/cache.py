@@ -0,0 +1,96 @@
+"""Persistent cache of discovered Smartbox devices and nodes."""
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+from unittest.mock import MagicMock
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .model import SmartboxDevice
+from .types import CachedDeviceDict, CachedNodeDict
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.discovery"
+STORAGE_VERSION = 1
+
+
+DeviceStateVersions = Tuple[str, Tuple[Tuple[str, str, int, int], ...]]
+
+
+def device_state_versions(
+    device: Union[SmartboxDevice, MagicMock]
+) -> DeviceStateVersions:
+    """Names and versions of a device's node state, which change whenever it does"""
+    return (
+        device.name,
+        tuple(
+            (node.node_id, node.name, node.status_version, node.setup_version)
+            for node in device.get_nodes()
+        ),
+    )
+
+
+def device_to_cache(device: Union[SmartboxDevice, MagicMock]) -> CachedDeviceDict:
+    nodes: List[CachedNodeDict] = [
+        {
+            "info": node.node_info,
+            "status": dict(node.status),
+            "setup": dict(node.setup),
+        }
+        for node in device.get_nodes()
+    ]
+    return {"name": device.name, "nodes": nodes}
+
+
+class DiscoveryCache(object):
+    """Device/node topology and last known state, persisted across restarts
+
+    Devices found in the cache can be set up immediately on restart and
+    revalidated against the cloud in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._cached_devices: Dict[str, CachedDeviceDict] = {}
+        self._devices: Dict[str, Union[SmartboxDevice, MagicMock]] = {}
+        self._saved_versions: Dict[str, DeviceStateVersions] = {}
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if data is not None:
+            self._cached_devices = data.get("devices", {})
+        _LOGGER.debug(f"Loaded {len(self._cached_devices)} cached device(s)")
+        # Make sure the last known state is saved on shutdown
+        self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    def get_device(self, dev_id: str) -> Optional[CachedDeviceDict]:
+        return self._cached_devices.get(dev_id, None)
+
+    def track_device(self, device: Union[SmartboxDevice, MagicMock]) -> None:
+        """Include the live state of a device whenever the cache is saved"""
+        self._devices[device.dev_id] = device
+
+    async def async_save(self) -> None:
+        versions = {
+            dev_id: device_state_versions(device)
+            for dev_id, device in self._devices.items()
+        }
+        if versions == self._saved_versions:
+            _LOGGER.debug("Cached devices are unchanged, not saving")
+            return
+        await self._store.async_save(self._data_to_save())
+        self._saved_versions = versions
+
+    async def _async_handle_stop(self, event: Event) -> None:
+        await self.async_save()
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        for dev_id, device in self._devices.items():
+            self._cached_devices[dev_id] = device_to_cache(device)
+        return {"devices": self._cached_devices}
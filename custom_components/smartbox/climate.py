@@ -1,13 +1,5 @@
-from homeassistant.components.climate import (
-    ClimateEntity,
-    ClimateEntityFeature,
-    HVACAction,
-    HVACMode,
-)
-from homeassistant.components.climate.const import (
-    PRESET_AWAY,
-    PRESET_HOME,
-)
+from homeassistant.components.climate import ClimateEntity
+from homeassistant.components.climate.const import PRESET_AWAY
 from homeassistant.const import (
     ATTR_LOCKED,
     ATTR_TEMPERATURE,
@@ -15,31 +7,37 @@ from homeassistant.const import (
 )
 from homeassistant.core import HomeAssistant
 import logging
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Optional, Sequence, Union
 from unittest.mock import MagicMock
 
 from .const import (
     DOMAIN,
-    HEATER_NODE_TYPE_HTR_MOD,
-    SMARTBOX_NODES,
-)
-from .model import (
-    get_hvac_mode,
-    get_preset_mode,
-    get_preset_modes,
-    get_target_temperature,
-    get_temperature_unit,
-    is_heater_node,
-    is_heating,
-    set_hvac_mode_args,
-    set_preset_mode_status_update,
-    set_temperature_args,
-    SmartboxNode,
+    INTEREST_AWAY,
+    INTEREST_STATUS,
+    NODE_ENTITY_STATUS_KEYS,
+    SMARTBOX_NODE_INDEX,
 )
-from .types import StatusDict
+from .model import SmartboxNode
 
 _LOGGER = logging.getLogger(__name__)
 
+# Status keys which affect climate entity state
+_CLIMATE_STATUS_KEYS = NODE_ENTITY_STATUS_KEYS | frozenset(
+    [
+        "active",
+        "charging",
+        "comfort_temp",
+        "eco_offset",
+        "ice_temp",
+        "mode",
+        "mtemp",
+        "on",
+        "selected_temp",
+        "stemp",
+        "units",
+    ]
+)
+
 
 async def async_setup_platform(
     hass: HomeAssistant,
@@ -55,16 +53,16 @@ async def async_setup_platform(
     async_add_entities(
         [
             SmartboxHeater(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if is_heater_node(node)
+            for node in hass.data[DOMAIN][SMARTBOX_NODE_INDEX].heaters
         ],
         True,
     )
     _LOGGER.debug("Finished setting up Smartbox climate platform")
 
 
-def status_to_hvac_action(node_type: str, status: StatusDict) -> str:
-    return HVACAction.HEATING if is_heating(node_type, status) else HVACAction.IDLE
+def get_climate_unique_id(node: Union[MagicMock, SmartboxNode]) -> str:
+    """Unique ID of a heater node's climate entity"""
+    return f"{node.node_id}_climate"
 
 
 class SmartboxHeater(ClimateEntity):
@@ -73,17 +71,13 @@ class SmartboxHeater(ClimateEntity):
     def __init__(self, node: Union[MagicMock, SmartboxNode]) -> None:
         """Initialize the sensor."""
         self._node = node
-        self._status: Dict[str, Any] = {}
-        self._available = False  # unavailable until we get an update
-        self._supported_features = (
-            ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
-        )
+        self._unique_id = get_climate_unique_id(node)
         _LOGGER.debug(f"Created node {self.name} unique_id={self.unique_id}")
 
     @property
     def unique_id(self) -> str:
         """Return Unique ID string."""
-        return f"{self._node.node_id}_climate"
+        return self._unique_id
 
     @property
     def name(self) -> str:
@@ -93,106 +87,105 @@ class SmartboxHeater(ClimateEntity):
     @property
     def supported_features(self) -> int:
         """Return the list of supported features."""
-        return self._supported_features
+        return self._node.capabilities.climate_features
 
     @property
     def should_poll(self) -> bool:
         """Return the polling state."""
-        return True
+        # Node updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._node.subscribe(
+                INTEREST_STATUS, self._node_updated, _CLIMATE_STATUS_KEYS
+            )
+        )
+        # Presets depend on the device away status too
+        self.async_on_remove(self._node.subscribe(INTEREST_AWAY, self._node_updated))
+
+    def _node_updated(self) -> None:
+        self.schedule_update_ha_state()
 
     @property
     def temperature_unit(self) -> str:
         """Return the unit of measurement."""
-        unit = get_temperature_unit(self._status)
+        unit = self._node.snapshot.units
         if unit is not None:
-            return unit
+            return unit.ha_unit
         else:
             return (
                 TEMP_CELSIUS  # climate sensors need a temperature unit on construction
             )
 
     @property
-    def current_temperature(self) -> float:
+    def current_temperature(self) -> Optional[float]:
         """Return the current temperature."""
-        return float(self._status["mtemp"])
+        return self._node.snapshot.mtemp
 
     @property
-    def target_temperature(self) -> float:
+    def target_temperature(self) -> Optional[float]:
         """Return the target temperature."""
-        return get_target_temperature(self._node.node_type, self._status)
+        return self._node.climate_state.target_temperature
 
-    def set_temperature(self, **kwargs):
+    async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp is not None:
-            status_args = set_temperature_args(self._node.node_type, self._status, temp)
-            self._node.set_status(**status_args)
+            status_args = self._node.strategy.set_temperature_args(
+                self._node.status, temp
+            )
+            await self._node.async_set_status(self.hass, **status_args)
 
     @property
-    def hvac_action(self) -> str:
+    def hvac_action(self) -> Optional[str]:
         """Return current operation ie. heat or idle."""
-        action = status_to_hvac_action(self._node.node_type, self._status)
-        return action
+        return self._node.climate_state.hvac_action
 
     @property
-    def hvac_mode(self) -> str:
+    def hvac_mode(self) -> Optional[str]:
         """Return hvac target hvac state."""
-        hvac_mode = get_hvac_mode(self._node.node_type, self._status)
-        return hvac_mode
+        return self._node.climate_state.hvac_mode
 
     @property
-    def hvac_modes(self) -> List[str]:
+    def hvac_modes(self) -> Sequence[str]:
         """Return the list of available operation modes."""
-        hvac_modes = [HVACMode.HEAT, HVACMode.AUTO, HVACMode.OFF]
-        return hvac_modes
+        return self._node.capabilities.hvac_modes
 
-    def set_hvac_mode(self, hvac_mode):
+    async def async_set_hvac_mode(self, hvac_mode: str) -> None:
         """Set operation mode."""
         _LOGGER.debug(f"Setting HVAC mode to {hvac_mode}")
-        status_args = set_hvac_mode_args(self._node.node_type, self._status, hvac_mode)
-        self._node.set_status(**status_args)
+        status_args = self._node.strategy.set_hvac_mode_args(
+            self._node.status, hvac_mode
+        )
+        await self._node.async_set_status(self.hass, **status_args)
 
     @property
-    def preset_mode(self) -> str:
-        return get_preset_mode(self._node.node_type, self._status, self._node.away)
+    def preset_mode(self) -> Optional[str]:
+        return self._node.climate_state.preset_mode
 
     @property
-    def preset_modes(self) -> List[str]:
-        return get_preset_modes(self._node.node_type)
-
-    def set_preset_mode(self, preset_mode: str) -> None:
-        if preset_mode == PRESET_AWAY:
-            self._node.update_device_away_status(True)
-            return
-        if self._node.away:
-            self._node.update_device_away_status(False)
-        if self._node.node_type == HEATER_NODE_TYPE_HTR_MOD:
-            status_update = set_preset_mode_status_update(
-                self._node.node_type, self._status, preset_mode
-            )
-            self._node.set_status(**status_update)
-        elif preset_mode != PRESET_HOME:
-            raise ValueError(
-                f"Unsupported preset_mode {preset_mode} for {self._node.node_type} node"
-            )
+    def preset_modes(self) -> Sequence[str]:
+        return self._node.capabilities.preset_modes
+
+    async def async_set_preset_mode(self, preset_mode: str) -> None:
+        status_update = self._node.strategy.set_preset_mode_status_update(
+            self._node.status, preset_mode
+        )
+        away = preset_mode == PRESET_AWAY
+        if away != self._node.away:
+            await self._node.async_update_device_away_status(self.hass, away)
+        if status_update:
+            await self._node.async_set_status(self.hass, **status_update)
 
     @property
-    def extra_state_attributes(self) -> Dict[str, bool]:
+    def extra_state_attributes(self) -> Dict[str, Optional[bool]]:
         """Return the state attributes of the device."""
         return {
-            ATTR_LOCKED: self._status["locked"],
+            ATTR_LOCKED: self._node.snapshot.locked,
         }
 
     @property
     def available(self) -> bool:
         """Return True if roller and hub is available."""
-        return self._available
-
-    async def async_update(self) -> None:
-        new_status = await self._node.async_update(self.hass)
-        if new_status["sync_status"] == "ok":
-            # update our status
-            self._status = new_status
-            self._available = True
-        else:
-            self._available = False
+        return self._node.snapshot.available
@@ -0,0 +1,235 @@
+"""Per-device queue of commands sent to the Smartbox API."""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from homeassistant.core import HomeAssistant
+
+from .const import COMMAND_PRIORITIES, DOMAIN, SMARTBOX_COMMAND_LIMIT
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class _Command:
+    key: Hashable
+    func: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: asyncio.Future
+
+
+@dataclass(frozen=True, slots=True)
+class CommandQueueMetrics:
+    """Point in time metrics for a command queue"""
+
+    depth: int
+    depth_by_priority: Dict[int, int]
+    max_depth: int
+    in_flight: int
+    completed: int
+    failed: int
+
+
+class CommandLimit(object):
+    """Limit on the commands running at once across many command queues
+
+    When the limit is reached, queues wait for a free slot, which goes to
+    the waiting queue with the highest priority command (lowest number),
+    and then to the queue which has waited longest.
+    """
+
+    __slots__ = ("_max_concurrent", "_in_use", "_waiting")
+
+    def __init__(self, max_concurrent: int) -> None:
+        self._max_concurrent = max_concurrent
+        self._in_use = 0
+        # Used as an ordered set, in the order queues started waiting
+        self._waiting: Dict["CommandQueue", None] = {}
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def try_acquire(self, queue: "CommandQueue") -> bool:
+        """Take a slot, or add the queue to those waiting for one"""
+        if self._in_use < self._max_concurrent:
+            self._in_use += 1
+            return True
+        self._waiting[queue] = None
+        return False
+
+    def release(self, hass: HomeAssistant) -> None:
+        """Free a slot, and hand free slots to the waiting queues"""
+        self._in_use -= 1
+        while self._in_use < self._max_concurrent and self._waiting:
+            ready: Dict[CommandQueue, int] = {}
+            for waiting in self._waiting:
+                priority = waiting.next_priority()
+                if priority is not None:
+                    ready[waiting] = priority
+            # min keeps the first of equal priority queues, which has waited
+            # longest
+            queue = min(ready, key=ready.__getitem__, default=None)
+            if queue is None:
+                self._waiting = {}
+                return
+            del ready[queue]
+            self._waiting = dict.fromkeys(ready)
+            queue._dispatch(hass)
+
+
+class CommandQueue(object):
+    """Blocking session commands for a device, run in the executor
+
+    At most max_concurrent commands run at once, so that many commands
+    (e.g. from an automation touching every heater) don't all hit the cloud
+    at the same time. Once the integration is set up, commands also take a
+    slot from its CommandLimit, shared with every other device's queue, so
+    that between them they can't tie up the shared executor. Queued commands
+    run in priority order (lowest first), and in the order they were queued
+    within a priority. Commands with the same ordering key never run
+    concurrently, so commands for a node are applied in the order they were
+    sent.
+    """
+
+    __slots__ = (
+        "_name",
+        "_max_concurrent",
+        "_queues",
+        "_busy_keys",
+        "_in_flight",
+        "_max_depth",
+        "_completed",
+        "_failed",
+    )
+
+    def __init__(self, name: str, max_concurrent: int) -> None:
+        self._name = name
+        self._max_concurrent = max_concurrent
+        self._queues: Dict[int, Deque[_Command]] = {
+            priority: deque() for priority in COMMAND_PRIORITIES
+        }
+        self._busy_keys: Set[Hashable] = set()
+        self._in_flight = 0
+        self._max_depth = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def run(
+        self,
+        hass: HomeAssistant,
+        priority: int,
+        key: Hashable,
+        func: Callable[..., T],
+        *args: Any,
+    ) -> T:
+        """Queue a command and wait for its result"""
+        command = _Command(key, func, args, hass.loop.create_future())
+        self._queues[priority].append(command)
+        depth = self.depth
+        if depth > self._max_depth:
+            self._max_depth = depth
+        self._dispatch(hass)
+        if not command.future.done():
+            _LOGGER.debug(
+                f"Queued command for {self._name} (depth {self.depth}, "
+                f"in flight {self._in_flight})"
+            )
+        return await command.future
+
+    def next_priority(self) -> Optional[int]:
+        """Priority of the next command which could run, if any"""
+        if self._in_flight >= self._max_concurrent:
+            return None
+        for priority in COMMAND_PRIORITIES:
+            if any(
+                command.key not in self._busy_keys for command in self._queues[priority]
+            ):
+                return priority
+        return None
+
+    def _dispatch(self, hass: HomeAssistant) -> None:
+        limit: Optional[CommandLimit] = hass.data.get(DOMAIN, {}).get(
+            SMARTBOX_COMMAND_LIMIT
+        )
+        for priority in COMMAND_PRIORITIES:
+            queue = self._queues[priority]
+            for command in list(queue):
+                if self._in_flight >= self._max_concurrent:
+                    return
+                if command.key in self._busy_keys:
+                    continue
+                if limit is not None and not limit.try_acquire(self):
+                    return
+                queue.remove(command)
+                self._start(hass, command, limit)
+
+    def _start(
+        self, hass: HomeAssistant, command: _Command, limit: Optional[CommandLimit]
+    ) -> None:
+        self._in_flight += 1
+        self._busy_keys.add(command.key)
+        hass.async_create_task(self._async_run(hass, command, limit))
+
+    async def _async_run(
+        self, hass: HomeAssistant, command: _Command, limit: Optional[CommandLimit]
+    ) -> None:
+        try:
+            result = await hass.async_add_executor_job(command.func, *command.args)
+        except asyncio.CancelledError:
+            self._failed += 1
+            command.future.cancel()
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            self._failed += 1
+            if not command.future.done():
+                command.future.set_exception(e)
+        else:
+            self._completed += 1
+            if not command.future.done():
+                command.future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            self._busy_keys.discard(command.key)
+            # Waiting queues get the freed slot in priority order, before
+            # this queue's next command
+            if limit is not None:
+                limit.release(hass)
+            self._dispatch(hass)
+
+    @property
+    def depth(self) -> int:
+        """Number of commands waiting to run"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of commands running"""
+        return self._in_flight
+
+    @property
+    def metrics(self) -> CommandQueueMetrics:
+        return CommandQueueMetrics(
+            depth=self.depth,
+            depth_by_priority={
+                priority: len(queue) for priority, queue in self._queues.items()
+            },
+            max_depth=self._max_depth,
+            in_flight=self._in_flight,
+            completed=self._completed,
+            failed=self._failed,
+        )
@@ -14,11 +14,36 @@ CONF_SESSION_RETRY_ATTEMPTS = "session_retry_attempts"
 CONF_SESSION_BACKOFF_FACTOR = "session_backoff_factor"
 CONF_SOCKET_RECONNECT_ATTEMPTS = "socket_reconnect_attempts"
 CONF_SOCKET_BACKOFF_FACTOR = "socket_backoff_factor"
+CONF_NODE_FETCH_CONCURRENCY = "node_fetch_concurrency"
+CONF_DEVICE_INIT_CONCURRENCY = "device_init_concurrency"
+CONF_DEVICE_INIT_TIMEOUT = "device_init_timeout"
+CONF_UPDATE_COALESCE_WINDOW = "update_coalesce_window"
+CONF_COMMAND_DEBOUNCE = "command_debounce"
+CONF_PENDING_WRITE_TIMEOUT = "pending_write_timeout"
 
 DEFAULT_SESSION_RETRY_ATTEMPTS = 8
 DEFAULT_SESSION_BACKOFF_FACTOR = 0.1
 DEFAULT_SOCKET_RECONNECT_ATTEMPTS = 3
 DEFAULT_SOCKET_BACKOFF_FACTOR = 0.1
+DEFAULT_NODE_FETCH_CONCURRENCY = 4
+DEFAULT_DEVICE_INIT_CONCURRENCY = 4
+DEFAULT_DEVICE_INIT_TIMEOUT = 60.0
+DEFAULT_UPDATE_COALESCE_WINDOW = 0.1
+DEFAULT_COMMAND_DEBOUNCE = 0.5
+DEFAULT_PENDING_WRITE_TIMEOUT = 10.0
+
+# Maximum number of commands sent to the API concurrently for each device,
+# so that one busy device doesn't hold up commands for the others
+MAX_CONCURRENT_DEVICE_COMMANDS = 2
+# Maximum number of commands sent to the API concurrently across all devices,
+# so that bursts of commands don't starve Home Assistant's shared executor
+MAX_CONCURRENT_COMMANDS = 4
+
+# Command priorities, lowest first. Device wide commands (away status and
+# power limit) go ahead of commands for individual nodes.
+COMMAND_PRIORITY_DEVICE = 0
+COMMAND_PRIORITY_NODE = 1
+COMMAND_PRIORITIES = (COMMAND_PRIORITY_DEVICE, COMMAND_PRIORITY_NODE)
 
 GITHUB_ISSUES_URL = "https://github.com/graham33/hass-smartbox/issues"
 
@@ -31,12 +56,38 @@ HEATER_NODE_TYPES = [
     HEATER_NODE_TYPE_HTR_MOD,
 ]
 
+# Interests which entities can subscribe to for updates
+INTEREST_AWAY = "away"
+INTEREST_POWER_LIMIT = "power_limit"
+INTEREST_SETUP = "setup"
+INTEREST_STATUS = "status"
+
+# Status keys that every node entity depends on (availability and the locked
+# attribute)
+NODE_ENTITY_STATUS_KEYS = frozenset(["locked", "sync_status"])
+
+# Per-node sensor and switch capabilities
+SENSOR_CHARGE_LEVEL = "charge_level"
+SENSOR_DUTY_CYCLE = "duty_cycle"
+SENSOR_ENERGY = "energy"
+SENSOR_POWER = "power"
+SENSOR_TEMPERATURE = "temperature"
+SWITCH_TRUE_RADIANT = "true_radiant"
+SWITCH_WINDOW_MODE = "window_mode"
+
 MIN_TIME_BETWEEN_UPDATES = timedelta(minutes=1)
 
 PRESET_FROST = "frost"
 PRESET_SCHEDULE = "schedule"
 PRESET_SELF_LEARN = "self_learn"
 
+SERVICE_BULK_SET = "bulk_set"
+ATTR_DEVICE_IDS = "device_ids"
+EVENT_BULK_SET_RESULT = "smartbox_bulk_set_result"
+
+SMARTBOX_COMMAND_LIMIT = "smartbox_command_limit"
 SMARTBOX_DEVICES = "smartbox_devices"
+SMARTBOX_DISCOVERY_CACHE = "smartbox_discovery_cache"
+SMARTBOX_NODE_INDEX = "smartbox_node_index"
 SMARTBOX_NODES = "smartbox_nodes"
 SMARTBOX_SESSIONS = "smartbox_sessions"
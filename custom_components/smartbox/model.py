@@ -1,78 +1,396 @@
 import asyncio
 import logging
+import sys
+import time
+from types import MappingProxyType
 
-from homeassistant.const import (
-    TEMP_CELSIUS,
-    TEMP_FAHRENHEIT,
-)
-from homeassistant.components.climate.const import (
-    HVAC_MODE_AUTO,
-    HVAC_MODE_HEAT,
-    HVAC_MODE_OFF,
-    PRESET_ACTIVITY,
-    PRESET_AWAY,
-    PRESET_COMFORT,
-    PRESET_ECO,
-    PRESET_HOME,
-)
 from homeassistant.core import HomeAssistant
 from smartbox import Session, UpdateManager
-from typing import Any, cast, Dict, List, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    cast,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+    TypeVar,
+    Union,
+)
 from unittest.mock import MagicMock
 
+from .command_queue import CommandQueue
 from .const import (
-    GITHUB_ISSUES_URL,
-    HEATER_NODE_TYPE_ACM,
-    HEATER_NODE_TYPE_HTR_MOD,
-    HEATER_NODE_TYPES,
-    PRESET_FROST,
-    PRESET_SCHEDULE,
-    PRESET_SELF_LEARN,
+    COMMAND_PRIORITY_DEVICE,
+    COMMAND_PRIORITY_NODE,
+    INTEREST_AWAY,
+    INTEREST_POWER_LIMIT,
+    INTEREST_SETUP,
+    INTEREST_STATUS,
+    MAX_CONCURRENT_DEVICE_COMMANDS,
 )
-from .types import FactoryOptionsDict, SetupDict, StatusDict
+from .node_types import get_node_type_strategy, NodeCapabilities, NodeTypeStrategy
+from .settings import SmartboxSettings
+from .status import ClimateState, NodeStatus
+from .types import (
+    CachedDeviceDict,
+    CachedNodeDict,
+    NodeInfoDict,
+    SetupDict,
+    StatusDict,
+)
+
+if TYPE_CHECKING:
+    from .cache import DiscoveryCache
 
 _LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class VersionedState(object):
+    """Immutable node state, replaced whenever a partial update changes it"""
+
+    __slots__ = ("_data", "_version", "_changed_at")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data: Mapping[str, Any] = MappingProxyType(dict(data))
+        self._version = 0
+        now = time.monotonic()
+        self._changed_at: Dict[str, float] = {key: now for key in self._data}
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        return self._data
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def changed_at(self) -> Mapping[str, float]:
+        """Monotonic time at which each key last changed"""
+        return MappingProxyType(self._changed_at)
+
+    def merge(self, delta: Mapping[str, Any]) -> FrozenSet[str]:
+        """Merge a partial update, returning the keys which changed"""
+        changed = frozenset(
+            key
+            for key, value in delta.items()
+            if key not in self._data or self._data[key] != value
+        )
+        if changed:
+            now = time.monotonic()
+            # Copy on write: unchanged values are shared with the old state
+            data = dict(self._data)
+            for key in changed:
+                data[key] = delta[key]
+                self._changed_at[key] = now
+            self._data = MappingProxyType(data)
+            self._version += 1
+        return changed
+
+
+def _reported_value_matches(reported: Any, written: Any) -> bool:
+    if reported == written:
+        return True
+    # Temperatures are written as strings, which the cloud may format
+    # differently when it reports them back
+    try:
+        return float(reported) == float(written)
+    except (TypeError, ValueError):
+        return False
+
+
+class PendingWrites(object):
+    """Optimistic status writes awaiting confirmation from the cloud"""
+
+    __slots__ = ("_writes", "_reported", "_timers", "_next_write_id")
+
+    def __init__(self) -> None:
+        # Pending written value by key, and the ID of the write it came from
+        self._writes: Dict[str, Tuple[int, Any]] = {}
+        # Last reported value of each key with a pending write
+        self._reported: Dict[str, Any] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._next_write_id = 0
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def add(self, status_args: Dict[str, Any], status: Mapping[str, Any]) -> int:
+        """Track a write of status_args over the current status"""
+        write_id = self._next_write_id
+        self._next_write_id += 1
+        superseded_write_ids = set()
+        for key, value in status_args.items():
+            if key in self._writes:
+                superseded_write_ids.add(self._writes[key][0])
+            else:
+                self._reported[key] = status.get(key, _MISSING)
+            self._writes[key] = (write_id, value)
+        for superseded_write_id in superseded_write_ids:
+            self._discard_if_done(superseded_write_id)
+        return write_id
+
+    def start_timeout(
+        self,
+        status_args: Mapping[str, Any],
+        timeout: float,
+        on_timeout: Callable[[int], None],
+    ) -> None:
+        """Start timing out the writes of status_args, once they've been sent"""
+        loop = asyncio.get_running_loop()
+        for key, (write_id, value) in self._writes.items():
+            if (
+                key in status_args
+                and status_args[key] == value
+                and write_id not in self._timers
+            ):
+                self._timers[write_id] = loop.call_later(timeout, on_timeout, write_id)
+
+    def reconcile(self, status: StatusDict) -> Dict[str, Any]:
+        """Filter a status update from the cloud against pending writes"""
+        if not self._writes:
+            return status
+        reconciled = {}
+        confirmed_write_ids = set()
+        for key, value in status.items():
+            pending = self._writes.get(key, None)
+            if pending is None:
+                reconciled[key] = value
+            elif _reported_value_matches(value, pending[1]):
+                del self._writes[key]
+                del self._reported[key]
+                confirmed_write_ids.add(pending[0])
+                reconciled[key] = value
+            else:
+                self._reported[key] = value
+        for write_id in confirmed_write_ids:
+            self._discard_if_done(write_id)
+        return reconciled
+
+    def rollback(
+        self, write_id: Optional[int] = None, status_args: Optional[Mapping] = None
+    ) -> Dict[str, Any]:
+        """Stop tracking a write, returning the reported values to restore"""
+        restore = {}
+        for key, (key_write_id, value) in list(self._writes.items()):
+            if (write_id is not None and key_write_id == write_id) or (
+                status_args is not None
+                and key in status_args
+                and status_args[key] == value
+            ):
+                del self._writes[key]
+                reported = self._reported.pop(key)
+                if reported is not _MISSING:
+                    restore[key] = reported
+                self._discard_if_done(key_write_id)
+        if write_id is not None:
+            self._discard_if_done(write_id)
+        return restore
+
+    def _discard_if_done(self, write_id: int) -> None:
+        if write_id not in self._timers:
+            return
+        if all(key_write_id != write_id for key_write_id, _ in self._writes.values()):
+            self._timers.pop(write_id).cancel()
+
+
+class SetupBatch(object):
+    """Setup writes for a node which will be sent as a single command"""
+
+    __slots__ = ("setup_args", "previous", "writes")
+
+    def __init__(self) -> None:
+        self.setup_args: Dict[str, Any] = {}
+        # Values to restore if the command fails
+        self.previous: Dict[str, Any] = {}
+        self.writes = 0
+
+    def add(self, setup_args: Dict[str, Any], setup: Mapping[str, Any]) -> None:
+        for key in setup_args:
+            if key not in self.setup_args and key in setup:
+                self.previous[key] = setup[key]
+        self.setup_args.update(setup_args)
+        self.writes += 1
+
+
+class Subscribers(object):
+    """Callbacks registered against a fixed set of interests"""
+
+    __slots__ = ("_callbacks",)
+
+    def __init__(self, interests: List[str]) -> None:
+        self._callbacks: Dict[
+            str, List[Tuple[Callable[[], None], Optional[FrozenSet[str]]]]
+        ] = {interest: [] for interest in interests}
+
+    def subscribe(
+        self,
+        interest: str,
+        callback: Callable[[], None],
+        keys: Optional[Iterable[str]] = None,
+    ) -> Callable[[], None]:
+        """Subscribe to an interest, returning a function to unsubscribe"""
+        if interest not in self._callbacks:
+            raise ValueError(f"Unknown interest {interest}")
+        callbacks = self._callbacks[interest]
+        entry = (callback, None if keys is None else frozenset(keys))
+        callbacks.append(entry)
+
+        def unsubscribe() -> None:
+            callbacks.remove(entry)
+
+        return unsubscribe
+
+    def notify(self, interest: str, keys: Optional[FrozenSet[str]] = None) -> None:
+        """Notify subscribers, optionally only those interested in keys"""
+        for callback, callback_keys in list(self._callbacks[interest]):
+            if (
+                keys is None
+                or callback_keys is None
+                or not keys.isdisjoint(callback_keys)
+            ):
+                callback()
+
 
 class SmartboxDevice(object):
+    __slots__ = (
+        "_dev_id",
+        "_name",
+        "_session",
+        "_settings",
+        "_away",
+        "_power_limit",
+        "_nodes",
+        "_subscribers",
+        "_pending_node_notifications",
+        "_update_manager",
+        "_command_queue",
+    )
+
     def __init__(
         self,
         dev_id: str,
         name: str,
         session: Union[Session, MagicMock],
-        socket_reconnect_attempts: int,
-        socket_backoff_factor: float,
+        settings: SmartboxSettings,
     ) -> None:
         self._dev_id = dev_id
         self._name = name
         self._session = session
-        self._socket_reconnect_attempts = socket_reconnect_attempts
-        self._socket_backoff_factor = socket_backoff_factor
+        self._settings = settings
         self._away = False
         self._power_limit: int = 0
+        self._nodes: Dict[Tuple[str, int], SmartboxNode] = {}
+        self._subscribers = Subscribers([INTEREST_AWAY, INTEREST_POWER_LIMIT])
+        # Changed keys by interest for nodes with notifications being coalesced
+        self._pending_node_notifications: Dict[
+            Tuple[str, int], Dict[str, FrozenSet[str]]
+        ] = {}
+        self._command_queue = CommandQueue(dev_id, MAX_CONCURRENT_DEVICE_COMMANDS)
+        self._update_manager: Optional[UpdateManager] = None
+
+    def subscribe(
+        self, interest: str, callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Subscribe to away or power limit changes"""
+        return self._subscribers.subscribe(interest, callback)
+
+    def restore_nodes(self, cached_nodes: List[CachedNodeDict]) -> None:
+        """Create nodes from a cached discovery snapshot"""
+        for cached_node in cached_nodes:
+            status = {
+                key: value
+                for key, value in cached_node["status"].items()
+                if key != "sync_status"
+            }
+            node = SmartboxNode(
+                self,
+                cast(NodeInfoDict, cached_node["info"]),
+                self._session,
+                cast(StatusDict, status),
+                cast(SetupDict, cached_node["setup"]),
+            )
+            self._nodes[(node.node_type, node.addr)] = node
 
     async def initialise_nodes(self, hass: HomeAssistant) -> None:
         # Would do in __init__, but needs to be a coroutine
         session_nodes = await hass.async_add_executor_job(
             self._session.get_nodes, self.dev_id
         )
-        self._nodes = {}
-        for node_info in session_nodes:
-            status = await hass.async_add_executor_job(
-                self._session.get_status, self._dev_id, node_info
-            )
-            setup = await hass.async_add_executor_job(
-                self._session.get_setup, self._dev_id, node_info
+
+        # Fetch status and setup for all nodes concurrently, limiting the
+        # number of requests in flight for this device
+        semaphore = asyncio.Semaphore(self._settings.node_fetch_concurrency)
+
+        async def _fetch(func: Callable, node_info: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await hass.async_add_executor_job(func, self._dev_id, node_info)
+
+        statuses, setups = await asyncio.gather(
+            asyncio.gather(
+                *(
+                    _fetch(self._session.get_status, node_info)
+                    for node_info in session_nodes
+                )
+            ),
+            asyncio.gather(
+                *(
+                    _fetch(self._session.get_setup, node_info)
+                    for node_info in session_nodes
+                )
+            ),
+        )
+
+        # Reconcile with any nodes restored from the cache, keeping existing
+        # node objects so that their entities pick up the fresh state
+        nodes = {}
+        for node_info, status, setup in zip(session_nodes, statuses, setups):
+            key = (node_info["type"], node_info["addr"])
+            node = self._nodes.get(key, None)
+            if node is None:
+                if self._nodes:
+                    _LOGGER.warning(
+                        f"Found new node {node_info['type']} {node_info['addr']} "
+                        f"on device {self._dev_id}; restart Home Assistant to "
+                        "create its entities"
+                    )
+                node = SmartboxNode(self, node_info, self._session, status, setup)
+            else:
+                node.update_node_info(node_info)
+                node.update_setup(setup)
+                node.update_status(status)
+            nodes[key] = node
+        for node_type, addr in self._nodes.keys() - nodes.keys():
+            _LOGGER.warning(
+                f"Node {node_type} {addr} no longer exists on device {self._dev_id}"
             )
-            node = SmartboxNode(self, node_info, self._session, status, setup)
-            self._nodes[(node.node_type, node.addr)] = node
+            self._nodes[(node_type, addr)].update_status({"sync_status": "lost"})
+        self._nodes = nodes
+
+        self.start_updates()
+
+    def start_updates(self) -> None:
+        """Start receiving updates over the device's socket"""
+        if self._update_manager is not None:
+            return
 
         _LOGGER.debug(f"Creating SocketSession for device {self._dev_id}")
         self._update_manager = UpdateManager(
             self._session,
             self._dev_id,
-            reconnect_attempts=self._socket_reconnect_attempts,
-            backoff_factor=self._socket_backoff_factor,
+            reconnect_attempts=self._settings.socket_reconnect_attempts,
+            backoff_factor=self._settings.socket_backoff_factor,
         )
 
         self._update_manager.subscribe_to_device_away_status(self._away_status_update)
@@ -85,11 +403,15 @@ class SmartboxDevice(object):
 
     def _away_status_update(self, away_status: Dict[str, bool]) -> None:
         _LOGGER.debug(f"Away status update: {away_status}")
-        self._away = away_status["away"]
+        if away_status["away"] != self._away:
+            self._away = away_status["away"]
+            self._subscribers.notify(INTEREST_AWAY)
 
     def _power_limit_update(self, power_limit: int) -> None:
         _LOGGER.debug(f"power_limit update: {power_limit}")
-        self._power_limit = power_limit
+        if power_limit != self._power_limit:
+            self._power_limit = power_limit
+            self._subscribers.notify(INTEREST_POWER_LIMIT)
 
     def _node_status_update(
         self, node_type: str, addr: int, node_status: StatusDict
@@ -97,7 +419,11 @@ class SmartboxDevice(object):
         _LOGGER.debug(f"Node status update: {node_status}")
         node = self._nodes.get((node_type, addr), None)
         if node is not None:
-            node.update_status(node_status)
+            self._coalesce_node_notification(
+                node,
+                INTEREST_STATUS,
+                node.update_status(node_status, notify=self._coalescing_disabled),
+            )
         else:
             _LOGGER.error(f"Received status update for unknown node {node_type} {addr}")
 
@@ -107,10 +433,43 @@ class SmartboxDevice(object):
         _LOGGER.debug(f"Node setup update: {node_setup}")
         node = self._nodes.get((node_type, addr), None)
         if node is not None:
-            node.update_setup(node_setup)
+            self._coalesce_node_notification(
+                node,
+                INTEREST_SETUP,
+                node.update_setup(node_setup, notify=self._coalescing_disabled),
+            )
         else:
             _LOGGER.error(f"Received setup update for unknown node {node_type} {addr}")
 
+    @property
+    def _coalescing_disabled(self) -> bool:
+        return self._settings.update_coalesce_window <= 0
+
+    def _coalesce_node_notification(
+        self, node: "SmartboxNode", interest: str, changed: FrozenSet[str]
+    ) -> None:
+        """Delay notifying a node's subscribers of changes from the socket"""
+        if self._coalescing_disabled or not changed:
+            return
+        key = (node.node_type, node.addr)
+        pending = self._pending_node_notifications.get(key, None)
+        if pending is None:
+            pending = self._pending_node_notifications[key] = {}
+            asyncio.get_running_loop().call_later(
+                self._settings.update_coalesce_window,
+                self._flush_node_notifications,
+                key,
+            )
+        pending[interest] = pending.get(interest, frozenset()) | changed
+
+    def _flush_node_notifications(self, key: Tuple[str, int]) -> None:
+        pending = self._pending_node_notifications.pop(key)
+        node = self._nodes.get(key, None)
+        if node is None:
+            return
+        for interest, changed in pending.items():
+            node.notify_subscribers(interest, changed)
+
     @property
     def dev_id(self) -> str:
         return self._dev_id
@@ -122,24 +481,140 @@ class SmartboxDevice(object):
     def name(self) -> str:
         return self._name
 
+    def update_name(self, name: str) -> None:
+        """Refresh the device's name from discovery"""
+        if name != self._name:
+            _LOGGER.info(f"Device {self._dev_id} renamed from {self._name} to {name}")
+            self._name = name
+
     @property
     def away(self) -> bool:
         return self._away
 
-    def set_away_status(self, away: bool):
-        self._session.set_device_away_status(self.dev_id, {"away": away})
-        self._away = away
+    async def async_set_away_status(self, hass: HomeAssistant, away: bool) -> None:
+        """Set the away status without waiting for the API"""
+        previous = self._away
+        self._set_away(away)
+        hass.async_create_task(self._async_send_away_status(hass, away, previous))
+
+    async def async_send_away_status(self, hass: HomeAssistant, away: bool) -> None:
+        """Set the away status, waiting for the API to accept the command"""
+        previous = self._away
+        self._set_away(away)
+        await self._async_command_away_status(hass, away, previous)
+
+    def _set_away(self, away: bool) -> None:
+        if away != self._away:
+            self._away = away
+            self._subscribers.notify(INTEREST_AWAY)
+
+    async def _async_send_away_status(
+        self, hass: HomeAssistant, away: bool, previous: bool
+    ) -> None:
+        try:
+            await self._async_command_away_status(hass, away, previous)
+        except Exception:  # pylint: disable=broad-except
+            # Already logged and reverted
+            pass
+
+    async def _async_command_away_status(
+        self, hass: HomeAssistant, away: bool, previous: bool
+    ) -> None:
+        try:
+            await self.async_run_command(
+                hass,
+                COMMAND_PRIORITY_DEVICE,
+                INTEREST_AWAY,
+                self._session.set_device_away_status,
+                self._dev_id,
+                {"away": away},
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(f"Error setting away status for device {self._dev_id}")
+            self._set_away(previous)
+            raise
+
+    async def async_run_command(
+        self,
+        hass: HomeAssistant,
+        priority: int,
+        key: Hashable,
+        func: Callable[..., T],
+        *args: Any,
+    ) -> T:
+        """Run a blocking session command in the executor"""
+        return await self._command_queue.run(hass, priority, key, func, *args)
+
+    @property
+    def command_queue(self) -> CommandQueue:
+        return self._command_queue
+
+    @property
+    def command_debounce(self) -> float:
+        """Seconds to wait for further commands to a node before sending"""
+        return self._settings.command_debounce
+
+    @property
+    def pending_write_timeout(self) -> float:
+        """Seconds to wait for the cloud to confirm a status write"""
+        return self._settings.pending_write_timeout
+
+    @property
+    def setup_calls_saved(self) -> int:
+        """Number of set_setup calls saved by batching node setup writes"""
+        return sum(node.setup_calls_saved for node in self._nodes.values())
 
     @property
     def power_limit(self) -> int:
         return self._power_limit
 
-    def set_power_limit(self, power_limit: int) -> None:
-        self._session.set_device_power_limit(self.dev_id, power_limit)
-        self._power_limit = power_limit
+    async def async_set_power_limit(
+        self, hass: HomeAssistant, power_limit: int
+    ) -> None:
+        """Set the power limit without waiting for the API"""
+        if power_limit != self._power_limit:
+            self._power_limit = power_limit
+            self._subscribers.notify(INTEREST_POWER_LIMIT)
+        hass.async_create_task(self._async_send_power_limit(hass, power_limit))
+
+    async def _async_send_power_limit(
+        self, hass: HomeAssistant, power_limit: int
+    ) -> None:
+        try:
+            await self.async_run_command(
+                hass,
+                COMMAND_PRIORITY_DEVICE,
+                INTEREST_POWER_LIMIT,
+                self._session.set_device_power_limit,
+                self._dev_id,
+                power_limit,
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(f"Error setting power limit for device {self._dev_id}")
 
 
 class SmartboxNode(object):
+    __slots__ = (
+        "_device",
+        "_node_info",
+        "_node_type",
+        "_node_id",
+        "_session",
+        "_strategy",
+        "_status",
+        "_snapshot",
+        "_climate_state",
+        "_climate_state_key",
+        "_setup",
+        "_capabilities",
+        "_subscribers",
+        "_pending_command",
+        "_command_timer",
+        "_pending_writes",
+        "_setup_batch",
+        "_setup_calls_saved",
+    )
+
     def __init__(
         self,
         device: Union[SmartboxDevice, MagicMock],
@@ -150,374 +625,560 @@ class SmartboxNode(object):
     ) -> None:
         self._device = device
         self._node_info = node_info
+        # Node types are shared by many nodes, so intern them
+        self._node_type = sys.intern(node_info["type"])
+        # TODO: are addrs only unique among node types, or for the whole device?
+        self._node_id = f"{device.dev_id}-{node_info['addr']}"
         self._session = session
-        self._status = status
-        self._setup = setup
+        self._strategy = get_node_type_strategy(self._node_type)
+        self._status = VersionedState(status)
+        self._snapshot = self._strategy.decode_status(self._status.data)
+        self._climate_state: Optional[ClimateState] = None
+        self._climate_state_key: Optional[Tuple[int, bool]] = None
+        self._setup = VersionedState(setup)
+        self._capabilities = self._strategy.capabilities(self._setup.data)
+        self._subscribers = Subscribers([INTEREST_STATUS, INTEREST_SETUP])
+        # Status args waiting for the command debounce, and the timer which
+        # sends them
+        self._pending_command: Optional[Dict[str, Any]] = None
+        self._command_timer: Optional[asyncio.TimerHandle] = None
+        self._pending_writes = PendingWrites()
+        # Setup writes waiting to be sent together
+        self._setup_batch: Optional[SetupBatch] = None
+        self._setup_calls_saved = 0
+
+    def subscribe(
+        self,
+        interest: str,
+        callback: Callable[[], None],
+        keys: Optional[Iterable[str]] = None,
+    ) -> Callable[[], None]:
+        """Subscribe to status, setup or away changes for this node"""
+        if interest == INTEREST_AWAY:
+            # Away status is per device
+            return self._device.subscribe(interest, callback)
+        return self._subscribers.subscribe(interest, callback, keys)
 
     @property
     def node_id(self) -> str:
-        # TODO: are addrs only unique among node types, or for the whole device?
-        return f"{self._device.dev_id}-{self._node_info['addr']}"
+        return self._node_id
 
     @property
     def name(self) -> str:
         return self._node_info["name"]
 
+    @property
+    def node_info(self) -> NodeInfoDict:
+        return self._node_info
+
+    def update_node_info(self, node_info: Dict[str, Any]) -> None:
+        """Refresh the node's info (such as its name) from discovery"""
+        if node_info["name"] != self.name:
+            _LOGGER.info(f"Node {self.name} renamed to {node_info['name']}")
+        self._node_info = node_info
+
     @property
     def node_type(self) -> str:
         """Return node type, e.g. 'htr' for heaters"""
-        return self._node_info["type"]
+        return self._node_type
 
     @property
     def addr(self) -> int:
         return self._node_info["addr"]
 
     @property
-    def status(self) -> StatusDict:
-        return self._status
+    def device(self) -> Union[SmartboxDevice, MagicMock]:
+        return self._device
 
-    def update_status(self, status: StatusDict) -> None:
+    @property
+    def _command_key(self) -> Tuple[str, int]:
+        # Commands for a node are sent in order
+        return (self._node_type, self.addr)
+
+    @property
+    def strategy(self) -> NodeTypeStrategy:
+        """Node type specific behaviour for this node"""
+        return self._strategy
+
+    @property
+    def status(self) -> Mapping[str, Any]:
+        """Current status, which is replaced rather than mutated on change"""
+        return self._status.data
+
+    @property
+    def status_version(self) -> int:
+        """Version of the status, which increases whenever it changes"""
+        return self._status.version
+
+    @property
+    def status_changed_at(self) -> Mapping[str, float]:
+        """Monotonic time at which each status key last changed"""
+        return self._status.changed_at
+
+    @property
+    def snapshot(self) -> NodeStatus:
+        """Typed status, decoded once per status change"""
+        return self._snapshot
+
+    @property
+    def climate_state(self) -> ClimateState:
+        """Derived climate state, cached per status version and away status"""
+        key = (self._status.version, self.away)
+        if self._climate_state is None or key != self._climate_state_key:
+            self._climate_state = self._strategy.climate_state(
+                self.status, self._snapshot, self.away
+            )
+            self._climate_state_key = key
+        return self._climate_state
+
+    def update_status(self, status: StatusDict, notify: bool = True) -> FrozenSet[str]:
+        """Merge a (possibly partial) status update, returning changed keys"""
+        # If notify is False, the caller notifies with notify_subscribers
         _LOGGER.debug(f"Updating node {self.name} status: {status}")
-        self._status = status
+        return self._merge_status(self._pending_writes.reconcile(status), notify)
+
+    def _merge_status(
+        self, status: Mapping[str, Any], notify: bool = True
+    ) -> FrozenSet[str]:
+        changed = self._status.merge(status)
+        if changed:
+            self._snapshot = self._strategy.decode_status(self._status.data)
+        if changed and notify:
+            self._subscribers.notify(INTEREST_STATUS, changed)
+        return changed
+
+    @property
+    def setup(self) -> Mapping[str, Any]:
+        """Current setup, which is replaced rather than mutated on change"""
+        return self._setup.data
+
+    @property
+    def capabilities(self) -> NodeCapabilities:
+        """What this node supports, refreshed when its factory options change"""
+        return self._capabilities
 
     @property
-    def setup(self) -> SetupDict:
-        return self._setup
+    def setup_version(self) -> int:
+        """Version of the setup, which increases whenever it changes"""
+        return self._setup.version
 
-    def update_setup(self, setup: SetupDict) -> None:
+    def update_setup(self, setup: SetupDict, notify: bool = True) -> FrozenSet[str]:
+        """Merge a (possibly partial) setup update, returning changed keys"""
+        # If notify is False, the caller notifies with notify_subscribers
         _LOGGER.debug(f"Updating node {self.name} setup: {setup}")
-        self._setup = setup
+        changed = self._setup.merge(setup)
+        if "factory_options" in changed:
+            self._capabilities = self._strategy.capabilities(self._setup.data)
+        if changed and notify:
+            self._subscribers.notify(INTEREST_SETUP, changed)
+        return changed
+
+    def notify_subscribers(self, interest: str, keys: FrozenSet[str]) -> None:
+        self._subscribers.notify(interest, keys)
+
+    async def async_set_status(self, hass: HomeAssistant, **status_args) -> None:
+        """Set status optimistically, sending a debounced command in the background"""
+        self._set_optimistic_status(status_args)
+        debounce = self._device.command_debounce
+        if debounce <= 0:
+            hass.async_create_task(self._async_send_status(hass, status_args))
+            return
+        if self._pending_command is None:
+            self._pending_command = {}
+        self._pending_command.update(status_args)
+        if self._command_timer is not None:
+            self._command_timer.cancel()
+        self._command_timer = hass.loop.call_later(debounce, self._flush_command, hass)
+
+    def _flush_command(self, hass: HomeAssistant) -> None:
+        status_args = self._pending_command
+        self._pending_command = None
+        self._command_timer = None
+        if status_args:
+            _LOGGER.debug(
+                f"Sending debounced status for node {self.name}: {status_args}"
+            )
+            hass.async_create_task(self._async_send_status(hass, status_args))
+
+    async def async_send_status(self, hass: HomeAssistant, **status_args) -> None:
+        """Set status, waiting for the API to accept the command"""
+        self._set_optimistic_status(status_args)
+        await self._async_command_status(hass, status_args)
 
-    def set_status(self, **status_args) -> StatusDict:
-        self._session.set_status(self._device.dev_id, self._node_info, status_args)
-        # update our status locally until we get an update
-        self._status |= {**status_args}
-        return self._status
+    def _set_optimistic_status(self, status_args: Dict[str, Any]) -> None:
+        if self._device.pending_write_timeout > 0:
+            self._pending_writes.add(status_args, self.status)
+        self._merge_status(status_args)
+
+    async def _async_send_status(
+        self, hass: HomeAssistant, status_args: Dict[str, Any]
+    ) -> None:
+        try:
+            await self._async_command_status(hass, status_args)
+        except Exception:  # pylint: disable=broad-except
+            # Already logged and rolled back
+            pass
+
+    async def _async_command_status(
+        self, hass: HomeAssistant, status_args: Dict[str, Any]
+    ) -> None:
+        try:
+            await self._device.async_run_command(
+                hass,
+                COMMAND_PRIORITY_NODE,
+                self._command_key,
+                self._session.set_status,
+                self._device.dev_id,
+                self._node_info,
+                status_args,
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(f"Error setting status for node {self.name}")
+            self._merge_status(self._pending_writes.rollback(status_args=status_args))
+            # Replace the optimistic status with the actual one
+            try:
+                status = await self._device.async_run_command(
+                    hass,
+                    COMMAND_PRIORITY_NODE,
+                    self._command_key,
+                    self._session.get_status,
+                    self._device.dev_id,
+                    self._node_info,
+                )
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception(f"Error getting status for node {self.name}")
+            else:
+                self.update_status(status)
+            raise
+        else:
+            # Time out the write from when it was sent, rather than when it
+            # was made, so time spent debouncing or queued doesn't count
+            timeout = self._device.pending_write_timeout
+            if timeout > 0:
+                self._pending_writes.start_timeout(
+                    status_args, timeout, self._pending_write_timed_out
+                )
+
+    def _pending_write_timed_out(self, write_id: int) -> None:
+        restore = self._pending_writes.rollback(write_id=write_id)
+        if restore:
+            _LOGGER.warning(
+                f"Status for node {self.name} was not confirmed within "
+                f"{self._device.pending_write_timeout}s; reverting {restore}"
+            )
+            self._merge_status(restore)
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of status keys with writes awaiting confirmation"""
+        return len(self._pending_writes)
 
     @property
     def away(self):
         return self._device.away
 
-    def update_device_away_status(self, away: bool):
-        self._device.set_away_status(away)
-
-    async def async_update(self, hass: HomeAssistant) -> StatusDict:
-        return self.status
+    async def async_update_device_away_status(
+        self, hass: HomeAssistant, away: bool
+    ) -> None:
+        await self._device.async_set_away_status(hass, away)
 
     @property
     def window_mode(self) -> bool:
-        if "window_mode_enabled" not in self._setup:
+        if "window_mode_enabled" not in self.setup:
             raise KeyError(
                 "window_mode_enabled not present in setup for node {self.name}"
             )
-        return self._setup["window_mode_enabled"]
+        return self.setup["window_mode_enabled"]
 
-    def set_window_mode(self, window_mode: bool):
-        self._session.set_setup(
-            self._device.dev_id, self._node_info, {"window_mode_enabled": window_mode}
-        )
-        self._setup["window_mode_enabled"] = window_mode
+    async def async_set_window_mode(
+        self, hass: HomeAssistant, window_mode: bool
+    ) -> None:
+        await self.async_set_setup(hass, window_mode_enabled=window_mode)
 
     @property
     def true_radiant(self) -> bool:
-        if "true_radiant_enabled" not in self._setup:
+        if "true_radiant_enabled" not in self.setup:
             raise KeyError(
                 "true_radiant_enabled not present in setup for node {self.name}"
             )
-        return self._setup["true_radiant_enabled"]
+        return self.setup["true_radiant_enabled"]
 
-    def set_true_radiant(self, true_radiant: bool):
-        self._session.set_setup(
-            self._device.dev_id, self._node_info, {"true_radiant_enabled": true_radiant}
+    async def async_set_true_radiant(
+        self, hass: HomeAssistant, true_radiant: bool
+    ) -> None:
+        await self.async_set_setup(hass, true_radiant_enabled=true_radiant)
+
+    async def async_set_setup(self, hass: HomeAssistant, **setup_args) -> None:
+        """Set setup optimistically, batching the commands sent in the background"""
+        batch = self._setup_batch
+        if batch is None:
+            batch = self._setup_batch = SetupBatch()
+            debounce = self._device.command_debounce
+            if debounce > 0:
+                hass.loop.call_later(debounce, self._flush_setup_batch, hass)
+        batch.add(setup_args, self.setup)
+        self.update_setup(setup_args)
+        if self._device.command_debounce <= 0:
+            self._flush_setup_batch(hass)
+
+    def _flush_setup_batch(self, hass: HomeAssistant) -> None:
+        batch = self._setup_batch
+        self._setup_batch = None
+        if batch is None:
+            return
+        if batch.writes > 1:
+            self._setup_calls_saved += batch.writes - 1
+            _LOGGER.debug(
+                f"Batched {batch.writes} setup writes for node {self.name} "
+                f"({self._setup_calls_saved} calls saved in total)"
+            )
+        hass.async_create_task(
+            self._async_send_setup(hass, batch.setup_args, batch.previous)
         )
-        self._setup["true_radiant_enabled"] = true_radiant
+
+    @property
+    def setup_calls_saved(self) -> int:
+        """Number of set_setup calls saved by batching setup writes"""
+        return self._setup_calls_saved
+
+    async def _async_send_setup(
+        self,
+        hass: HomeAssistant,
+        setup_args: Dict[str, Any],
+        previous: Dict[str, Any],
+    ) -> None:
+        try:
+            await self._device.async_run_command(
+                hass,
+                COMMAND_PRIORITY_NODE,
+                self._command_key,
+                self._session.set_setup,
+                self._device.dev_id,
+                self._node_info,
+                setup_args,
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(f"Error setting setup for node {self.name}")
+            self.update_setup(previous)
 
 
 def is_heater_node(node: Union[SmartboxNode, MagicMock]) -> bool:
-    return node.node_type in HEATER_NODE_TYPES
+    return node.capabilities.heater
 
 
 def is_supported_node(node: Union[SmartboxNode, MagicMock]) -> bool:
     return is_heater_node(node)
 
 
-def get_temperature_unit(status):
-    if "units" not in status:
-        return None
-    unit = status["units"]
-    if unit == "C":
-        return TEMP_CELSIUS
-    elif unit == "F":
-        return TEMP_FAHRENHEIT
-    else:
-        raise ValueError(f"Unknown temp unit {unit}")
-
-
 async def get_devices(
     hass: HomeAssistant,
     api_name: str,
     basic_auth_creds: str,
     username: str,
     password: str,
-    session_retry_attempts: int,
-    session_backoff_factor: float,
-    socket_reconnect_attempts: int,
-    socket_backoff_factor: float,
+    device_ids: List[str],
+    settings: SmartboxSettings,
+    cache: Optional["DiscoveryCache"],
 ) -> List[SmartboxDevice]:
-    _LOGGER.info(
-        f"Creating Smartbox session for {api_name}"
-        f"(session_retry_attempts={session_retry_attempts}"
-        f", session_backoff_factor={session_backoff_factor}"
-        f", socket_reconnect_attempts={socket_reconnect_attempts}"
-        f", socket_backoff_factor={session_backoff_factor})"
-    )
+    _LOGGER.info(f"Creating Smartbox session for {api_name} ({settings})")
     session = await hass.async_add_executor_job(
         Session,
         api_name,
         basic_auth_creds,
         username,
         password,
-        session_retry_attempts,
-        session_backoff_factor,
-    )
-    session_devices = await hass.async_add_executor_job(session.get_devices)
-    # TODO: gather?
-    devices = [
-        await create_smartbox_device(
-            hass,
-            session_device["dev_id"],
-            session_device["name"],
-            session,
-            socket_reconnect_attempts,
-            socket_backoff_factor,
-        )
-        for session_device in session_devices
-    ]
-    return devices
-
-
-async def create_smartbox_device(
-    hass: HomeAssistant,
-    dev_id: str,
-    name: str,
-    session: Union[Session, MagicMock],
-    socket_reconnect_attempts: int,
-    socket_backoff_factor: float,
-) -> Union[SmartboxDevice, MagicMock]:
-    """Factory function for SmartboxDevices"""
-    device = SmartboxDevice(
-        dev_id, name, session, socket_reconnect_attempts, socket_backoff_factor
+        settings.session_retry_attempts,
+        settings.session_backoff_factor,
     )
-    await device.initialise_nodes(hass)
-    return device
-
-
-def _check_status_key(key: str, node_type: str, status: Dict[str, Any]):
-    if key not in status:
-        raise KeyError(
-            f"'{key}' not found in {node_type} - please report to {GITHUB_ISSUES_URL}. "
-            f"status: {status}"
-        )
-
 
-def get_target_temperature(node_type: str, status: Dict[str, Any]) -> float:
-    if node_type == HEATER_NODE_TYPE_HTR_MOD:
-        _check_status_key("selected_temp", node_type, status)
-        if status["selected_temp"] == "comfort":
-            _check_status_key("comfort_temp", node_type, status)
-            return float(status["comfort_temp"])
-        elif status["selected_temp"] == "eco":
-            _check_status_key("comfort_temp", node_type, status)
-            _check_status_key("eco_offset", node_type, status)
-            return float(status["comfort_temp"]) - float(status["eco_offset"])
-        elif status["selected_temp"] == "ice":
-            _check_status_key("ice_temp", node_type, status)
-            return float(status["ice_temp"])
-        else:
-            raise KeyError(
-                f"'Unexpected 'selected_temp' value {status['selected_temp']}"
-                f" found for {node_type} - please report to"
-                f" {GITHUB_ISSUES_URL}. status: {status}"
-            )
+    cached_devices: Dict[str, CachedDeviceDict] = {}
+    if cache is not None:
+        for dev_id in device_ids:
+            cached_device = cache.get_device(dev_id)
+            if cached_device is not None:
+                cached_devices[dev_id] = cached_device
+
+    discovery_skipped = bool(device_ids) and cached_devices.keys() >= set(device_ids)
+    if discovery_skipped:
+        # All configured devices are cached, so skip device discovery until
+        # the devices are revalidated
+        _LOGGER.info(f"Using cached discovery for devices {device_ids}")
+        configured_session_devices = [
+            {"dev_id": dev_id, "name": cached_devices[dev_id]["name"]}
+            for dev_id in device_ids
+        ]
     else:
-        _check_status_key("stemp", node_type, status)
-        return float(status["stemp"])
-
-
-def set_temperature_args(
-    node_type: str, status: Dict[str, Any], temp: float
-) -> Dict[str, Any]:
-    _check_status_key("units", node_type, status)
-    if node_type == HEATER_NODE_TYPE_HTR_MOD:
-        if status["selected_temp"] == "comfort":
-            target_temp = temp
-        elif status["selected_temp"] == "eco":
-            _check_status_key("eco_offset", node_type, status)
-            target_temp = temp + float(status["eco_offset"])
-        elif status["selected_temp"] == "ice":
-            raise ValueError(
-                "Can't set temperature for htr_mod devices when ice mode is selected"
+        session_devices = await hass.async_add_executor_job(session.get_devices)
+
+        # Only initialise devices that are configured, so that unconfigured
+        # ones don't cost any node requests or socket connections
+        configured_session_devices = []
+        for session_device in session_devices:
+            if session_device["dev_id"] in device_ids:
+                configured_session_devices.append(session_device)
+            else:
+                _LOGGER.warning(
+                    f"Found device {session_device['dev_id']} which was not"
+                    " configured - ignoring"
+                )
+
+    # Initialise devices concurrently, so that a slow or offline device only
+    # holds up its own setup
+    semaphore = asyncio.Semaphore(settings.device_init_concurrency)
+
+    async def _create_device(
+        session_device: Dict[str, Any]
+    ) -> Optional[Union[SmartboxDevice, MagicMock]]:
+        dev_id = session_device["dev_id"]
+        cached_device = cached_devices.get(dev_id, None)
+        if cached_device is not None:
+            _LOGGER.debug(f"Restoring device {dev_id} from cache")
+            return restore_smartbox_device(
+                dev_id,
+                session_device["name"],
+                session,
+                settings,
+                cast(List[CachedNodeDict], cached_device["nodes"]),
             )
-        else:
-            raise KeyError(
-                f"'Unexpected 'selected_temp' value {status['selected_temp']}"
-                f" found for {node_type} - please report to "
-                f"{GITHUB_ISSUES_URL}. status: {status}"
+        async with semaphore:
+            return await _async_init_device(
+                create_smartbox_device(
+                    hass, dev_id, session_device["name"], session, settings
+                ),
+                dev_id,
+                settings.device_init_timeout,
             )
-        return {
-            "on": True,
-            "mode": status["mode"],
-            "selected_temp": status["selected_temp"],
-            "comfort_temp": str(target_temp),
-            "eco_offset": status["eco_offset"],
-            "units": status["units"],
-        }
-    else:
-        return {
-            "stemp": str(temp),
-            "units": status["units"],
-        }
-
-
-def get_hvac_mode(node_type: str, status: Dict[str, Any]) -> str:
-    _check_status_key("mode", node_type, status)
-    if status["mode"] == "off":
-        return HVAC_MODE_OFF
-    elif node_type == HEATER_NODE_TYPE_HTR_MOD and not status["on"]:
-        return HVAC_MODE_OFF
-    elif status["mode"] == "manual":
-        return HVAC_MODE_HEAT
-    elif status["mode"] == "auto":
-        return HVAC_MODE_AUTO
-    elif status["mode"] == "modified_auto":
-        # This occurs when the temperature is modified while in auto mode.
-        # Mapping it to auto seems to make this most sense
-        return HVAC_MODE_AUTO
-    elif status["mode"] == "self_learn":
-        return HVAC_MODE_AUTO
-    elif status["mode"] == "presence":
-        return HVAC_MODE_AUTO
-    else:
-        _LOGGER.error(f"Unknown smartbox node mode {status['mode']}")
-        raise ValueError(f"Unknown smartbox node mode {status['mode']}")
-
-
-def set_hvac_mode_args(
-    node_type: str, status: Dict[str, Any], hvac_mode: str
-) -> Dict[str, Any]:
-    if node_type == HEATER_NODE_TYPE_HTR_MOD:
-        if hvac_mode == HVAC_MODE_OFF:
-            return {"on": False}
-        elif hvac_mode == HVAC_MODE_HEAT:
-            # We need to pass these status keys on when setting the mode
-            required_status_keys = ["selected_temp"]
-            for key in required_status_keys:
-                _check_status_key(key, node_type, status)
-            hvac_mode_args = {k: status[k] for k in required_status_keys}
-            hvac_mode_args["on"] = True
-            hvac_mode_args["mode"] = "manual"
-            return hvac_mode_args
-        elif hvac_mode == HVAC_MODE_AUTO:
-            return {"on": True, "mode": "auto"}
-        else:
-            raise ValueError(f"Unsupported hvac mode {hvac_mode}")
-    else:
-        if hvac_mode == HVAC_MODE_OFF:
-            return {"mode": "off"}
-        elif hvac_mode == HVAC_MODE_HEAT:
-            return {"mode": "manual"}
-        elif hvac_mode == HVAC_MODE_AUTO:
-            return {"mode": "auto"}
-        else:
-            raise ValueError(f"Unsupported hvac mode {hvac_mode}")
 
+    devices = [
+        device
+        for device in await asyncio.gather(
+            *(
+                _create_device(session_device)
+                for session_device in configured_session_devices
+            )
+        )
+        if device is not None
+    ]
 
-def _get_htr_mod_preset_mode(node_type: str, mode: str, selected_temp: str) -> str:
-    if mode == "manual":
-        if selected_temp == "comfort":
-            return PRESET_COMFORT
-        elif selected_temp == "eco":
-            return PRESET_ECO
-        elif selected_temp == "ice":
-            return PRESET_FROST
-        else:
-            raise ValueError(
-                f"'Unexpected 'selected_temp' value {'selected_temp'} found for "
-                f"{node_type} - please report to {GITHUB_ISSUES_URL}."
+    if cache is not None:
+        for device in devices:
+            cache.track_device(device)
+        restored_devices = [
+            device for device in devices if device.dev_id in cached_devices
+        ]
+        if restored_devices:
+            hass.async_create_task(
+                _async_revalidate_devices(
+                    hass,
+                    session,
+                    restored_devices,
+                    cache,
+                    settings,
+                    check_device_ids=discovery_skipped,
+                )
             )
-    elif mode == "auto":
-        return PRESET_SCHEDULE
-    elif mode == "presence":
-        return PRESET_ACTIVITY
-    elif mode == "self_learn":
-        return PRESET_SELF_LEARN
-    else:
-        raise ValueError(f"Unknown smartbox node mode {mode}")
+        if len(restored_devices) < len(devices):
+            hass.async_create_task(cache.async_save())
 
+    return devices
 
-def get_preset_mode(node_type: str, status: Dict[str, Any], away: bool) -> str:
-    if away:
-        return PRESET_AWAY
-    if node_type == HEATER_NODE_TYPE_HTR_MOD:
-        _check_status_key("mode", node_type, status)
-        _check_status_key("selected_temp", node_type, status)
-        return _get_htr_mod_preset_mode(
-            node_type, status["mode"], status["selected_temp"]
-        )
-    else:
-        return PRESET_HOME
-
-
-def get_preset_modes(node_type: str) -> List[str]:
-    if node_type == HEATER_NODE_TYPE_HTR_MOD:
-        return [
-            PRESET_ACTIVITY,
-            PRESET_AWAY,
-            PRESET_COMFORT,
-            PRESET_ECO,
-            PRESET_FROST,
-            PRESET_SCHEDULE,
-            PRESET_SELF_LEARN,
-        ]
-    else:
-        return [PRESET_AWAY, PRESET_HOME]
-
-
-def set_preset_mode_status_update(
-    node_type: str, status: Dict[str, Any], preset_mode: str
-) -> Dict[str, Any]:
-    if node_type != HEATER_NODE_TYPE_HTR_MOD:
-        raise ValueError(f"{node_type} nodes do not support preset {preset_mode}")
-    # PRESET_HOME and PRESET_AWAY are not handled via status updates
-    assert preset_mode != PRESET_HOME and preset_mode != PRESET_AWAY
-
-    if preset_mode == PRESET_SCHEDULE:
-        return set_hvac_mode_args(node_type, status, HVAC_MODE_AUTO)
-    elif preset_mode == PRESET_SELF_LEARN:
-        return {"on": True, "mode": "self_learn"}
-    elif preset_mode == PRESET_ACTIVITY:
-        return {"on": True, "mode": "presence"}
-    elif preset_mode == PRESET_COMFORT:
-        return {"on": True, "mode": "manual", "selected_temp": "comfort"}
-    elif preset_mode == PRESET_ECO:
-        return {"on": True, "mode": "manual", "selected_temp": "eco"}
-    elif preset_mode == PRESET_FROST:
-        return {"on": True, "mode": "manual", "selected_temp": "ice"}
-    else:
-        raise ValueError(f"Unsupported preset {preset_mode} for node type {node_type}")
 
+async def _async_init_device(
+    init: Awaitable[T], dev_id: str, device_init_timeout: float
+) -> Optional[T]:
+    """Await device initialisation, logging rather than raising errors"""
+    try:
+        return await asyncio.wait_for(init, device_init_timeout)
+    except asyncio.TimeoutError:
+        _LOGGER.error(
+            f"Timed out initialising device {dev_id} after {device_init_timeout}s"
+        )
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception(f"Error initialising device {dev_id}")
+    return None
 
-def is_heating(node_type: str, status: Dict[str, Any]) -> str:
-    return status["charging"] if node_type == HEATER_NODE_TYPE_ACM else status["active"]
 
+async def _async_revalidate_devices(
+    hass: HomeAssistant,
+    session: Union[Session, MagicMock],
+    devices: List[Union[SmartboxDevice, MagicMock]],
+    cache: "DiscoveryCache",
+    settings: SmartboxSettings,
+    check_device_ids: bool,
+) -> None:
+    """Revalidate devices restored from the cache against the cloud"""
+    if check_device_ids:
+        try:
+            session_devices = {
+                session_device["dev_id"]: session_device
+                for session_device in await hass.async_add_executor_job(
+                    session.get_devices
+                )
+            }
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error fetching devices to revalidate cached devices")
+        else:
+            for device in devices:
+                session_device = session_devices.get(device.dev_id, None)
+                if session_device is None:
+                    _LOGGER.error(f"Configured device {device.dev_id} was not found")
+                else:
+                    device.update_name(session_device["name"])
+            devices = [device for device in devices if device.dev_id in session_devices]
+
+    semaphore = asyncio.Semaphore(settings.device_init_concurrency)
+
+    async def _revalidate_device(device: Union[SmartboxDevice, MagicMock]) -> None:
+        for attempt in range(settings.session_retry_attempts + 1):
+            if attempt > 0:
+                await asyncio.sleep(
+                    settings.session_backoff_factor * 2 ** (attempt - 1)
+                )
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(
+                        device.initialise_nodes(hass), settings.device_init_timeout
+                    )
+                    return
+                except asyncio.TimeoutError:
+                    _LOGGER.warning(
+                        f"Timed out revalidating device {device.dev_id} after "
+                        f"{settings.device_init_timeout}s"
+                    )
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(f"Error revalidating device {device.dev_id}")
+        _LOGGER.error(
+            f"Giving up revalidating device {device.dev_id} after "
+            f"{settings.session_retry_attempts + 1} attempts"
+        )
 
-def get_factory_options(node: Union[SmartboxNode, MagicMock]) -> FactoryOptionsDict:
-    return cast(FactoryOptionsDict, node.setup.get("factory_options", {}))
+    await asyncio.gather(*(_revalidate_device(device) for device in devices))
+    _LOGGER.debug(f"Revalidated cached devices {[d.dev_id for d in devices]}")
+    await cache.async_save()
 
 
-def window_mode_available(node: Union[SmartboxNode, MagicMock]) -> bool:
-    return get_factory_options(node).get("window_mode_available", False)
+async def create_smartbox_device(
+    hass: HomeAssistant,
+    dev_id: str,
+    name: str,
+    session: Union[Session, MagicMock],
+    settings: SmartboxSettings,
+) -> Union[SmartboxDevice, MagicMock]:
+    """Factory function for SmartboxDevices"""
+    device = SmartboxDevice(dev_id, name, session, settings)
+    await device.initialise_nodes(hass)
+    return device
 
 
-def true_radiant_available(node: Union[SmartboxNode, MagicMock]) -> bool:
-    return get_factory_options(node).get("true_radiant_available", False)
+def restore_smartbox_device(
+    dev_id: str,
+    name: str,
+    session: Union[Session, MagicMock],
+    settings: SmartboxSettings,
+    cached_nodes: List[CachedNodeDict],
+) -> Union[SmartboxDevice, MagicMock]:
+    """Factory function for SmartboxDevices restored from the cache"""
+    device = SmartboxDevice(dev_id, name, session, settings)
+    device.restore_nodes(cached_nodes)
+    device.start_updates()
+    return device
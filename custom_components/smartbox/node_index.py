@@ -0,0 +1,59 @@
+"""Index of Smartbox nodes by type and capability."""
+from collections import defaultdict
+from typing import DefaultDict, Iterable, List, Union
+from unittest.mock import MagicMock
+
+from .model import SmartboxNode
+
+Node = Union[SmartboxNode, MagicMock]
+
+
+class NodeIndex(object):
+    """Nodes indexed by type and by capability
+
+    Built as nodes are registered, so that platforms can look up the nodes
+    they create entities for rather than filtering every node. Capabilities
+    are indexed as of registration, which is when platforms are set up.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: List[Node] = []
+        self._by_type: DefaultDict[str, List[Node]] = defaultdict(list)
+        self._heaters: List[Node] = []
+        self._by_sensor: DefaultDict[str, List[Node]] = defaultdict(list)
+        self._by_switch: DefaultDict[str, List[Node]] = defaultdict(list)
+
+    def add(self, node: Node) -> None:
+        capabilities = node.capabilities
+        self._nodes.append(node)
+        self._by_type[node.node_type].append(node)
+        if capabilities.heater:
+            self._heaters.append(node)
+        for sensor_type in capabilities.sensors:
+            self._by_sensor[sensor_type].append(node)
+        for switch_type in capabilities.switches:
+            self._by_switch[switch_type].append(node)
+
+    def extend(self, nodes: Iterable[Node]) -> None:
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def nodes(self) -> List[Node]:
+        return self._nodes
+
+    @property
+    def heaters(self) -> List[Node]:
+        return self._heaters
+
+    def of_type(self, node_type: str) -> List[Node]:
+        return self._by_type.get(node_type, [])
+
+    def with_sensor(self, sensor_type: str) -> List[Node]:
+        return self._by_sensor.get(sensor_type, [])
+
+    def with_switch(self, switch_type: str) -> List[Node]:
+        return self._by_switch.get(switch_type, [])
@@ -0,0 +1,443 @@
+"""Node type specific behaviour for Smartbox nodes
+
+Each supported node type has a strategy object which decodes its status,
+derives climate state and builds status updates for commands. Nodes resolve
+their strategy once when created, so hot paths are a single method call
+rather than a walk through per-type conditionals.
+"""
+from dataclasses import dataclass
+import logging
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from homeassistant.components.climate.const import (
+    ClimateEntityFeature,
+    HVAC_MODE_AUTO,
+    HVAC_MODE_HEAT,
+    HVAC_MODE_OFF,
+    HVACAction,
+    HVACMode,
+    PRESET_ACTIVITY,
+    PRESET_AWAY,
+    PRESET_COMFORT,
+    PRESET_ECO,
+    PRESET_HOME,
+)
+
+from .const import (
+    GITHUB_ISSUES_URL,
+    HEATER_NODE_TYPE_ACM,
+    HEATER_NODE_TYPE_HTR,
+    HEATER_NODE_TYPE_HTR_MOD,
+    PRESET_FROST,
+    PRESET_SCHEDULE,
+    PRESET_SELF_LEARN,
+    SENSOR_CHARGE_LEVEL,
+    SENSOR_DUTY_CYCLE,
+    SENSOR_ENERGY,
+    SENSOR_POWER,
+    SENSOR_TEMPERATURE,
+    SWITCH_TRUE_RADIANT,
+    SWITCH_WINDOW_MODE,
+)
+from .status import ClimateState, NodeStatus, TemperatureUnit
+from .types import FactoryOptionsDict
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Factory options which indicate that a switch is available
+_SWITCH_FACTORY_OPTIONS = {
+    SWITCH_TRUE_RADIANT: "true_radiant_available",
+    SWITCH_WINDOW_MODE: "window_mode_available",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class NodeCapabilities:
+    """What a node supports, used to build its entities
+
+    Computed when the node is discovered, and again only if its factory
+    options change.
+    """
+
+    heater: bool = False
+    hvac_modes: Tuple[str, ...] = ()
+    preset_modes: Tuple[str, ...] = ()
+    climate_features: int = 0
+    sensors: FrozenSet[str] = frozenset()
+    switches: FrozenSet[str] = frozenset()
+
+
+def _check_status_key(key: str, node_type: str, status: Mapping[str, Any]):
+    if key not in status:
+        raise KeyError(
+            f"'{key}' not found in {node_type} - please report to {GITHUB_ISSUES_URL}. "
+            f"status: {status}"
+        )
+
+
+def _decode_value(
+    node_type: str, status: Mapping[str, Any], key: str, decode: Callable[[Any], T]
+) -> Optional[T]:
+    if key not in status:
+        return None
+    try:
+        return decode(status[key])
+    except (TypeError, ValueError):
+        _LOGGER.warning(
+            f"Invalid '{key}' value {status[key]!r} found for {node_type}"
+            f" - please report to {GITHUB_ISSUES_URL}"
+        )
+        return None
+
+
+def _number(value: Any) -> float:
+    # Numbers are kept as reported (so integer percentages stay integers),
+    # while strings such as "12.5" are parsed
+    if isinstance(value, (int, float)):
+        return value
+    return float(value)
+
+
+class NodeTypeStrategy(object):
+    """Behaviour for a node type
+
+    Implements the status handling of plain heater ('htr') nodes. Node types
+    without a registered strategy use this base class, so share only the htr
+    status decoding: as heater is False they don't get climate entities.
+    Subclasses override what differs for their node type.
+    """
+
+    # Whether nodes of this type are heaters, with climate entities
+    heater = False
+    # Status key which indicates the node is heating
+    heating_key = "active"
+    # Sensors supported by nodes of this type
+    sensors: FrozenSet[str] = frozenset()
+
+    def __init__(self, node_type: str) -> None:
+        self._node_type = node_type
+
+    @property
+    def node_type(self) -> str:
+        return self._node_type
+
+    def decode_status(self, status: Mapping[str, Any]) -> NodeStatus:
+        """Decode a raw node status dict into a typed snapshot
+
+        Missing or invalid values are decoded as None rather than raising, so
+        a partial status never breaks the entities reading it.
+        """
+        node_type = self._node_type
+        try:
+            target_temp: Optional[float] = self.target_temperature(status)
+        except (KeyError, TypeError, ValueError):
+            target_temp = None
+        return NodeStatus(
+            sync_status=cast(Optional[str], status.get("sync_status")),
+            available=status.get("sync_status") == "ok",
+            locked=cast(Optional[bool], status.get("locked")),
+            units=_decode_value(node_type, status, "units", TemperatureUnit),
+            mtemp=_decode_value(node_type, status, "mtemp", float),
+            stemp=_decode_value(node_type, status, "stemp", float),
+            comfort_temp=_decode_value(node_type, status, "comfort_temp", float),
+            eco_offset=_decode_value(node_type, status, "eco_offset", float),
+            ice_temp=_decode_value(node_type, status, "ice_temp", float),
+            target_temp=target_temp,
+            mode=cast(Optional[str], status.get("mode")),
+            selected_temp=cast(Optional[str], status.get("selected_temp")),
+            on=cast(Optional[bool], status.get("on")),
+            heating=cast(Optional[bool], status.get(self.heating_key)),
+            power=_decode_value(node_type, status, "power", float),
+            duty=_decode_value(node_type, status, "duty", _number),
+            charge_level=_decode_value(node_type, status, "charge_level", _number),
+        )
+
+    def capabilities(self, setup: Mapping[str, Any]) -> NodeCapabilities:
+        """Compute the capabilities of a node of this type with the given setup"""
+        factory_options = cast(FactoryOptionsDict, setup.get("factory_options", {}))
+        switches = frozenset(
+            switch
+            for switch, option in _SWITCH_FACTORY_OPTIONS.items()
+            if factory_options.get(option, False)
+        )
+        if not self.heater:
+            return NodeCapabilities(switches=switches)
+        return NodeCapabilities(
+            heater=True,
+            hvac_modes=(HVACMode.HEAT, HVACMode.AUTO, HVACMode.OFF),
+            preset_modes=tuple(self.preset_modes()),
+            climate_features=(
+                ClimateEntityFeature.TARGET_TEMPERATURE
+                | ClimateEntityFeature.PRESET_MODE
+            ),
+            sensors=self.sensors,
+            switches=switches,
+        )
+
+    def climate_state(
+        self, status: Mapping[str, Any], snapshot: NodeStatus, away: bool
+    ) -> ClimateState:
+        """Derive the climate entity state from a node's status"""
+        return ClimateState(
+            hvac_mode=self.hvac_mode(status),
+            hvac_action=HVACAction.HEATING if snapshot.heating else HVACAction.IDLE,
+            preset_mode=self.preset_mode(status, away),
+            target_temperature=snapshot.target_temp,
+        )
+
+    def is_heating(self, status: Mapping[str, Any]) -> bool:
+        return bool(status[self.heating_key])
+
+    def target_temperature(self, status: Mapping[str, Any]) -> float:
+        _check_status_key("stemp", self._node_type, status)
+        return float(status["stemp"])
+
+    def set_temperature_args(
+        self, status: Mapping[str, Any], temp: float
+    ) -> Dict[str, Any]:
+        _check_status_key("units", self._node_type, status)
+        return {
+            "stemp": str(temp),
+            "units": status["units"],
+        }
+
+    def hvac_mode(self, status: Mapping[str, Any]) -> str:
+        _check_status_key("mode", self._node_type, status)
+        if status["mode"] == "off":
+            return HVAC_MODE_OFF
+        elif status["mode"] == "manual":
+            return HVAC_MODE_HEAT
+        elif status["mode"] == "auto":
+            return HVAC_MODE_AUTO
+        elif status["mode"] == "modified_auto":
+            # This occurs when the temperature is modified while in auto mode.
+            # Mapping it to auto seems to make this most sense
+            return HVAC_MODE_AUTO
+        elif status["mode"] == "self_learn":
+            return HVAC_MODE_AUTO
+        elif status["mode"] == "presence":
+            return HVAC_MODE_AUTO
+        else:
+            _LOGGER.error(f"Unknown smartbox node mode {status['mode']}")
+            raise ValueError(f"Unknown smartbox node mode {status['mode']}")
+
+    def set_hvac_mode_args(
+        self, status: Mapping[str, Any], hvac_mode: str
+    ) -> Dict[str, Any]:
+        if hvac_mode == HVAC_MODE_OFF:
+            return {"mode": "off"}
+        elif hvac_mode == HVAC_MODE_HEAT:
+            return {"mode": "manual"}
+        elif hvac_mode == HVAC_MODE_AUTO:
+            return {"mode": "auto"}
+        else:
+            raise ValueError(f"Unsupported hvac mode {hvac_mode}")
+
+    def preset_mode(self, status: Mapping[str, Any], away: bool) -> str:
+        return PRESET_AWAY if away else PRESET_HOME
+
+    def preset_modes(self) -> List[str]:
+        return [PRESET_AWAY, PRESET_HOME]
+
+    def set_preset_mode_status_update(
+        self, status: Mapping[str, Any], preset_mode: str
+    ) -> Dict[str, Any]:
+        if preset_mode in (PRESET_AWAY, PRESET_HOME):
+            # Handled by the device's away status rather than a status update
+            return {}
+        raise ValueError(f"{self._node_type} nodes do not support preset {preset_mode}")
+
+
+class HtrStrategy(NodeTypeStrategy):
+    """Behaviour for heater ('htr') nodes"""
+
+    heater = True
+    # Only nodes of type 'htr' seem to report the duty cycle, which is needed
+    # to compute energy consumption
+    sensors = frozenset(
+        [SENSOR_DUTY_CYCLE, SENSOR_ENERGY, SENSOR_POWER, SENSOR_TEMPERATURE]
+    )
+
+
+class AcmStrategy(NodeTypeStrategy):
+    """Behaviour for storage heater ('acm') nodes"""
+
+    heater = True
+    heating_key = "charging"
+    sensors = frozenset([SENSOR_CHARGE_LEVEL, SENSOR_POWER, SENSOR_TEMPERATURE])
+
+
+class HtrModStrategy(NodeTypeStrategy):
+    """Behaviour for 'htr_mod' heater nodes, which have comfort/eco/ice presets"""
+
+    heater = True
+    sensors = frozenset([SENSOR_TEMPERATURE])
+
+    def target_temperature(self, status: Mapping[str, Any]) -> float:
+        node_type = self._node_type
+        _check_status_key("selected_temp", node_type, status)
+        if status["selected_temp"] == "comfort":
+            _check_status_key("comfort_temp", node_type, status)
+            return float(status["comfort_temp"])
+        elif status["selected_temp"] == "eco":
+            _check_status_key("comfort_temp", node_type, status)
+            _check_status_key("eco_offset", node_type, status)
+            return float(status["comfort_temp"]) - float(status["eco_offset"])
+        elif status["selected_temp"] == "ice":
+            _check_status_key("ice_temp", node_type, status)
+            return float(status["ice_temp"])
+        else:
+            raise KeyError(
+                f"'Unexpected 'selected_temp' value {status['selected_temp']}"
+                f" found for {node_type} - please report to"
+                f" {GITHUB_ISSUES_URL}. status: {status}"
+            )
+
+    def set_temperature_args(
+        self, status: Mapping[str, Any], temp: float
+    ) -> Dict[str, Any]:
+        node_type = self._node_type
+        _check_status_key("units", node_type, status)
+        if status["selected_temp"] == "comfort":
+            target_temp = temp
+        elif status["selected_temp"] == "eco":
+            _check_status_key("eco_offset", node_type, status)
+            target_temp = temp + float(status["eco_offset"])
+        elif status["selected_temp"] == "ice":
+            raise ValueError(
+                "Can't set temperature for htr_mod devices when ice mode is selected"
+            )
+        else:
+            raise KeyError(
+                f"'Unexpected 'selected_temp' value {status['selected_temp']}"
+                f" found for {node_type} - please report to "
+                f"{GITHUB_ISSUES_URL}. status: {status}"
+            )
+        return {
+            "on": True,
+            "mode": status["mode"],
+            "selected_temp": status["selected_temp"],
+            "comfort_temp": str(target_temp),
+            "eco_offset": status["eco_offset"],
+            "units": status["units"],
+        }
+
+    def hvac_mode(self, status: Mapping[str, Any]) -> str:
+        _check_status_key("mode", self._node_type, status)
+        if status["mode"] != "off" and not status["on"]:
+            return HVAC_MODE_OFF
+        return super().hvac_mode(status)
+
+    def set_hvac_mode_args(
+        self, status: Mapping[str, Any], hvac_mode: str
+    ) -> Dict[str, Any]:
+        if hvac_mode == HVAC_MODE_OFF:
+            return {"on": False}
+        elif hvac_mode == HVAC_MODE_HEAT:
+            # We need to pass these status keys on when setting the mode
+            required_status_keys = ["selected_temp"]
+            for key in required_status_keys:
+                _check_status_key(key, self._node_type, status)
+            hvac_mode_args = {k: status[k] for k in required_status_keys}
+            hvac_mode_args["on"] = True
+            hvac_mode_args["mode"] = "manual"
+            return hvac_mode_args
+        elif hvac_mode == HVAC_MODE_AUTO:
+            return {"on": True, "mode": "auto"}
+        else:
+            raise ValueError(f"Unsupported hvac mode {hvac_mode}")
+
+    def _preset_mode(self, mode: str, selected_temp: str) -> str:
+        if mode == "manual":
+            if selected_temp == "comfort":
+                return PRESET_COMFORT
+            elif selected_temp == "eco":
+                return PRESET_ECO
+            elif selected_temp == "ice":
+                return PRESET_FROST
+            else:
+                raise ValueError(
+                    f"'Unexpected 'selected_temp' value {selected_temp} found for "
+                    f"{self._node_type} - please report to {GITHUB_ISSUES_URL}."
+                )
+        elif mode == "auto":
+            return PRESET_SCHEDULE
+        elif mode == "presence":
+            return PRESET_ACTIVITY
+        elif mode == "self_learn":
+            return PRESET_SELF_LEARN
+        else:
+            raise ValueError(f"Unknown smartbox node mode {mode}")
+
+    def preset_mode(self, status: Mapping[str, Any], away: bool) -> str:
+        if away:
+            return PRESET_AWAY
+        _check_status_key("mode", self._node_type, status)
+        _check_status_key("selected_temp", self._node_type, status)
+        return self._preset_mode(str(status["mode"]), str(status["selected_temp"]))
+
+    def preset_modes(self) -> List[str]:
+        return [
+            PRESET_ACTIVITY,
+            PRESET_AWAY,
+            PRESET_COMFORT,
+            PRESET_ECO,
+            PRESET_FROST,
+            PRESET_SCHEDULE,
+            PRESET_SELF_LEARN,
+        ]
+
+    def set_preset_mode_status_update(
+        self, status: Mapping[str, Any], preset_mode: str
+    ) -> Dict[str, Any]:
+        if preset_mode == PRESET_SCHEDULE:
+            return self.set_hvac_mode_args(status, HVAC_MODE_AUTO)
+        elif preset_mode == PRESET_SELF_LEARN:
+            return {"on": True, "mode": "self_learn"}
+        elif preset_mode == PRESET_ACTIVITY:
+            return {"on": True, "mode": "presence"}
+        elif preset_mode == PRESET_COMFORT:
+            return {"on": True, "mode": "manual", "selected_temp": "comfort"}
+        elif preset_mode == PRESET_ECO:
+            return {"on": True, "mode": "manual", "selected_temp": "eco"}
+        elif preset_mode == PRESET_FROST:
+            return {"on": True, "mode": "manual", "selected_temp": "ice"}
+        else:
+            return super().set_preset_mode_status_update(status, preset_mode)
+
+
+_STRATEGIES: Dict[str, NodeTypeStrategy] = {}
+
+
+def register_node_type(strategy: NodeTypeStrategy) -> None:
+    """Register the strategy for a node type, replacing any existing one"""
+    _STRATEGIES[strategy.node_type] = strategy
+
+
+def get_node_type_strategy(node_type: str) -> NodeTypeStrategy:
+    """Return the strategy for a node type
+
+    Node types without a registered strategy get the default behaviour.
+    """
+    strategy = _STRATEGIES.get(node_type)
+    if strategy is None:
+        strategy = NodeTypeStrategy(node_type)
+    return strategy
+
+
+register_node_type(AcmStrategy(HEATER_NODE_TYPE_ACM))
+register_node_type(HtrStrategy(HEATER_NODE_TYPE_HTR))
+register_node_type(HtrModStrategy(HEATER_NODE_TYPE_HTR_MOD))
@@ -6,7 +6,7 @@ import logging
 from typing import Any, Callable, Dict, Optional, Union
 from unittest.mock import MagicMock
 
-from .const import DOMAIN, SMARTBOX_DEVICES
+from .const import DOMAIN, INTEREST_POWER_LIMIT, SMARTBOX_DEVICES
 from .model import SmartboxDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -37,6 +37,20 @@ class DevicePowerLimit(NumberEntity):
 
     def __init__(self, device: Union[SmartboxDevice, MagicMock]) -> None:
         self._device = device
+        self._unique_id = f"{device.dev_id}_power_limit"
+
+    @property
+    def should_poll(self) -> bool:
+        # Device updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._device.subscribe(INTEREST_POWER_LIMIT, self._device_updated)
+        )
+
+    def _device_updated(self) -> None:
+        self.schedule_update_ha_state()
 
     native_max_value: float = _MAX_POWER_LIMIT
 
@@ -47,12 +61,12 @@ class DevicePowerLimit(NumberEntity):
 
     @property
     def unique_id(self) -> str:
-        return f"{self._device.dev_id}_power_limit"
+        return self._unique_id
 
     @property
     def native_value(self) -> float:
         return self._device.power_limit
 
-    def set_native_value(self, value: float) -> None:
+    async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
-        self._device.set_power_limit(int(value))
+        await self._device.async_set_power_limit(self.hass, int(value))
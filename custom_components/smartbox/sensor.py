@@ -11,18 +11,27 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
 import logging
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Type, Union
 from unittest.mock import MagicMock
 
 from .const import (
+    COMMAND_PRIORITY_DEVICE,
+    COMMAND_PRIORITY_NODE,
     DOMAIN,
-    HEATER_NODE_TYPE_ACM,
-    HEATER_NODE_TYPE_HTR,
-    HEATER_NODE_TYPE_HTR_MOD,
-    SMARTBOX_NODES,
+    INTEREST_STATUS,
+    NODE_ENTITY_STATUS_KEYS,
+    SENSOR_CHARGE_LEVEL,
+    SENSOR_DUTY_CYCLE,
+    SENSOR_ENERGY,
+    SENSOR_POWER,
+    SENSOR_TEMPERATURE,
+    SMARTBOX_DEVICES,
+    SMARTBOX_NODE_INDEX,
 )
-from .model import get_temperature_unit, is_heater_node, is_heating, SmartboxNode
+from .model import SmartboxDevice, SmartboxNode
+from .status import NodeStatus
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,87 +47,76 @@ async def async_setup_platform(
     if discovery_info is None:
         return
 
-    # Temperature
-    async_add_entities(
-        [
-            TemperatureSensor(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if is_heater_node(node)
-        ],
-        True,
-    )
-    # Power
-    async_add_entities(
-        [
-            PowerSensor(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if is_heater_node(node) and node.node_type != HEATER_NODE_TYPE_HTR_MOD
-        ],
-        True,
-    )
-    # Duty Cycle and Energy
-    # Only nodes of type 'htr' seem to report the duty cycle, which is needed
-    # to compute energy consumption
-    async_add_entities(
-        [
-            DutyCycleSensor(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if node.node_type == HEATER_NODE_TYPE_HTR
-        ],
-        True,
-    )
-    async_add_entities(
-        [
-            EnergySensor(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if node.node_type == HEATER_NODE_TYPE_HTR
-        ],
-        True,
-    )
-    # Charge Level
-    async_add_entities(
-        [
-            ChargeLevelSensor(node)
-            for node in hass.data[DOMAIN][SMARTBOX_NODES]
-            if is_heater_node(node) and node.node_type == HEATER_NODE_TYPE_ACM
-        ],
-        True,
+    node_index = hass.data[DOMAIN][SMARTBOX_NODE_INDEX]
+    sensor_entities: List[SensorEntity] = []
+    for sensor_type, sensor_class in _SENSOR_CLASSES.items():
+        sensor_entities.extend(
+            sensor_class(node) for node in node_index.with_sensor(sensor_type)
+        )
+    sensor_entities.extend(
+        CommandQueueSensor(device) for device in hass.data[DOMAIN][SMARTBOX_DEVICES]
     )
+    async_add_entities(sensor_entities, True)
 
     _LOGGER.debug("Finished setting up Smartbox sensor platform")
 
 
 class SmartboxSensorBase(SensorEntity):
+    # Status keys the sensor depends on, or None for all keys
+    _status_keys: Optional[FrozenSet[str]] = None
+    # Appended to the node ID to give the sensor's unique ID
+    _unique_id_suffix: str
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         self._node = node
-        self._status: Dict[str, Any] = {}
-        self._available = False  # unavailable until we get an update
+        self._unique_id = f"{node.node_id}_{self._unique_id_suffix}"
+        # Node snapshot as of the last update, to detect changes
+        self._last_snapshot: Optional[NodeStatus] = None
         self._last_update: Optional[datetime] = None
         self._time_since_last_update: Optional[timedelta] = None
         _LOGGER.debug(f"Created node {self.name} unique_id={self.unique_id}")
 
     @property
-    def extra_state_attributes(self) -> Dict[str, bool]:
+    def extra_state_attributes(self) -> Dict[str, Optional[bool]]:
         return {
-            ATTR_LOCKED: self._status["locked"],
+            ATTR_LOCKED: self._node.snapshot.locked,
         }
 
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
     @property
     def available(self) -> bool:
-        return self._available
+        return self._node.snapshot.available
+
+    @property
+    def should_poll(self) -> bool:
+        # Node updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._node.subscribe(INTEREST_STATUS, self._node_updated, self._status_keys)
+        )
+
+    def _node_updated(self) -> None:
+        self.schedule_update_ha_state(True)
 
     async def async_update(self) -> None:
-        new_status = await self._node.async_update(self.hass)
-        if new_status["sync_status"] == "ok":
-            # update our status
-            self._status = new_status
-            self._available = True
+        # State is read from the node's shared snapshot; just track the time
+        # between updates
+        snapshot = self._node.snapshot
+        if snapshot is self._last_snapshot:
+            # Snapshots are replaced rather than mutated, so nothing changed
+            return
+        self._last_snapshot = snapshot
+        if snapshot.available:
             update_time = datetime.now()
             if self._last_update is not None:
                 self._time_since_last_update = update_time - self._last_update
             self._last_update = update_time
         else:
-            self._available = False
             self._last_update = None
             self._time_since_last_update = None
 
@@ -133,6 +131,9 @@ class TemperatureSensor(SmartboxSensorBase):
     device_class = SensorDeviceClass.TEMPERATURE
     state_class = SensorStateClass.MEASUREMENT
 
+    _unique_id_suffix = "temperature"
+    _status_keys = NODE_ENTITY_STATUS_KEYS | frozenset(["mtemp", "units"])
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         super().__init__(node)
 
@@ -141,16 +142,13 @@ class TemperatureSensor(SmartboxSensorBase):
         return f"{self._node.name} Temperature"
 
     @property
-    def unique_id(self) -> str:
-        return f"{self._node.node_id}_temperature"
+    def native_value(self) -> Optional[float]:
+        return self._node.snapshot.mtemp
 
     @property
-    def native_value(self) -> float:
-        return self._status["mtemp"]
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        return get_temperature_unit(self._status)
+    def native_unit_of_measurement(self) -> Optional[str]:
+        unit = self._node.snapshot.units
+        return unit.ha_unit if unit is not None else None
 
 
 class PowerSensor(SmartboxSensorBase):
@@ -167,6 +165,9 @@ class PowerSensor(SmartboxSensorBase):
     native_unit_of_measurement = POWER_WATT
     state_class = SensorStateClass.MEASUREMENT
 
+    _unique_id_suffix = "power"
+    _status_keys = NODE_ENTITY_STATUS_KEYS | frozenset(["active", "charging", "power"])
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         super().__init__(node)
 
@@ -175,16 +176,9 @@ class PowerSensor(SmartboxSensorBase):
         return f"{self._node.name} Power"
 
     @property
-    def unique_id(self) -> str:
-        return f"{self._node.node_id}_power"
-
-    @property
-    def native_value(self) -> float:
-        return (
-            self._status["power"]
-            if is_heating(self._node.node_type, self._status)
-            else 0
-        )
+    def native_value(self) -> Optional[float]:
+        snapshot = self._node.snapshot
+        return snapshot.power if snapshot.heating else 0
 
 
 class DutyCycleSensor(SmartboxSensorBase):
@@ -197,6 +191,9 @@ class DutyCycleSensor(SmartboxSensorBase):
     native_unit_of_measurement = PERCENTAGE
     state_class = SensorStateClass.MEASUREMENT
 
+    _unique_id_suffix = "duty_cycle"
+    _status_keys = NODE_ENTITY_STATUS_KEYS | frozenset(["duty"])
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         super().__init__(node)
 
@@ -205,12 +202,8 @@ class DutyCycleSensor(SmartboxSensorBase):
         return f"{self._node.name} Duty Cycle"
 
     @property
-    def unique_id(self) -> str:
-        return f"{self._node.node_id}_duty_cycle"
-
-    @property
-    def native_value(self) -> float:
-        return self._status["duty"]
+    def native_value(self) -> Optional[float]:
+        return self._node.snapshot.duty
 
 
 class EnergySensor(SmartboxSensorBase):
@@ -223,6 +216,10 @@ class EnergySensor(SmartboxSensorBase):
     native_unit_of_measurement = ENERGY_WATT_HOUR
     state_class = SensorStateClass.TOTAL
 
+    _unique_id_suffix = "energy"
+    # Energy depends on the time between updates, so any change is relevant
+    _status_keys = None
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         super().__init__(node)
 
@@ -230,22 +227,18 @@ class EnergySensor(SmartboxSensorBase):
     def name(self) -> str:
         return f"{self._node.name} Energy"
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self._node.node_id}_energy"
-
     @property
     def native_value(self) -> float | None:
         time_since_last_update = self.time_since_last_update
-        if time_since_last_update is not None:
-            return (
-                float(self._status["power"])
-                * float(self._status["duty"])
-                / 100
-                * time_since_last_update.seconds
-                / 60
-                / 60
-            )
+        snapshot = self._node.snapshot
+        power = snapshot.power
+        duty = snapshot.duty
+        if (
+            time_since_last_update is not None
+            and power is not None
+            and duty is not None
+        ):
+            return power * duty / 100 * time_since_last_update.seconds / 60 / 60
         else:
             return None
 
@@ -257,6 +250,9 @@ class ChargeLevelSensor(SmartboxSensorBase):
     native_unit_of_measurement = PERCENTAGE
     state_class = SensorStateClass.MEASUREMENT
 
+    _unique_id_suffix = "charge_level"
+    _status_keys = NODE_ENTITY_STATUS_KEYS | frozenset(["charge_level"])
+
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         super().__init__(node)
 
@@ -264,10 +260,64 @@ class ChargeLevelSensor(SmartboxSensorBase):
     def name(self) -> str:
         return f"{self._node.name} Charge Level"
 
+    @property
+    def native_value(self) -> Optional[float]:
+        return self._node.snapshot.charge_level
+
+
+class CommandQueueSensor(SensorEntity):
+    """Smartbox device command queue diagnostics
+
+    The state is the number of commands waiting to be sent, with the rest of
+    the queue's metrics and the number of API calls saved by batching node
+    setup writes as attributes.
+    """
+
+    entity_category = EntityCategory.DIAGNOSTIC
+    state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, device: Union[SmartboxDevice, MagicMock]) -> None:
+        self._device = device
+        self._unique_id = f"{device.dev_id}_command_queue"
+
+    @property
+    def should_poll(self) -> bool:
+        # Queue metrics change with every command, so are polled rather than
+        # pushed
+        return True
+
+    @property
+    def name(self) -> str:
+        return f"{self._device.name} Command Queue"
+
     @property
     def unique_id(self) -> str:
-        return f"{self._node.node_id}_charge_level"
+        return self._unique_id
 
     @property
     def native_value(self) -> int:
-        return self._status["charge_level"]
+        return self._device.command_queue.depth
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        metrics = self._device.command_queue.metrics
+        return {
+            "queued_device_commands": metrics.depth_by_priority[
+                COMMAND_PRIORITY_DEVICE
+            ],
+            "queued_node_commands": metrics.depth_by_priority[COMMAND_PRIORITY_NODE],
+            "max_depth": metrics.max_depth,
+            "in_flight": metrics.in_flight,
+            "completed": metrics.completed,
+            "failed": metrics.failed,
+            "setup_calls_saved": self._device.setup_calls_saved,
+        }
+
+
+_SENSOR_CLASSES: Dict[str, Type[SmartboxSensorBase]] = {
+    SENSOR_CHARGE_LEVEL: ChargeLevelSensor,
+    SENSOR_DUTY_CYCLE: DutyCycleSensor,
+    SENSOR_ENERGY: EnergySensor,
+    SENSOR_POWER: PowerSensor,
+    SENSOR_TEMPERATURE: TemperatureSensor,
+}
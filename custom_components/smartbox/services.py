@@ -0,0 +1,205 @@
+"""Services for the Smartbox integration."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Union
+from unittest.mock import MagicMock
+
+import voluptuous as vol
+
+from homeassistant.components.climate.const import (
+    ATTR_HVAC_MODE,
+    ATTR_PRESET_MODE,
+    HVACMode,
+    PRESET_AWAY,
+)
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    ENTITY_MATCH_ALL,
+)
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import entity_registry as er
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from .const import (
+    ATTR_DEVICE_IDS,
+    DOMAIN,
+    EVENT_BULK_SET_RESULT,
+    SERVICE_BULK_SET,
+    SMARTBOX_NODE_INDEX,
+)
+from .climate import get_climate_unique_id
+from .model import SmartboxDevice, SmartboxNode
+
+_LOGGER = logging.getLogger(__name__)
+
+_TARGET = "target"
+
+BULK_SET_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            # Smartbox entities aren't linked to Home Assistant devices, so
+            # only entity and area targets can select heaters
+            vol.Optional(ATTR_ENTITY_ID): cv.comp_entity_ids,
+            vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_DEVICE_IDS): vol.All(cv.ensure_list, [cv.string]),
+            vol.Exclusive(ATTR_TEMPERATURE, _TARGET): vol.Coerce(float),
+            vol.Exclusive(ATTR_HVAC_MODE, _TARGET): vol.Coerce(HVACMode),
+            vol.Exclusive(ATTR_PRESET_MODE, _TARGET): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTITY_ID, ATTR_AREA_ID, ATTR_DEVICE_IDS),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_HVAC_MODE, ATTR_PRESET_MODE),
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Smartbox services"""
+
+    async def _async_bulk_set(call: ServiceCall) -> None:
+        await async_bulk_set(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BULK_SET, _async_bulk_set, schema=BULK_SET_SCHEMA
+    )
+
+
+async def _async_selected_heaters(
+    hass: HomeAssistant, call: ServiceCall
+) -> List[Union[SmartboxNode, MagicMock]]:
+    """Heater nodes selected by a service call's target and device IDs"""
+    heaters = hass.data[DOMAIN][SMARTBOX_NODE_INDEX].heaters
+    if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        return list(heaters)
+
+    entity_registry = er.async_get(hass)
+    unique_ids = set()
+    for entity_id in await async_extract_entity_ids(hass, call):
+        entry = entity_registry.async_get(entity_id)
+        if entry is not None and entry.platform == DOMAIN:
+            unique_ids.add(entry.unique_id)
+    dev_ids = frozenset(call.data.get(ATTR_DEVICE_IDS, []))
+    return [
+        node
+        for node in heaters
+        if get_climate_unique_id(node) in unique_ids or node.device.dev_id in dev_ids
+    ]
+
+
+def _bulk_status_args(
+    node: Union[SmartboxNode, MagicMock], data: Dict[str, Any]
+) -> Dict[str, Any]:
+    if ATTR_TEMPERATURE in data:
+        return node.strategy.set_temperature_args(node.status, data[ATTR_TEMPERATURE])
+    if ATTR_HVAC_MODE in data:
+        return node.strategy.set_hvac_mode_args(node.status, data[ATTR_HVAC_MODE])
+    return node.strategy.set_preset_mode_status_update(
+        node.status, data[ATTR_PRESET_MODE]
+    )
+
+
+async def _async_bulk_set_device(
+    hass: HomeAssistant,
+    device: Union[SmartboxDevice, MagicMock],
+    nodes: List[Union[SmartboxNode, MagicMock]],
+    data: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    node_status_args: List[Dict[str, Any]] = []
+    for node in nodes:
+        result: Dict[str, Any] = {
+            "dev_id": device.dev_id,
+            "addr": node.addr,
+            "name": node.name,
+        }
+        status_args: Dict[str, Any] = {}
+        try:
+            status_args = _bulk_status_args(node, data)
+        except Exception as e:  # pylint: disable=broad-except
+            result["success"] = False
+            result["error"] = str(e)
+        else:
+            result["success"] = True
+        results.append(result)
+        node_status_args.append(status_args)
+
+    preset_mode = data.get(ATTR_PRESET_MODE, None)
+    if preset_mode is not None and any(result["success"] for result in results):
+        # Only change the away status once some node has accepted the preset,
+        # so an unsupported preset doesn't take the device out of away
+        away = preset_mode == PRESET_AWAY
+        if away != device.away:
+            try:
+                await device.async_send_away_status(hass, away)
+            except Exception as e:  # pylint: disable=broad-except
+                for result in results:
+                    if result["success"]:
+                        result["success"] = False
+                        result["error"] = str(e)
+                return results
+
+    async def _set_node(
+        node: Union[SmartboxNode, MagicMock],
+        status_args: Dict[str, Any],
+        result: Dict[str, Any],
+    ) -> None:
+        try:
+            await node.async_send_status(hass, **status_args)
+        except Exception as e:  # pylint: disable=broad-except
+            result["success"] = False
+            result["error"] = str(e)
+
+    # Commands are limited and ordered by the device's command queue, so
+    # can all be submitted at once
+    await asyncio.gather(
+        *(
+            _set_node(node, status_args, result)
+            for node, status_args, result in zip(nodes, node_status_args, results)
+            if result["success"] and status_args
+        )
+    )
+    return results
+
+
+async def async_bulk_set(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Set the temperature, HVAC mode or preset of many heaters at once
+
+    The work is grouped by device, and devices are set concurrently. Fires
+    an event with the result for each node.
+    """
+    start_time = time.monotonic()
+    nodes_by_device: Dict[str, List[Union[SmartboxNode, MagicMock]]] = {}
+    devices: Dict[str, Union[SmartboxDevice, MagicMock]] = {}
+    heaters = await _async_selected_heaters(hass, call)
+    if not heaters:
+        raise ValueError("No Smartbox heaters selected")
+    for node in heaters:
+        dev_id = node.device.dev_id
+        devices[dev_id] = node.device
+        nodes_by_device.setdefault(dev_id, []).append(node)
+
+    device_results = await asyncio.gather(
+        *(
+            _async_bulk_set_device(hass, devices[dev_id], nodes, dict(call.data))
+            for dev_id, nodes in nodes_by_device.items()
+        )
+    )
+    results = [result for results in device_results for result in results]
+    failed = sum(1 for result in results if not result["success"])
+    duration = time.monotonic() - start_time
+    _LOGGER.info(
+        f"Bulk set {len(results) - failed} of {len(results)} node(s) on "
+        f"{len(nodes_by_device)} device(s) in {duration:.2f}s"
+    )
+    hass.bus.async_fire(
+        EVENT_BULK_SET_RESULT,
+        {
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "duration": duration,
+        },
+    )
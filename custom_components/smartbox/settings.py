@@ -0,0 +1,62 @@
+"""Tuning options for a Smartbox account."""
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from .const import (
+    CONF_COMMAND_DEBOUNCE,
+    CONF_DEVICE_INIT_CONCURRENCY,
+    CONF_DEVICE_INIT_TIMEOUT,
+    CONF_NODE_FETCH_CONCURRENCY,
+    CONF_PENDING_WRITE_TIMEOUT,
+    CONF_SESSION_BACKOFF_FACTOR,
+    CONF_SESSION_RETRY_ATTEMPTS,
+    CONF_SOCKET_BACKOFF_FACTOR,
+    CONF_SOCKET_RECONNECT_ATTEMPTS,
+    CONF_UPDATE_COALESCE_WINDOW,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_DEVICE_INIT_CONCURRENCY,
+    DEFAULT_DEVICE_INIT_TIMEOUT,
+    DEFAULT_NODE_FETCH_CONCURRENCY,
+    DEFAULT_PENDING_WRITE_TIMEOUT,
+    DEFAULT_SESSION_BACKOFF_FACTOR,
+    DEFAULT_SESSION_RETRY_ATTEMPTS,
+    DEFAULT_SOCKET_BACKOFF_FACTOR,
+    DEFAULT_SOCKET_RECONNECT_ATTEMPTS,
+    DEFAULT_UPDATE_COALESCE_WINDOW,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SmartboxSettings:
+    """Options tuning how an account's session and devices behave
+
+    Passed around as one object, so that a new option only needs a field
+    here rather than another argument on every function it goes through.
+    """
+
+    session_retry_attempts: int = DEFAULT_SESSION_RETRY_ATTEMPTS
+    session_backoff_factor: float = DEFAULT_SESSION_BACKOFF_FACTOR
+    socket_reconnect_attempts: int = DEFAULT_SOCKET_RECONNECT_ATTEMPTS
+    socket_backoff_factor: float = DEFAULT_SOCKET_BACKOFF_FACTOR
+    node_fetch_concurrency: int = DEFAULT_NODE_FETCH_CONCURRENCY
+    device_init_concurrency: int = DEFAULT_DEVICE_INIT_CONCURRENCY
+    device_init_timeout: float = DEFAULT_DEVICE_INIT_TIMEOUT
+    update_coalesce_window: float = DEFAULT_UPDATE_COALESCE_WINDOW
+    command_debounce: float = DEFAULT_COMMAND_DEBOUNCE
+    pending_write_timeout: float = DEFAULT_PENDING_WRITE_TIMEOUT
+
+    @classmethod
+    def from_config(cls, account: Dict[str, Any]) -> "SmartboxSettings":
+        """Settings from a validated account config"""
+        return cls(
+            session_retry_attempts=account[CONF_SESSION_RETRY_ATTEMPTS],
+            session_backoff_factor=account[CONF_SESSION_BACKOFF_FACTOR],
+            socket_reconnect_attempts=account[CONF_SOCKET_RECONNECT_ATTEMPTS],
+            socket_backoff_factor=account[CONF_SOCKET_BACKOFF_FACTOR],
+            node_fetch_concurrency=account[CONF_NODE_FETCH_CONCURRENCY],
+            device_init_concurrency=account[CONF_DEVICE_INIT_CONCURRENCY],
+            device_init_timeout=account[CONF_DEVICE_INIT_TIMEOUT],
+            update_coalesce_window=account[CONF_UPDATE_COALESCE_WINDOW],
+            command_debounce=account[CONF_COMMAND_DEBOUNCE],
+            pending_write_timeout=account[CONF_PENDING_WRITE_TIMEOUT],
+        )
@@ -0,0 +1,60 @@
+"""Typed snapshots of Smartbox node status."""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from homeassistant.const import (
+    TEMP_CELSIUS,
+    TEMP_FAHRENHEIT,
+)
+
+
+class TemperatureUnit(Enum):
+    """Temperature units reported by nodes"""
+
+    CELSIUS = "C"
+    FAHRENHEIT = "F"
+
+    @property
+    def ha_unit(self) -> str:
+        """Return the corresponding Home Assistant unit"""
+        return TEMP_CELSIUS if self is TemperatureUnit.CELSIUS else TEMP_FAHRENHEIT
+
+
+@dataclass(frozen=True, slots=True)
+class NodeStatus:
+    """Node status decoded from the raw status dict
+
+    Decoded once per status change and shared by all of a node's entities,
+    so they can read fields directly rather than re-parsing strings. Fields
+    are None if not reported by the node (or not valid).
+    """
+
+    sync_status: Optional[str] = None
+    # Whether the node is connected, computed once when decoding
+    available: bool = False
+    locked: Optional[bool] = None
+    units: Optional[TemperatureUnit] = None
+    mtemp: Optional[float] = None
+    stemp: Optional[float] = None
+    comfort_temp: Optional[float] = None
+    eco_offset: Optional[float] = None
+    ice_temp: Optional[float] = None
+    target_temp: Optional[float] = None
+    mode: Optional[str] = None
+    selected_temp: Optional[str] = None
+    on: Optional[bool] = None
+    heating: Optional[bool] = None
+    power: Optional[float] = None
+    duty: Optional[float] = None
+    charge_level: Optional[float] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ClimateState:
+    """Climate state derived from a node's status and its device away status"""
+
+    hvac_mode: Optional[str] = None
+    hvac_action: Optional[str] = None
+    preset_mode: Optional[str] = None
+    target_temperature: Optional[float] = None
@@ -6,13 +6,16 @@ import logging
 from typing import Any, Callable, Dict, List, Optional, Union
 from unittest.mock import MagicMock
 
-from .const import DOMAIN, SMARTBOX_DEVICES, SMARTBOX_NODES
-from .model import (
-    SmartboxDevice,
-    SmartboxNode,
-    true_radiant_available,
-    window_mode_available,
+from .const import (
+    DOMAIN,
+    INTEREST_AWAY,
+    INTEREST_SETUP,
+    SMARTBOX_DEVICES,
+    SMARTBOX_NODE_INDEX,
+    SWITCH_TRUE_RADIANT,
+    SWITCH_WINDOW_MODE,
 )
+from .model import SmartboxDevice, SmartboxNode
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,17 +36,13 @@ async def async_setup_platform(
         _LOGGER.debug("Creating away switch for device %s", device.name)
         switch_entities.append(AwaySwitch(device))
 
-    for node in hass.data[DOMAIN][SMARTBOX_NODES]:
-        if window_mode_available(node):
-            _LOGGER.debug("Creating window_mode switch for node %s", node.name)
-            switch_entities.append(WindowModeSwitch(node))
-        else:
-            _LOGGER.info("Window mode not available for node %s", node.name)
-        if true_radiant_available(node):
-            _LOGGER.debug("Creating true_radiant switch for node %s", node.name)
-            switch_entities.append(TrueRadiantSwitch(node))
-        else:
-            _LOGGER.info("True radiant not available for node %s", node.name)
+    node_index = hass.data[DOMAIN][SMARTBOX_NODE_INDEX]
+    for node in node_index.with_switch(SWITCH_WINDOW_MODE):
+        _LOGGER.debug("Creating window_mode switch for node %s", node.name)
+        switch_entities.append(WindowModeSwitch(node))
+    for node in node_index.with_switch(SWITCH_TRUE_RADIANT):
+        _LOGGER.debug("Creating true_radiant switch for node %s", node.name)
+        switch_entities.append(TrueRadiantSwitch(node))
 
     async_add_entities(switch_entities, True)
 
@@ -55,6 +54,20 @@ class AwaySwitch(SwitchEntity):
 
     def __init__(self, device: Union[SmartboxDevice, MagicMock]) -> None:
         self._device = device
+        self._unique_id = f"{device.dev_id}_away_status"
+
+    @property
+    def should_poll(self) -> bool:
+        # Device updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._device.subscribe(INTEREST_AWAY, self._device_updated)
+        )
+
+    def _device_updated(self) -> None:
+        self.schedule_update_ha_state()
 
     @property
     def name(self):
@@ -63,15 +76,15 @@ class AwaySwitch(SwitchEntity):
 
     @property
     def unique_id(self) -> str:
-        return f"{self._device.dev_id}_away_status"
+        return self._unique_id
 
-    def turn_on(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Turn on the switch."""
-        return self._device.set_away_status(True)
+        await self._device.async_set_away_status(self.hass, True)
 
-    def turn_off(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Turn off the switch."""
-        return self._device.set_away_status(False)
+        await self._device.async_set_away_status(self.hass, False)
 
     @property
     def is_on(self):
@@ -84,6 +97,22 @@ class WindowModeSwitch(SwitchEntity):
 
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         self._node = node
+        self._unique_id = f"{node.node_id}_window_mode"
+
+    @property
+    def should_poll(self) -> bool:
+        # Node updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._node.subscribe(
+                INTEREST_SETUP, self._node_updated, ["window_mode_enabled"]
+            )
+        )
+
+    def _node_updated(self) -> None:
+        self.schedule_update_ha_state()
 
     @property
     def name(self):
@@ -92,15 +121,15 @@ class WindowModeSwitch(SwitchEntity):
 
     @property
     def unique_id(self) -> str:
-        return f"{self._node.node_id}_window_mode"
+        return self._unique_id
 
-    def turn_on(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Turn on the switch."""
-        return self._node.set_window_mode(True)
+        await self._node.async_set_window_mode(self.hass, True)
 
-    def turn_off(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Turn off the switch."""
-        return self._node.set_window_mode(False)
+        await self._node.async_set_window_mode(self.hass, False)
 
     @property
     def is_on(self):
@@ -113,6 +142,22 @@ class TrueRadiantSwitch(SwitchEntity):
 
     def __init__(self, node: Union[SmartboxNode, MagicMock]) -> None:
         self._node = node
+        self._unique_id = f"{node.node_id}_true_radiant"
+
+    @property
+    def should_poll(self) -> bool:
+        # Node updates are pushed to us
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._node.subscribe(
+                INTEREST_SETUP, self._node_updated, ["true_radiant_enabled"]
+            )
+        )
+
+    def _node_updated(self) -> None:
+        self.schedule_update_ha_state()
 
     @property
     def name(self):
@@ -121,15 +166,15 @@ class TrueRadiantSwitch(SwitchEntity):
 
     @property
     def unique_id(self) -> str:
-        return f"{self._node.node_id}_true_radiant"
+        return self._unique_id
 
-    def turn_on(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Turn on the switch."""
-        return self._node.set_true_radiant(True)
+        await self._node.async_set_true_radiant(self.hass, True)
 
-    def turn_off(self, **kwargs):  # pylint: disable=unused-argument
+    async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Turn off the switch."""
-        return self._node.set_true_radiant(False)
+        await self._node.async_set_true_radiant(self.hass, False)
 
     @property
     def is_on(self):
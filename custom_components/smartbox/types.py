@@ -1,7 +1,13 @@
-from typing import Dict, Union
+from typing import Dict, List, Union
 
 FactoryOptionsDict = Dict[str, bool]
 
 SetupDict = Dict[str, Union[bool, float, str, FactoryOptionsDict]]
 
 StatusDict = Dict[str, Union[bool, int, float, str]]
+
+NodeInfoDict = Dict[str, Union[int, str]]
+
+CachedNodeDict = Dict[str, Union[NodeInfoDict, SetupDict, StatusDict]]
+
+CachedDeviceDict = Dict[str, Union[str, List[CachedNodeDict]]]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Measure the memory overhead of Smartbox node objects
+
+Creates a device with many simulated nodes and reports the memory allocated
+per node, as measured by tracemalloc. Run from the repository root:
+
+    python scripts/benchmark_node_memory.py [--nodes 10000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.smartbox.const import (  # noqa: E402
+    HEATER_NODE_TYPE_ACM,
+    HEATER_NODE_TYPE_HTR,
+    HEATER_NODE_TYPE_HTR_MOD,
+)
+from custom_components.smartbox.model import SmartboxDevice, SmartboxNode  # noqa: E402
+from custom_components.smartbox.settings import SmartboxSettings  # noqa: E402
+
+NODE_TYPES = [HEATER_NODE_TYPE_ACM, HEATER_NODE_TYPE_HTR, HEATER_NODE_TYPE_HTR_MOD]
+
+
+def _node_status(node_type: str) -> dict:
+    status = {
+        "mtemp": "19.5",
+        "units": "C",
+        "sync_status": "ok",
+        "locked": False,
+        "power": "854",
+        "mode": "auto",
+    }
+    if node_type == HEATER_NODE_TYPE_ACM:
+        status["charging"] = True
+        status["charge_level"] = 4
+    else:
+        status["active"] = True
+    if node_type == HEATER_NODE_TYPE_HTR:
+        status["duty"] = 18
+    if node_type == HEATER_NODE_TYPE_HTR_MOD:
+        status["on"] = True
+        status["selected_temp"] = "comfort"
+        status["comfort_temp"] = "22"
+        status["eco_offset"] = "2"
+    else:
+        status["stemp"] = "20"
+    return status
+
+
+def _node_setup() -> dict:
+    return {
+        "factory_options": {
+            "true_radiant_available": True,
+            "window_mode_available": True,
+        },
+        "true_radiant_enabled": False,
+        "window_mode_enabled": False,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=10000)
+    args = parser.parse_args()
+
+    device = SmartboxDevice("benchmark_device", "Benchmark", None, SmartboxSettings())
+    # Build the inputs before tracing, since in practice they come from the
+    # API responses rather than being allocated by the nodes
+    inputs = [
+        (
+            {
+                "addr": addr,
+                "name": f"Heater {addr}",
+                "type": NODE_TYPES[addr % len(NODE_TYPES)],
+            },
+            _node_status(NODE_TYPES[addr % len(NODE_TYPES)]),
+            _node_setup(),
+        )
+        for addr in range(args.nodes)
+    ]
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    nodes = [
+        SmartboxNode(device, node_info, None, status, setup)
+        for node_info, status, setup in inputs
+    ]
+    # Entities read these when they are created
+    for node in nodes:
+        node.node_id
+        node.snapshot
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = end - start
+    print(f"nodes:          {len(nodes)}")
+    print(f"total:          {total / 1024:.1f} KiB (peak {peak / 1024:.1f} KiB)")
+    print(f"per node:       {total / len(nodes):.0f} bytes")
+    print(f"node has dict:  {hasattr(nodes[0], '__dict__')}")
+
+
+if __name__ == "__main__":
+    main()
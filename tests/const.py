@@ -5,13 +5,19 @@ from custom_components.smartbox.const import (
     CONF_ACCOUNTS,
     CONF_API_NAME,
     CONF_BASIC_AUTH_CREDS,
+    CONF_COMMAND_DEBOUNCE,
     CONF_DEVICE_IDS,
+    CONF_DEVICE_INIT_CONCURRENCY,
+    CONF_DEVICE_INIT_TIMEOUT,
+    CONF_NODE_FETCH_CONCURRENCY,
     CONF_PASSWORD,
-    CONF_USERNAME,
-    CONF_SESSION_RETRY_ATTEMPTS,
+    CONF_PENDING_WRITE_TIMEOUT,
     CONF_SESSION_BACKOFF_FACTOR,
-    CONF_SOCKET_RECONNECT_ATTEMPTS,
+    CONF_SESSION_RETRY_ATTEMPTS,
     CONF_SOCKET_BACKOFF_FACTOR,
+    CONF_SOCKET_RECONNECT_ATTEMPTS,
+    CONF_UPDATE_COALESCE_WINDOW,
+    CONF_USERNAME,
     HEATER_NODE_TYPE_ACM,
     HEATER_NODE_TYPE_HTR,
     HEATER_NODE_TYPE_HTR_MOD,
@@ -29,6 +35,12 @@ TEST_CONFIG_1 = {
                 CONF_SESSION_BACKOFF_FACTOR: 0.1,
                 CONF_SOCKET_RECONNECT_ATTEMPTS: 3,
                 CONF_SOCKET_BACKOFF_FACTOR: 0.2,
+                CONF_NODE_FETCH_CONCURRENCY: 2,
+                CONF_DEVICE_INIT_CONCURRENCY: 1,
+                CONF_DEVICE_INIT_TIMEOUT: 10.0,
+                CONF_UPDATE_COALESCE_WINDOW: 0.05,
+                CONF_COMMAND_DEBOUNCE: 0.2,
+                CONF_PENDING_WRITE_TIMEOUT: 5.0,
             },
         ],
         CONF_BASIC_AUTH_CREDS: "test_basic_auth_creds",
@@ -47,6 +59,12 @@ TEST_CONFIG_2 = {
                 CONF_SESSION_BACKOFF_FACTOR: 0.2,
                 CONF_SOCKET_RECONNECT_ATTEMPTS: 4,
                 CONF_SOCKET_BACKOFF_FACTOR: 0.3,
+                CONF_NODE_FETCH_CONCURRENCY: 3,
+                CONF_DEVICE_INIT_CONCURRENCY: 2,
+                CONF_DEVICE_INIT_TIMEOUT: 20.0,
+                CONF_UPDATE_COALESCE_WINDOW: 0.1,
+                CONF_COMMAND_DEBOUNCE: 0.3,
+                CONF_PENDING_WRITE_TIMEOUT: 6.0,
             },
             {
                 CONF_API_NAME: "test_api_name_2",
@@ -57,6 +75,12 @@ TEST_CONFIG_2 = {
                 CONF_SESSION_BACKOFF_FACTOR: 0.3,
                 CONF_SOCKET_RECONNECT_ATTEMPTS: 5,
                 CONF_SOCKET_BACKOFF_FACTOR: 0.4,
+                CONF_NODE_FETCH_CONCURRENCY: 4,
+                CONF_DEVICE_INIT_CONCURRENCY: 3,
+                CONF_DEVICE_INIT_TIMEOUT: 30.0,
+                CONF_UPDATE_COALESCE_WINDOW: 0.15,
+                CONF_COMMAND_DEBOUNCE: 0.4,
+                CONF_PENDING_WRITE_TIMEOUT: 7.0,
             },
         ],
         CONF_BASIC_AUTH_CREDS: "test_basic_auth_creds",
@@ -75,6 +99,12 @@ TEST_CONFIG_3 = {
                 CONF_SESSION_BACKOFF_FACTOR: 0.4,
                 CONF_SOCKET_RECONNECT_ATTEMPTS: 6,
                 CONF_SOCKET_BACKOFF_FACTOR: 0.5,
+                CONF_NODE_FETCH_CONCURRENCY: 5,
+                CONF_DEVICE_INIT_CONCURRENCY: 4,
+                CONF_DEVICE_INIT_TIMEOUT: 40.0,
+                CONF_UPDATE_COALESCE_WINDOW: 0.2,
+                CONF_COMMAND_DEBOUNCE: 0.5,
+                CONF_PENDING_WRITE_TIMEOUT: 8.0,
             },
         ],
         CONF_BASIC_AUTH_CREDS: "test_basic_auth_creds",
@@ -93,6 +123,12 @@ MOCK_SMARTBOX_CONFIG = {
                 CONF_SESSION_BACKOFF_FACTOR: 0.4,
                 CONF_SOCKET_RECONNECT_ATTEMPTS: 6,
                 CONF_SOCKET_BACKOFF_FACTOR: 0.5,
+                CONF_NODE_FETCH_CONCURRENCY: 6,
+                CONF_DEVICE_INIT_CONCURRENCY: 5,
+                CONF_DEVICE_INIT_TIMEOUT: 50.0,
+                CONF_UPDATE_COALESCE_WINDOW: 0.0,
+                CONF_COMMAND_DEBOUNCE: 0.0,
+                CONF_PENDING_WRITE_TIMEOUT: 0.0,
             },
         ],
         CONF_BASIC_AUTH_CREDS: "test_basic_auth_creds",
@@ -8,6 +8,7 @@ from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.helpers import entity_registry
+from custom_components.smartbox.command_queue import CommandQueue
 from custom_components.smartbox.const import (
     DOMAIN,
     CONF_ACCOUNTS,
@@ -15,7 +16,9 @@ from custom_components.smartbox.const import (
     HEATER_NODE_TYPE_ACM,
     HEATER_NODE_TYPE_HTR,
     HEATER_NODE_TYPE_HTR_MOD,
+    HEATER_NODE_TYPES,
 )
+from custom_components.smartbox.node_types import get_node_type_strategy
 from custom_components.smartbox.types import SetupDict, StatusDict
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,6 +29,8 @@ def mock_device(dev_id: str, nodes: List[MagicMock]) -> MagicMock:
     dev.dev_id = dev_id
     dev.get_nodes = MagicMock(return_value=nodes)
     dev.initialise_nodes = AsyncMock()
+    dev.command_queue = CommandQueue(dev_id, 1)
+    dev.setup_calls_saved = 0
     return dev
 
 
@@ -57,7 +62,13 @@ def mock_node(dev_id: str, addr: int, node_type: str, mode="auto") -> MagicMock:
     else:
         node.status["stemp"] = "20"
 
-    node.async_update = AsyncMock(return_value=node.status)
+    node.strategy = get_node_type_strategy(node_type)
+    node.capabilities = node.strategy.capabilities({})
+    node.snapshot = node.strategy.decode_status(node.status)
+    if node_type in HEATER_NODE_TYPES:
+        node.climate_state = node.strategy.climate_state(
+            node.status, node.snapshot, node.away
+        )
     return node
 
 
@@ -252,6 +263,10 @@ class MockSmartbox(object):
     def get_socket(self, dev_id: str):
         return self._sockets[dev_id]
 
+    def reset_sockets(self) -> None:
+        """Forget created sockets, as if Home Assistant had restarted"""
+        self._sockets.clear()
+
     def get_devices(self):
         return self._devices
 
@@ -0,0 +1,213 @@
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.storage import Store
+
+from custom_components.smartbox.cache import (
+    DiscoveryCache,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from custom_components.smartbox.const import (
+    DOMAIN,
+    CONF_ACCOUNTS,
+    CONF_API_NAME,
+    CONF_BASIC_AUTH_CREDS,
+    CONF_DEVICE_IDS,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+)
+from custom_components.smartbox.model import get_devices
+from custom_components.smartbox.settings import SmartboxSettings
+
+from mocks import mock_device, mock_node
+
+
+async def _get_devices(hass, mock_smartbox, cache):
+    account = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0]
+    return await get_devices(
+        hass,
+        account[CONF_API_NAME],
+        mock_smartbox.config[DOMAIN][CONF_BASIC_AUTH_CREDS],
+        account[CONF_USERNAME],
+        account[CONF_PASSWORD],
+        account[CONF_DEVICE_IDS],
+        SmartboxSettings.from_config(account),
+        cache,
+    )
+
+
+async def test_discovery_cache(hass, hass_storage):
+    dev_id = "test_device_id_1"
+    node = mock_node(dev_id, 1, "htr")
+    node.node_info = {"addr": 1, "type": "htr", "name": "node_1"}
+    node.setup = {"true_radiant_enabled": False}
+    node.status_version = 0
+    node.setup_version = 0
+    dev = mock_device(dev_id, [node])
+    dev.name = "Device 1"
+
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    assert cache.get_device(dev_id) is None
+
+    cache.track_device(dev)
+    await cache.async_save()
+    assert hass_storage[STORAGE_KEY]["version"] == STORAGE_VERSION
+
+    # saves are skipped unless some node state has changed
+    del hass_storage[STORAGE_KEY]
+    await cache.async_save()
+    assert STORAGE_KEY not in hass_storage
+    node.status_version = 1
+    await cache.async_save()
+    assert STORAGE_KEY in hass_storage
+
+    # a new cache picks up the saved state
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    assert cache.get_device(dev_id) == {
+        "name": "Device 1",
+        "nodes": [
+            {
+                "info": node.node_info,
+                "status": node.status,
+                "setup": node.setup,
+            }
+        ],
+    }
+
+
+async def test_discovery_cache_saved_on_stop(hass, hass_storage):
+    dev = mock_device("test_device_id_1", [])
+    dev.name = "Device 1"
+
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    cache.track_device(dev)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+    data = await store.async_load()
+    assert data == {"devices": {"test_device_id_1": {"name": "Device 1", "nodes": []}}}
+
+
+async def test_get_devices_warm_start(hass, hass_storage, mock_smartbox):
+    account = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0]
+
+    # cold start discovers devices and populates the cache
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    cold_devices = await _get_devices(hass, mock_smartbox, cache)
+    await hass.async_block_till_done()
+    mock_smartbox.session.get_devices.assert_called_once()
+    cached_devices = hass_storage[STORAGE_KEY]["data"]["devices"]
+    assert set(cached_devices.keys()) == set(account[CONF_DEVICE_IDS])
+
+    # warm start restores devices without any discovery requests
+    mock_smartbox.reset_sockets()
+    mock_smartbox.session.get_devices.reset_mock()
+    mock_smartbox.session.get_nodes.reset_mock()
+    mock_smartbox.session.get_status.reset_mock()
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    warm_devices = await _get_devices(hass, mock_smartbox, cache)
+    mock_smartbox.session.get_devices.assert_not_called()
+    mock_smartbox.session.get_nodes.assert_not_called()
+    mock_smartbox.session.get_status.assert_not_called()
+
+    assert [dev.dev_id for dev in warm_devices] == [dev.dev_id for dev in cold_devices]
+    for cold_dev, warm_dev in zip(cold_devices, warm_devices):
+        assert warm_dev.name == cold_dev.name
+        # restored nodes are unavailable until fresh status arrives
+        assert [
+            (node.node_id, node.node_type, node.name, node.status, node.setup)
+            for node in warm_dev.get_nodes()
+        ] == [
+            (
+                node.node_id,
+                node.node_type,
+                node.name,
+                {k: v for k, v in node.status.items() if k != "sync_status"},
+                node.setup,
+            )
+            for node in cold_dev.get_nodes()
+        ]
+        # but start receiving updates straight away
+        mock_smartbox.get_socket(warm_dev.dev_id)
+
+    # devices are revalidated in the background, including checking they
+    # still exist
+    await hass.async_block_till_done()
+    mock_smartbox.session.get_devices.assert_called_once()
+    for dev in warm_devices:
+        mock_smartbox.session.get_nodes.assert_any_call(dev.dev_id)
+        for node in dev.get_nodes():
+            assert node.status["sync_status"] == "ok"
+
+
+async def test_get_devices_warm_start_device_not_found(
+    hass, hass_storage, mock_smartbox, caplog
+):
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    await _get_devices(hass, mock_smartbox, cache)
+    await hass.async_block_till_done()
+
+    # the first device has gone from the account since it was cached
+    mock_smartbox.reset_sockets()
+    missing_dev_id = mock_smartbox.session.get_devices()[0]["dev_id"]
+    mock_smartbox.session.get_devices.return_value = [
+        dev
+        for dev in mock_smartbox.session.get_devices()
+        if dev["dev_id"] != missing_dev_id
+    ]
+    mock_smartbox.session.get_nodes.reset_mock()
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    warm_devices = await _get_devices(hass, mock_smartbox, cache)
+    await hass.async_block_till_done()
+
+    assert f"Configured device {missing_dev_id} was not found" in caplog.text
+    revalidated_dev_ids = [
+        call.args[0] for call in mock_smartbox.session.get_nodes.call_args_list
+    ]
+    assert missing_dev_id not in revalidated_dev_ids
+    for dev in warm_devices:
+        if dev.dev_id != missing_dev_id:
+            assert dev.dev_id in revalidated_dev_ids
+
+
+async def test_get_devices_warm_start_renamed(hass, hass_storage, mock_smartbox):
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    await _get_devices(hass, mock_smartbox, cache)
+    await hass.async_block_till_done()
+
+    # devices and nodes renamed in the app since they were cached
+    mock_smartbox.reset_sockets()
+    mock_smartbox.session.get_devices.return_value = [
+        {**dev, "name": f"{dev['name']} renamed"}
+        for dev in mock_smartbox.session.get_devices()
+    ]
+    get_nodes = mock_smartbox.session.get_nodes.side_effect
+    mock_smartbox.session.get_nodes.side_effect = lambda dev_id: [
+        {**node_info, "name": f"{node_info['name']} renamed"}
+        for node_info in get_nodes(dev_id)
+    ]
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    warm_devices = await _get_devices(hass, mock_smartbox, cache)
+    for dev in warm_devices:
+        assert not dev.name.endswith("renamed")
+
+    # names are refreshed when the devices are revalidated, and saved
+    await hass.async_block_till_done()
+    cached_devices = hass_storage[STORAGE_KEY]["data"]["devices"]
+    for dev in warm_devices:
+        assert dev.name.endswith("renamed")
+        assert cached_devices[dev.dev_id]["name"] == dev.name
+        for node, cached_node in zip(
+            dev.get_nodes(), cached_devices[dev.dev_id]["nodes"]
+        ):
+            assert node.name.endswith("renamed")
+            assert cached_node["info"]["name"] == node.name
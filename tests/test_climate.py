@@ -27,10 +27,6 @@ from homeassistant.components.climate.const import (
     SERVICE_SET_TEMPERATURE,
 )
 
-from custom_components.smartbox.climate import (
-    get_hvac_mode,
-    status_to_hvac_action,
-)
 from custom_components.smartbox.const import (
     HEATER_NODE_TYPE_HTR,
     HEATER_NODE_TYPE_ACM,
@@ -39,6 +35,7 @@ from custom_components.smartbox.const import (
     PRESET_SCHEDULE,
     PRESET_SELF_LEARN,
 )
+from custom_components.smartbox.node_types import get_node_type_strategy
 
 from mocks import (
     active_or_charging_update,
@@ -54,39 +51,28 @@ from test_utils import assert_no_log_errors, convert_temp, round_temp
 _LOGGER = logging.getLogger(__name__)
 
 
-def test_status_to_hvac_action():
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_HTR, {"active": True})
-        == HVACAction.HEATING
-    )
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_HTR, {"active": False})
-        == HVACAction.IDLE
-    )
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_ACM, {"charging": True})
-        == HVACAction.HEATING
-    )
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_ACM, {"charging": False})
-        == HVACAction.IDLE
-    )
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_HTR_MOD, {"active": True})
-        == HVACAction.HEATING
-    )
-    assert (
-        status_to_hvac_action(HEATER_NODE_TYPE_HTR_MOD, {"active": False})
-        == HVACAction.IDLE
-    )
-    with pytest.raises(KeyError):
-        status_to_hvac_action(HEATER_NODE_TYPE_HTR, {})
-    with pytest.raises(KeyError):
-        status_to_hvac_action(HEATER_NODE_TYPE_ACM, {"active": True})
+def test_climate_state_hvac_action():
+    for node_type, heating_key in (
+        (HEATER_NODE_TYPE_HTR, "active"),
+        (HEATER_NODE_TYPE_ACM, "charging"),
+        (HEATER_NODE_TYPE_HTR_MOD, "active"),
+    ):
+        strategy = get_node_type_strategy(node_type)
+        for heating, hvac_action in (
+            (True, HVACAction.HEATING),
+            (False, HVACAction.IDLE),
+        ):
+            status = {"mode": "auto", "on": True, heating_key: heating}
+            climate_state = strategy.climate_state(
+                status, strategy.decode_status(status), False
+            )
+            assert climate_state.hvac_action == hvac_action
 
 
 def _check_state(hass, mock_node, mock_node_status, state):
-    assert state.state == get_hvac_mode(mock_node["type"], mock_node_status)
+    assert state.state == get_node_type_strategy(mock_node["type"]).hvac_mode(
+        mock_node_status
+    )
     assert state.attributes[ATTR_LOCKED] == mock_node_status["locked"]
 
     assert round_temp(hass, state.attributes[ATTR_CURRENT_TEMPERATURE]) == round_temp(
@@ -114,8 +100,10 @@ def _check_state(hass, mock_node, mock_node_status, state):
         convert_temp(hass, mock_node_status["units"], target_temp),
     )
 
-    assert state.attributes[ATTR_HVAC_ACTION] == status_to_hvac_action(
-        mock_node["type"], mock_node_status
+    assert state.attributes[ATTR_HVAC_ACTION] == (
+        HVACAction.HEATING
+        if get_node_type_strategy(mock_node["type"]).is_heating(mock_node_status)
+        else HVACAction.IDLE
     )
 
 
@@ -154,7 +142,7 @@ async def test_basic(hass, mock_smartbox, caplog):
                 {"mtemp": str(float(mock_node_status["mtemp"]) + 1)},
             )
 
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             new_state = hass.states.get(entity_id)
             assert (
                 new_state.attributes[ATTR_CURRENT_TEMPERATURE]
@@ -183,14 +171,14 @@ async def test_unavailable(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             _check_state(hass, mock_node, mock_node_status, state)
 
@@ -240,14 +228,14 @@ async def test_away(hass, mock_smartbox):
     # check all device_1's climate entities are away but device_2's are not
     for mock_node in mock_smartbox.session.get_nodes(mock_device_1["dev_id"]):
         entity_id = get_climate_entity_id(mock_node)
-        await hass.helpers.entity_component.async_update_entity(entity_id)
+        await hass.async_block_till_done()
         state = hass.states.get(entity_id)
         assert state.attributes[ATTR_PRESET_MODE] == PRESET_AWAY
     # but all device_2's should still be home
     mock_device_2 = mock_smartbox.session.get_devices()[1]
     for mock_node in mock_smartbox.session.get_nodes(mock_device_2["dev_id"]):
         entity_id = get_climate_entity_id(mock_node)
-        await hass.helpers.entity_component.async_update_entity(entity_id)
+        await hass.async_block_till_done()
         state = hass.states.get(entity_id)
         mock_node_status = mock_smartbox.session.get_status(
             mock_device["dev_id"], mock_node
@@ -284,18 +272,19 @@ async def test_away_preset(hass, mock_smartbox):
         {ATTR_PRESET_MODE: PRESET_AWAY, ATTR_ENTITY_ID: entity_id_device_1_node_0},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     # check all device_1's climate entities are away but device_2's are not
     for mock_node in mock_smartbox.session.get_nodes(mock_device_1["dev_id"]):
         entity_id = get_climate_entity_id(mock_node)
-        await hass.helpers.entity_component.async_update_entity(entity_id)
+        await hass.async_block_till_done()
         state = hass.states.get(entity_id)
         assert state.attributes[ATTR_PRESET_MODE] == PRESET_AWAY
     # but all device_2's should still be home
     mock_device_2 = mock_smartbox.session.get_devices()[1]
     for mock_node in mock_smartbox.session.get_nodes(mock_device_2["dev_id"]):
         entity_id = get_climate_entity_id(mock_node)
-        await hass.helpers.entity_component.async_update_entity(entity_id)
+        await hass.async_block_till_done()
         state = hass.states.get(entity_id)
         mock_node_status = mock_smartbox.session.get_status(
             mock_device["dev_id"], mock_node
@@ -304,14 +293,14 @@ async def test_away_preset(hass, mock_smartbox):
             mock_node["type"], mock_node_status, state.attributes[ATTR_PRESET_MODE]
         )
 
-    # Set a node on device_1 back to home (it's not an htr_mod device,
-    # otherwise PRESET_HOME would be invalid)
+    # Set a node on device_1 back to home
     await hass.services.async_call(
         CLIMATE_DOMAIN,
         SERVICE_SET_PRESET_MODE,
         {ATTR_PRESET_MODE: PRESET_HOME, ATTR_ENTITY_ID: entity_id_device_1_node_0},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     # test nothing is now away
     for mock_device in mock_smartbox.session.get_devices():
@@ -345,6 +334,7 @@ async def test_schedule_preset(hass, mock_smartbox):
         {ATTR_PRESET_MODE: PRESET_SCHEDULE, ATTR_ENTITY_ID: entity_id_device_2_node_1},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_1)
     state = hass.states.get(entity_id_device_2_node_1)
@@ -376,6 +366,7 @@ async def test_self_learn_preset(hass, mock_smartbox):
         },
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_1)
     state = hass.states.get(entity_id_device_2_node_1)
@@ -407,6 +398,7 @@ async def test_activity_preset(hass, mock_smartbox):
         },
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_1)
     state = hass.states.get(entity_id_device_2_node_1)
@@ -438,6 +430,7 @@ async def test_comfort_preset(hass, mock_smartbox):
         },
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_2)
     state = hass.states.get(entity_id_device_2_node_2)
@@ -470,6 +463,7 @@ async def test_eco_preset(hass, mock_smartbox):
         },
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_1)
     state = hass.states.get(entity_id_device_2_node_1)
@@ -502,6 +496,7 @@ async def test_frost_preset(hass, mock_smartbox):
         },
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     await hass.helpers.entity_component.async_update_entity(entity_id_device_2_node_2)
     state = hass.states.get(entity_id_device_2_node_2)
@@ -536,7 +531,7 @@ async def test_bad_preset(hass, mock_smartbox):
             },
             blocking=True,
         )
-    assert "Unsupported preset_mode frost for acm node" in exc_info.exconly()
+    assert "acm nodes do not support preset frost" in exc_info.exconly()
 
 
 async def test_set_hvac_mode(hass, mock_smartbox):
@@ -549,6 +544,7 @@ async def test_set_hvac_mode(hass, mock_smartbox):
         {ATTR_HVAC_MODE: HVACMode.AUTO, ATTR_ENTITY_ID: ENTITY_MATCH_ALL},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     for mock_device in mock_smartbox.session.get_devices():
         for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"]):
@@ -568,6 +564,7 @@ async def test_set_hvac_mode(hass, mock_smartbox):
         {ATTR_HVAC_MODE: HVACMode.HEAT, ATTR_ENTITY_ID: ENTITY_MATCH_ALL},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     for mock_device in mock_smartbox.session.get_devices():
         for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"]):
@@ -588,6 +585,7 @@ async def test_set_hvac_mode(hass, mock_smartbox):
         {ATTR_HVAC_MODE: HVACMode.OFF, ATTR_ENTITY_ID: ENTITY_MATCH_ALL},
         blocking=True,
     )
+    await hass.async_block_till_done()
 
     for mock_device in mock_smartbox.session.get_devices():
         for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"]):
@@ -644,6 +642,7 @@ async def test_set_target_temp(hass, mock_smartbox):
                     },
                     blocking=True,
                 )
+                await hass.async_block_till_done()
 
                 await hass.helpers.entity_component.async_update_entity(entity_id)
                 state = hass.states.get(entity_id)
@@ -664,7 +663,7 @@ async def test_hvac_action(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], False),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.attributes[ATTR_HVAC_ACTION] == HVACAction.IDLE
 
@@ -673,7 +672,7 @@ async def test_hvac_action(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], True),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.attributes[ATTR_HVAC_ACTION] == HVACAction.HEATING
 
@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+import threading
+
+from custom_components.smartbox.command_queue import CommandLimit, CommandQueue
+from custom_components.smartbox.const import (
+    COMMAND_PRIORITY_DEVICE,
+    COMMAND_PRIORITY_NODE,
+    DOMAIN,
+    SMARTBOX_COMMAND_LIMIT,
+)
+
+
+def _command_recorder():
+    release = threading.Event()
+    calls = []
+
+    def _command(name: str, block: bool = False) -> str:
+        if block:
+            release.wait(5)
+        calls.append(name)
+        return name
+
+    return _command, release, calls
+
+
+async def test_command_queue_priorities(hass):
+    command, release, calls = _command_recorder()
+    queue = CommandQueue("test_device_id_1", 1)
+
+    first = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "first", True)
+    )
+    await asyncio.sleep(0)
+    node_2 = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 2), command, "node_2")
+    )
+    away = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_DEVICE, "away", command, "away")
+    )
+    await asyncio.sleep(0)
+    metrics = queue.metrics
+    assert metrics.in_flight == 1
+    assert metrics.depth == 2
+    assert metrics.depth_by_priority == {
+        COMMAND_PRIORITY_DEVICE: 1,
+        COMMAND_PRIORITY_NODE: 1,
+    }
+
+    # device wide commands go ahead of node commands queued before them
+    release.set()
+    assert await first == "first"
+    assert await away == "away"
+    assert await node_2 == "node_2"
+    assert calls == ["first", "away", "node_2"]
+    metrics = queue.metrics
+    assert metrics.depth == 0
+    assert metrics.in_flight == 0
+    assert metrics.max_depth == 2
+    assert metrics.completed == 3
+
+
+async def test_command_queue_node_ordering(hass):
+    command, release, calls = _command_recorder()
+    queue = CommandQueue("test_device_id_1", 2)
+
+    first = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "first", True)
+    )
+    second = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "second")
+    )
+    other = hass.async_create_task(
+        queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 2), command, "other")
+    )
+    await asyncio.sleep(0)
+    assert queue.in_flight == 2
+    assert queue.depth == 1
+
+    # commands for other nodes aren't held up, but the node's own are
+    assert await other == "other"
+    assert queue.depth == 1
+    release.set()
+    await asyncio.gather(first, second)
+    assert calls == ["other", "first", "second"]
+
+
+async def test_command_queue_shared_limit(hass):
+    command, release, calls = _command_recorder()
+    hass.data[DOMAIN] = {SMARTBOX_COMMAND_LIMIT: CommandLimit(1)}
+    queue_1 = CommandQueue("test_device_id_1", 2)
+    queue_2 = CommandQueue("test_device_id_2", 2)
+
+    first = hass.async_create_task(
+        queue_1.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "first", True)
+    )
+    await asyncio.sleep(0)
+    second = hass.async_create_task(
+        queue_2.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "second")
+    )
+    await asyncio.sleep(0.05)
+    # the other device's command waits for the integration wide limit in its
+    # queue rather than taking another executor thread
+    assert queue_2.in_flight == 0
+    assert queue_2.depth == 1
+    assert calls == []
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert calls == ["first", "second"]
+    assert hass.data[DOMAIN][SMARTBOX_COMMAND_LIMIT].in_use == 0
+
+
+async def test_command_queue_shared_limit_priorities(hass):
+    command, release, calls = _command_recorder()
+    hass.data[DOMAIN] = {SMARTBOX_COMMAND_LIMIT: CommandLimit(1)}
+    queue_1 = CommandQueue("test_device_id_1", 2)
+    queue_2 = CommandQueue("test_device_id_2", 2)
+
+    first = hass.async_create_task(
+        queue_1.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "first", True)
+    )
+    await asyncio.sleep(0)
+    node_2 = hass.async_create_task(
+        queue_1.run(hass, COMMAND_PRIORITY_NODE, ("htr", 2), command, "node_2")
+    )
+    await asyncio.sleep(0)
+    away = hass.async_create_task(
+        queue_2.run(hass, COMMAND_PRIORITY_DEVICE, "away", command, "away")
+    )
+    await asyncio.sleep(0)
+    assert queue_1.in_flight == 1
+    assert queue_2.in_flight == 0
+
+    # device wide commands get the next free slot ahead of node commands for
+    # other devices queued before them
+    release.set()
+    await asyncio.gather(first, node_2, away)
+    assert calls == ["first", "away", "node_2"]
+
+
+async def test_command_queue_errors(hass):
+    def _failing_command() -> None:
+        raise ValueError("Test error")
+
+    command, _, calls = _command_recorder()
+    queue = CommandQueue("test_device_id_1", 1)
+    with pytest.raises(ValueError):
+        await queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), _failing_command)
+    # later commands still run
+    assert await queue.run(hass, COMMAND_PRIORITY_NODE, ("htr", 1), command, "next")
+    assert calls == ["next"]
+    assert queue.metrics.failed == 1
+    assert queue.metrics.completed == 1
@@ -1,28 +1,29 @@
 import logging
 import pytest
 from unittest.mock import patch
+import voluptuous as vol
 
 from homeassistant.setup import async_setup_component
 
 from smartbox import __version__ as SMARTBOX_VERSION
 
-from custom_components.smartbox import __version__
+from custom_components.smartbox import __version__, ACCOUNT_SCHEMA
 from custom_components.smartbox.const import (
     DOMAIN,
     CONF_ACCOUNTS,
     CONF_API_NAME,
     CONF_BASIC_AUTH_CREDS,
+    CONF_DEVICE_IDS,
+    CONF_DEVICE_INIT_TIMEOUT,
     CONF_PASSWORD,
     CONF_USERNAME,
-    CONF_SESSION_RETRY_ATTEMPTS,
-    CONF_SESSION_BACKOFF_FACTOR,
-    CONF_SOCKET_RECONNECT_ATTEMPTS,
-    CONF_SOCKET_BACKOFF_FACTOR,
     HEATER_NODE_TYPE_ACM,
     HEATER_NODE_TYPE_HTR,
     HEATER_NODE_TYPE_HTR_MOD,
     SMARTBOX_DEVICES,
+    SMARTBOX_DISCOVERY_CACHE,
 )
+from custom_components.smartbox.settings import SmartboxSettings
 from const import TEST_CONFIG_1, TEST_CONFIG_2, TEST_CONFIG_3
 from mocks import mock_device, mock_node
 from test_utils import assert_log_message
@@ -49,10 +50,9 @@ async def test_setup_basic(hass, caplog):
             TEST_CONFIG_1[DOMAIN][CONF_BASIC_AUTH_CREDS],
             TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_USERNAME],
             TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_PASSWORD],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_RETRY_ATTEMPTS],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_BACKOFF_FACTOR],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_RECONNECT_ATTEMPTS],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_BACKOFF_FACTOR],
+            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0]),
+            hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE],
         )
     assert mock_dev_1 in hass.data[DOMAIN][SMARTBOX_DEVICES]
 
@@ -95,10 +95,9 @@ async def test_setup_multiple_accounts_and_devices(hass):
             TEST_CONFIG_2[DOMAIN][CONF_BASIC_AUTH_CREDS],
             TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_USERNAME],
             TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_PASSWORD],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_RETRY_ATTEMPTS],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_BACKOFF_FACTOR],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_RECONNECT_ATTEMPTS],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_BACKOFF_FACTOR],
+            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0][CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0]),
+            hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE],
         )
         # second account
         get_devices_mock.assert_any_await(
@@ -107,16 +106,67 @@ async def test_setup_multiple_accounts_and_devices(hass):
             TEST_CONFIG_2[DOMAIN][CONF_BASIC_AUTH_CREDS],
             TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_USERNAME],
             TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_PASSWORD],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_SESSION_RETRY_ATTEMPTS],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_SESSION_BACKOFF_FACTOR],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_SOCKET_RECONNECT_ATTEMPTS],
-            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_SOCKET_BACKOFF_FACTOR],
+            TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1][CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1]),
+            hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE],
         )
     assert mock_dev_1 in hass.data[DOMAIN][SMARTBOX_DEVICES]
     assert mock_dev_2_1 in hass.data[DOMAIN][SMARTBOX_DEVICES]
     assert mock_dev_2_2 in hass.data[DOMAIN][SMARTBOX_DEVICES]
 
 
+# TODO: remove once switched to config flow
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_setup_failing_account(hass, caplog):
+    dev_2_1_id = "test_device_id_2_1"
+    mock_dev_2_1_node_1 = mock_node(dev_2_1_id, 1, HEATER_NODE_TYPE_HTR)
+    mock_dev_2_1 = mock_device(dev_2_1_id, [mock_dev_2_1_node_1])
+
+    dev_2_2_id = "test_device_id_2_2"
+    mock_dev_2_2_node_1 = mock_node(dev_2_2_id, 1, HEATER_NODE_TYPE_ACM)
+    mock_dev_2_2 = mock_device(dev_2_2_id, [mock_dev_2_2_node_1])
+
+    with patch(
+        "custom_components.smartbox.get_devices",
+        autospec=True,
+        side_effect=[RuntimeError("test error"), [mock_dev_2_1, mock_dev_2_2]],
+    ):
+        assert await async_setup_component(hass, "smartbox", TEST_CONFIG_2)
+
+    # the second account is still set up
+    assert hass.data[DOMAIN][SMARTBOX_DEVICES] == [mock_dev_2_1, mock_dev_2_2]
+
+    account_1 = TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][0]
+    account_2 = TEST_CONFIG_2[DOMAIN][CONF_ACCOUNTS][1]
+    messages = [
+        (level, message)
+        for module, level, message in caplog.record_tuples
+        if module == "custom_components.smartbox"
+    ]
+    assert any(
+        level == logging.ERROR
+        and message.startswith(
+            f"Error setting up account {account_1[CONF_USERNAME]}"
+            f" ({account_1[CONF_API_NAME]}) after "
+        )
+        for level, message in messages
+    )
+    assert any(
+        level == logging.INFO
+        and message.startswith(
+            f"Set up account {account_2[CONF_USERNAME]}"
+            f" ({account_2[CONF_API_NAME]}) with 2 device(s) in "
+        )
+        for level, message in messages
+    )
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox",
+        logging.ERROR,
+        "Configured device test_device_id_1 was not found",
+    )
+
+
 # TODO: remove once switched to config flow
 @pytest.mark.parametrize("expected_lingering_timers", [True])
 async def test_setup_missing_and_extra_devices(hass, caplog):
@@ -132,10 +182,11 @@ async def test_setup_missing_and_extra_devices(hass, caplog):
     mock_node_1 = mock_node(dev_3_id, 1, HEATER_NODE_TYPE_HTR)
     mock_dev_3 = mock_device(dev_3_id, [mock_node_1])
 
+    # get_devices only returns configured devices
     with patch(
         "custom_components.smartbox.get_devices",
         autospec=True,
-        return_value=[mock_dev_1, mock_dev_3],
+        return_value=[mock_dev_1],
     ) as get_devices_mock:
         assert await async_setup_component(hass, "smartbox", TEST_CONFIG_3)
         get_devices_mock.assert_any_await(
@@ -144,10 +195,9 @@ async def test_setup_missing_and_extra_devices(hass, caplog):
             TEST_CONFIG_3[DOMAIN][CONF_BASIC_AUTH_CREDS],
             TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_USERNAME],
             TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_PASSWORD],
-            TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_RETRY_ATTEMPTS],
-            TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_BACKOFF_FACTOR],
-            TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_RECONNECT_ATTEMPTS],
-            TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_BACKOFF_FACTOR],
+            TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0][CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(TEST_CONFIG_3[DOMAIN][CONF_ACCOUNTS][0]),
+            hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE],
         )
     assert mock_dev_1 in hass.data[DOMAIN][SMARTBOX_DEVICES]
     assert mock_dev_3 not in hass.data[DOMAIN][SMARTBOX_DEVICES]
@@ -158,18 +208,10 @@ async def test_setup_missing_and_extra_devices(hass, caplog):
         logging.ERROR,
         f"Configured device {dev_2_id} was not found",
     )
-    assert_log_message(
-        caplog,
-        "custom_components.smartbox",
-        logging.WARNING,
-        f"Found device {dev_3_id} which was not configured - ignoring",
-    )
     # Check there are no other errors
     for module, level, message in caplog.record_tuples:
         if module == "custom_components.smartbox" and level == logging.ERROR:
-            assert message.startswith("Configured device") or message.startswith(
-                "Found device"
-            )
+            assert message.startswith("Configured device")
 
 
 # TODO: remove once switched to config flow
@@ -192,10 +234,9 @@ async def test_setup_unsupported_nodes(hass, caplog):
             TEST_CONFIG_1[DOMAIN][CONF_BASIC_AUTH_CREDS],
             TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_USERNAME],
             TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_PASSWORD],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_RETRY_ATTEMPTS],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_BACKOFF_FACTOR],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_RECONNECT_ATTEMPTS],
-            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_BACKOFF_FACTOR],
+            TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0][CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0]),
+            hass.data[DOMAIN][SMARTBOX_DISCOVERY_CACHE],
         )
     assert_log_message(
         caplog,
@@ -204,3 +245,10 @@ async def test_setup_unsupported_nodes(hass, caplog):
         'Nodes of type "test_unsupported_node" are not yet supported; '
         "no entities will be created. Please file an issue on GitHub.",
     )
+
+
+def test_device_init_timeout_must_be_positive():
+    account = dict(TEST_CONFIG_1[DOMAIN][CONF_ACCOUNTS][0])
+    account[CONF_DEVICE_INIT_TIMEOUT] = 0
+    with pytest.raises(vol.Invalid):
+        ACCOUNT_SCHEMA(account)
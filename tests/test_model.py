@@ -1,6 +1,11 @@
+import asyncio
+from dataclasses import replace
 import logging
 import pytest
+import threading
+import time
 from unittest.mock import (
+    AsyncMock,
     MagicMock,
     NonCallableMock,
     patch,
@@ -10,57 +15,68 @@ from homeassistant.components.climate.const import (
     HVAC_MODE_AUTO,
     HVAC_MODE_HEAT,
     HVAC_MODE_OFF,
+    HVACAction,
     PRESET_ACTIVITY,
     PRESET_AWAY,
     PRESET_COMFORT,
     PRESET_ECO,
     PRESET_HOME,
 )
+from homeassistant.const import TEMP_CELSIUS, TEMP_FAHRENHEIT
 from custom_components.smartbox.const import (
     DOMAIN,
+    COMMAND_PRIORITY_NODE,
     CONF_ACCOUNTS,
     CONF_API_NAME,
     CONF_BASIC_AUTH_CREDS,
+    CONF_DEVICE_IDS,
     CONF_PASSWORD,
     CONF_USERNAME,
-    CONF_SESSION_RETRY_ATTEMPTS,
-    CONF_SESSION_BACKOFF_FACTOR,
-    CONF_SOCKET_RECONNECT_ATTEMPTS,
-    CONF_SOCKET_BACKOFF_FACTOR,
     HEATER_NODE_TYPE_ACM,
     HEATER_NODE_TYPE_HTR,
     HEATER_NODE_TYPE_HTR_MOD,
+    INTEREST_AWAY,
+    INTEREST_POWER_LIMIT,
+    INTEREST_SETUP,
+    INTEREST_STATUS,
+    MAX_CONCURRENT_DEVICE_COMMANDS,
     PRESET_FROST,
     PRESET_SCHEDULE,
     PRESET_SELF_LEARN,
+    SWITCH_TRUE_RADIANT,
+    SWITCH_WINDOW_MODE,
 )
 from custom_components.smartbox.model import (
     create_smartbox_device,
     get_devices,
-    get_hvac_mode,
-    get_preset_mode,
-    get_preset_modes,
-    get_target_temperature,
     is_heater_node,
-    is_heating,
     is_supported_node,
-    set_hvac_mode_args,
-    set_preset_mode_status_update,
-    set_temperature_args,
     SmartboxDevice,
     SmartboxNode,
 )
+from custom_components.smartbox.node_types import get_node_type_strategy
+from custom_components.smartbox.settings import SmartboxSettings
+from custom_components.smartbox.status import TemperatureUnit
 
 from mocks import mock_device, mock_node
 from test_utils import assert_log_message
 
 _LOGGER = logging.getLogger(__name__)
 
+# Devices in tests don't coalesce updates, debounce commands or time out
+# pending writes unless a test needs them to, so they leave no timers behind
+TEST_SETTINGS = SmartboxSettings(
+    update_coalesce_window=0, command_debounce=0, pending_write_timeout=0
+)
+
+HTR_STRATEGY = get_node_type_strategy(HEATER_NODE_TYPE_HTR)
+ACM_STRATEGY = get_node_type_strategy(HEATER_NODE_TYPE_ACM)
+HTR_MOD_STRATEGY = get_node_type_strategy(HEATER_NODE_TYPE_HTR_MOD)
+
 
 async def test_create_smartbox_device(hass):
     dev_1_id = "test_device_id_1"
-    reconnect_attempts = 3
-    backoff_factor = 0.1
+    settings = SmartboxSettings()
     mock_dev = mock_device(dev_1_id, [])
     mock_session = MagicMock()
     with patch(
@@ -69,34 +85,24 @@ async def test_create_smartbox_device(hass):
         return_value=mock_dev,
     ) as device_ctor_mock:
         device = await create_smartbox_device(
-            hass, dev_1_id, "Device 1", mock_session, reconnect_attempts, backoff_factor
+            hass, dev_1_id, "Device 1", mock_session, settings
         )
         device_ctor_mock.assert_called_with(
-            dev_1_id, "Device 1", mock_session, reconnect_attempts, backoff_factor
+            dev_1_id, "Device 1", mock_session, settings
         )
         mock_dev.initialise_nodes.assert_awaited_with(hass)
         assert device == mock_dev
 
 
 async def test_get_devices(hass, mock_smartbox):
+    account = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0]
     dev_1_id = "test_device_id_1"
     dev_1_name = "Device 1"
     dev_2_id = "test_device_id_2"  # missing
     dev_2_name = "Device 2"  # missing
-    reconnect_attempts = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][
-        CONF_SOCKET_RECONNECT_ATTEMPTS
-    ]
-    backoff_factor = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][
-        CONF_SOCKET_BACKOFF_FACTOR
-    ]
+    settings = SmartboxSettings.from_config(account)
     test_devices = [
-        SmartboxDevice(
-            dev["dev_id"],
-            dev["name"],
-            mock_smartbox.session,
-            reconnect_attempts,
-            backoff_factor,
-        )
+        SmartboxDevice(dev["dev_id"], dev["name"], mock_smartbox.session, settings)
         for dev in mock_smartbox.session.get_devices()
     ]
     with patch(
@@ -107,38 +113,120 @@ async def test_get_devices(hass, mock_smartbox):
         # check we called the smartbox API correctly
         devices = await get_devices(
             hass,
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_API_NAME],
+            account[CONF_API_NAME],
             mock_smartbox.config[DOMAIN][CONF_BASIC_AUTH_CREDS],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_USERNAME],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_PASSWORD],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_RETRY_ATTEMPTS],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_SESSION_BACKOFF_FACTOR],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][
-                CONF_SOCKET_RECONNECT_ATTEMPTS
-            ],
-            mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0][CONF_SOCKET_BACKOFF_FACTOR],
+            account[CONF_USERNAME],
+            account[CONF_PASSWORD],
+            account[CONF_DEVICE_IDS],
+            settings,
+            None,
         )
 
         # check we created the devices
         create_smartbox_device_mock.assert_any_await(
-            hass,
-            dev_1_id,
-            dev_1_name,
-            mock_smartbox.session,
-            reconnect_attempts,
-            backoff_factor,
+            hass, dev_1_id, dev_1_name, mock_smartbox.session, settings
         )
         create_smartbox_device_mock.assert_any_await(
-            hass,
-            dev_2_id,
-            dev_2_name,
-            mock_smartbox.session,
-            reconnect_attempts,
-            backoff_factor,
+            hass, dev_2_id, dev_2_name, mock_smartbox.session, settings
         )
         assert devices == test_devices
 
 
+async def test_get_devices_unconfigured(hass, mock_smartbox, caplog):
+    account = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0]
+    dev_1_id = "test_device_id_1"
+    dev_2_id = "test_device_id_2"
+    mock_dev_1 = mock_device(dev_1_id, [])
+    with patch(
+        "custom_components.smartbox.model.create_smartbox_device",
+        autospec=True,
+        return_value=mock_dev_1,
+    ) as create_smartbox_device_mock:
+        devices = await get_devices(
+            hass,
+            account[CONF_API_NAME],
+            mock_smartbox.config[DOMAIN][CONF_BASIC_AUTH_CREDS],
+            account[CONF_USERNAME],
+            account[CONF_PASSWORD],
+            [dev_1_id],
+            SmartboxSettings.from_config(account),
+            None,
+        )
+        # the unconfigured device is never initialised
+        assert create_smartbox_device_mock.await_count == 1
+        assert create_smartbox_device_mock.await_args.args[1] == dev_1_id
+    assert devices == [mock_dev_1]
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.WARNING,
+        f"Found device {dev_2_id} which was not configured - ignoring",
+    )
+
+
+async def test_get_devices_slow_and_failing_devices(hass, mock_smartbox, caplog):
+    account = mock_smartbox.config[DOMAIN][CONF_ACCOUNTS][0]
+    dev_1_id = "test_device_id_1"
+    dev_2_id = "test_device_id_2"
+    ok_device = MagicMock()
+    device_init_timeout = 0.05
+
+    async def _create_smartbox_device(hass, dev_id, *args):
+        if dev_id == dev_1_id:
+            return ok_device
+        await asyncio.sleep(device_init_timeout * 10)
+
+    with patch(
+        "custom_components.smartbox.model.create_smartbox_device",
+        autospec=True,
+        side_effect=_create_smartbox_device,
+    ):
+        devices = await get_devices(
+            hass,
+            account[CONF_API_NAME],
+            mock_smartbox.config[DOMAIN][CONF_BASIC_AUTH_CREDS],
+            account[CONF_USERNAME],
+            account[CONF_PASSWORD],
+            account[CONF_DEVICE_IDS],
+            replace(
+                SmartboxSettings.from_config(account),
+                device_init_timeout=device_init_timeout,
+            ),
+            None,
+        )
+    # the slow device doesn't stop the other one coming up
+    assert devices == [ok_device]
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.ERROR,
+        f"Timed out initialising device {dev_2_id} after {device_init_timeout}s",
+    )
+
+    with patch(
+        "custom_components.smartbox.model.create_smartbox_device",
+        autospec=True,
+        side_effect=[ok_device, RuntimeError("device offline")],
+    ):
+        devices = await get_devices(
+            hass,
+            account[CONF_API_NAME],
+            mock_smartbox.config[DOMAIN][CONF_BASIC_AUTH_CREDS],
+            account[CONF_USERNAME],
+            account[CONF_PASSWORD],
+            account[CONF_DEVICE_IDS],
+            SmartboxSettings.from_config(account),
+            None,
+        )
+    assert devices == [ok_device]
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.ERROR,
+        f"Error initialising device {dev_2_id}",
+    )
+
+
 async def test_smartbox_device_init(hass, mock_smartbox):
     mock_device = mock_smartbox.get_devices()[0]
     dev_id = mock_device["dev_id"]
@@ -150,7 +238,17 @@ async def test_smartbox_device_init(hass, mock_smartbox):
         side_effect=[node_sentinel_1, node_sentinel_2],
         autospec=True,
     ) as smartbox_node_ctor_mock:
-        device = SmartboxDevice(dev_id, "Device 1", mock_smartbox.session, 7, 0.2)
+        device = SmartboxDevice(
+            dev_id,
+            "Device 1",
+            mock_smartbox.session,
+            replace(
+                TEST_SETTINGS,
+                socket_reconnect_attempts=7,
+                socket_backoff_factor=0.2,
+                node_fetch_concurrency=3,
+            ),
+        )
         assert device.dev_id == dev_id
         await device.initialise_nodes(hass)
         mock_smartbox.session.get_nodes.assert_called_with(dev_id)
@@ -180,6 +278,54 @@ async def test_smartbox_device_init(hass, mock_smartbox):
         assert mock_smartbox.get_socket(dev_id) is not None
 
 
+@pytest.mark.parametrize("node_fetch_concurrency", [1, 2])
+async def test_smartbox_device_init_concurrency(hass, node_fetch_concurrency):
+    dev_id = "test_device_id_1"
+    node_infos = [
+        {"addr": addr, "name": f"Node {addr}", "type": HEATER_NODE_TYPE_HTR}
+        for addr in range(6)
+    ]
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def _tracked_request(dev_id, node_info):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return {"addr": node_info["addr"]}
+
+    mock_session = MagicMock()
+    mock_session.get_nodes.return_value = node_infos
+    mock_session.get_status.side_effect = _tracked_request
+    mock_session.get_setup.side_effect = _tracked_request
+    with patch(
+        "custom_components.smartbox.model.UpdateManager",
+        autospec=True,
+    ):
+        device = SmartboxDevice(
+            dev_id,
+            "Device 1",
+            mock_session,
+            replace(TEST_SETTINGS, node_fetch_concurrency=node_fetch_concurrency),
+        )
+        await device.initialise_nodes(hass)
+
+    assert max_in_flight <= node_fetch_concurrency
+    assert mock_session.get_status.call_count == len(node_infos)
+    assert mock_session.get_setup.call_count == len(node_infos)
+    # nodes are matched up with their own status and setup
+    nodes = list(device.get_nodes())
+    assert [node.addr for node in nodes] == [info["addr"] for info in node_infos]
+    for node in nodes:
+        assert node.status == {"addr": node.addr}
+        assert node.setup == {"addr": node.addr}
+
+
 async def test_smartbox_device_dev_data_updates(hass):
     """Independently test device data updates usually done by UpdateManager"""
     dev_id = "test_device_id_1"
@@ -191,15 +337,21 @@ async def test_smartbox_device_dev_data_updates(hass):
         "custom_components.smartbox.model.SmartboxDevice.initialise_nodes",
         new_callable=NonCallableMock,
     ):
-        device = SmartboxDevice(dev_id, "Device 1", mock_session, 5, 0.3)
+        device = SmartboxDevice(dev_id, "Device 1", mock_session, TEST_SETTINGS)
         device._nodes = {
             (HEATER_NODE_TYPE_HTR, 1): mock_node_1,
             (HEATER_NODE_TYPE_ACM, 2): mock_node_2,
         }
 
+        away_callback = MagicMock()
+        power_limit_callback = MagicMock()
+        device.subscribe(INTEREST_AWAY, away_callback)
+        device.subscribe(INTEREST_POWER_LIMIT, power_limit_callback)
+
         mock_dev_data = {"away": True}
         device._away_status_update(mock_dev_data)
         assert device.away
+        away_callback.assert_called_once_with()
 
         mock_dev_data = {"away": False}
         device._away_status_update(mock_dev_data)
@@ -207,6 +359,11 @@ async def test_smartbox_device_dev_data_updates(hass):
 
         device._power_limit_update(1045)
         assert device.power_limit == 1045
+        power_limit_callback.assert_called_once_with()
+        assert away_callback.call_count == 2
+
+        with pytest.raises(ValueError):
+            device.subscribe(INTEREST_STATUS, MagicMock())
 
 
 async def test_smartbox_device_node_status_update(hass, caplog):
@@ -220,7 +377,7 @@ async def test_smartbox_device_node_status_update(hass, caplog):
         "custom_components.smartbox.model.SmartboxDevice.initialise_nodes",
         new_callable=NonCallableMock,
     ):
-        device = SmartboxDevice(dev_id, "Device 1", mock_session, 2, 0.1)
+        device = SmartboxDevice(dev_id, "Device 1", mock_session, TEST_SETTINGS)
         device._nodes = {
             (HEATER_NODE_TYPE_HTR, 1): mock_node_1,
             (HEATER_NODE_TYPE_ACM, 2): mock_node_2,
@@ -228,13 +385,13 @@ async def test_smartbox_device_node_status_update(hass, caplog):
 
         mock_status = {"foo": "bar"}
         device._node_status_update(HEATER_NODE_TYPE_HTR, 1, mock_status)
-        mock_node_1.update_status.assert_called_with(mock_status)
+        mock_node_1.update_status.assert_called_with(mock_status, notify=True)
         mock_node_2.update_status.assert_not_called()
 
         mock_node_1.reset_mock()
         mock_node_2.reset_mock()
         device._node_status_update(HEATER_NODE_TYPE_ACM, 2, mock_status)
-        mock_node_2.update_status.assert_called_with(mock_status)
+        mock_node_2.update_status.assert_called_with(mock_status, notify=True)
         mock_node_1.update_status.assert_not_called()
 
         # test unknown node
@@ -262,7 +419,7 @@ async def test_smartbox_device_node_setup_update(hass, caplog):
         "custom_components.smartbox.model.SmartboxDevice.initialise_nodes",
         new_callable=NonCallableMock,
     ):
-        device = SmartboxDevice(dev_id, "Device 1", mock_session, 2, 0.1)
+        device = SmartboxDevice(dev_id, "Device 1", mock_session, TEST_SETTINGS)
         device._nodes = {
             (HEATER_NODE_TYPE_HTR, 1): mock_node_1,
             (HEATER_NODE_TYPE_ACM, 2): mock_node_2,
@@ -270,13 +427,13 @@ async def test_smartbox_device_node_setup_update(hass, caplog):
 
         mock_setup = {"foo": "bar"}
         device._node_setup_update(HEATER_NODE_TYPE_HTR, 1, mock_setup)
-        mock_node_1.update_setup.assert_called_with(mock_setup)
+        mock_node_1.update_setup.assert_called_with(mock_setup, notify=True)
         mock_node_2.update_setup.assert_not_called()
 
         mock_node_1.reset_mock()
         mock_node_2.reset_mock()
         device._node_setup_update(HEATER_NODE_TYPE_ACM, 2, mock_setup)
-        mock_node_2.update_setup.assert_called_with(mock_setup)
+        mock_node_2.update_setup.assert_called_with(mock_setup, notify=True)
         mock_node_1.update_setup.assert_not_called()
 
         # test unknown node
@@ -293,11 +450,70 @@ async def test_smartbox_device_node_setup_update(hass, caplog):
         )
 
 
+async def test_smartbox_device_coalesced_node_updates(hass):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    update_coalesce_window = 0.05
+    device = SmartboxDevice(
+        dev_id,
+        "Device 1",
+        mock_session,
+        replace(TEST_SETTINGS, update_coalesce_window=update_coalesce_window),
+    )
+    node = SmartboxNode(
+        device,
+        {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR},
+        mock_session,
+        {"mtemp": "20.0", "stemp": "21.0"},
+        {"window_mode_enabled": False},
+    )
+    device._nodes = {(HEATER_NODE_TYPE_HTR, 1): node}
+    status_callback = MagicMock()
+    mtemp_callback = MagicMock()
+    setup_callback = MagicMock()
+    node.subscribe(INTEREST_STATUS, status_callback)
+    node.subscribe(INTEREST_STATUS, mtemp_callback, ["mtemp"])
+    node.subscribe(INTEREST_SETUP, setup_callback)
+
+    # a burst of updates
+    device._node_status_update(
+        HEATER_NODE_TYPE_HTR, 1, {"mtemp": "20.5", "stemp": "21.0"}
+    )
+    device._node_status_update(
+        HEATER_NODE_TYPE_HTR, 1, {"mtemp": "21.0", "stemp": "21.0"}
+    )
+    device._node_setup_update(HEATER_NODE_TYPE_HTR, 1, {"window_mode_enabled": True})
+    device._node_status_update(
+        HEATER_NODE_TYPE_HTR, 1, {"mtemp": "21.0", "stemp": "22.0"}
+    )
+    # node state is updated straight away, but subscribers aren't notified yet
+    assert node.status == {"mtemp": "21.0", "stemp": "22.0"}
+    assert node.window_mode
+    status_callback.assert_not_called()
+    setup_callback.assert_not_called()
+
+    await asyncio.sleep(update_coalesce_window * 2)
+    status_callback.assert_called_once_with()
+    mtemp_callback.assert_called_once_with()
+    setup_callback.assert_called_once_with()
+
+    # unchanged updates don't notify at all
+    device._node_status_update(
+        HEATER_NODE_TYPE_HTR, 1, {"mtemp": "21.0", "stemp": "22.0"}
+    )
+    await asyncio.sleep(update_coalesce_window * 2)
+    assert status_callback.call_count == 1
+
+
 async def test_smartbox_node(hass):
     dev_id = "test_device_id_1"
     mock_device = MagicMock()
     mock_device.dev_id = dev_id
     mock_device.away = False
+    mock_device.pending_write_timeout = 0
+    mock_device.async_run_command = AsyncMock(
+        side_effect=lambda hass, priority, key, func, *args: func(*args)
+    )
     node_addr = 3
     node_type = HEATER_NODE_TYPE_HTR
     node_name = "Bathroom Heater"
@@ -313,39 +529,460 @@ async def test_smartbox_node(hass):
     assert node.name == node_name
     assert node.node_type == node_type
     assert node.addr == node_addr
+    # nodes are slotted, with their ID computed once
+    assert not hasattr(node, "__dict__")
+    assert node.node_id is node.node_id
 
     assert node.status == initial_status
+    assert node.status_version == 0
+    assert node.snapshot.mtemp == 21.4
     new_status = {"mtemp": "21.6", "stemp": "22.5"}
-    node.update_status(new_status)
+    assert node.update_status(new_status) == frozenset(["mtemp"])
     assert node.status == new_status
-
-    node.set_status(stemp=23.5)
+    assert node.status_version == 1
+    assert node.snapshot.mtemp == 21.6
+    assert node.snapshot.target_temp == 22.5
+    assert node.status_changed_at["mtemp"] >= node.status_changed_at["stemp"]
+
+    # status is replaced rather than mutated
+    old_status = node.status
+    with pytest.raises(TypeError):
+        old_status["stemp"] = "23.0"
+    # partial updates are merged
+    assert node.update_status({"stemp": "22.0"}) == frozenset(["stemp"])
+    assert node.status == {"mtemp": "21.6", "stemp": "22.0"}
+    assert node.status is not old_status
+    assert old_status == new_status
+    # unchanged updates keep the same status object
+    unchanged_status = node.status
+    node.update_status({"mtemp": "21.6"})
+    assert node.status is unchanged_status
+    assert node.status_version == 2
+    # unchanged updates don't bump the version
+    assert node.update_status({"stemp": "22.0"}) == frozenset()
+    assert node.status_version == 2
+
+    await node.async_send_status(hass, stemp=23.5)
     mock_session.set_status.assert_called_with(dev_id, node_info, {"stemp": 23.5})
+    assert node.status == {"mtemp": "21.6", "stemp": 23.5}
+    assert node.status_version == 3
+    assert node.snapshot.target_temp == 23.5
 
     assert not node.away
     mock_device.away = True
     assert node.away
 
-    status_update = await node.async_update(hass)
-    assert status_update == node.status
-
     # setup fields
     assert not node.window_mode
     node.update_setup({"window_mode_enabled": True})
     assert node.window_mode
+    assert node.setup_version == 1
+    # partial setup updates don't drop other fields
     node.update_setup({})
-    with pytest.raises(KeyError):
-        node.window_mode
+    assert node.window_mode
+    assert node.setup_version == 1
 
-    node.update_setup(initial_setup)
     assert not node.true_radiant
     node.update_setup({"true_radiant_enabled": True})
     assert node.true_radiant
-    node.update_setup({})
+    assert node.window_mode
+    assert node.setup_version == 2
+
+    # capabilities are refreshed when factory options change
+    assert SWITCH_WINDOW_MODE not in node.capabilities.switches
+    capabilities = node.capabilities
+    node.update_setup({"window_mode_enabled": False})
+    assert node.capabilities is capabilities
+    node.update_setup({"factory_options": {"window_mode_available": True}})
+    assert SWITCH_WINDOW_MODE in node.capabilities.switches
+    assert SWITCH_TRUE_RADIANT not in node.capabilities.switches
+
+    node = SmartboxNode(mock_device, node_info, mock_session, initial_status, {})
+    with pytest.raises(KeyError):
+        node.window_mode
     with pytest.raises(KeyError):
         node.true_radiant
 
 
+async def test_smartbox_node_async_set_status(hass, caplog):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    device = SmartboxDevice(dev_id, "Device 1", mock_session, TEST_SETTINGS)
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    node = SmartboxNode(
+        device, node_info, mock_session, {"mtemp": "20.0", "stemp": "21.0"}, {}
+    )
+    status_callback = MagicMock()
+    node.subscribe(INTEREST_STATUS, status_callback)
+
+    # status is updated optimistically, and the command sent in the background
+    await node.async_set_status(hass, stemp="22.0")
+    assert node.status["stemp"] == "22.0"
+    status_callback.assert_called_once_with()
+    await hass.async_block_till_done()
+    mock_session.set_status.assert_called_once_with(
+        dev_id, node_info, {"stemp": "22.0"}
+    )
+
+    # on failure, the actual status replaces the optimistic one
+    mock_session.set_status.side_effect = Exception("Test error")
+    mock_session.get_status.return_value = {"mtemp": "20.0", "stemp": "22.0"}
+    await node.async_set_status(hass, stemp="23.0")
+    assert node.status["stemp"] == "23.0"
+    await hass.async_block_till_done()
+    assert node.status["stemp"] == "22.0"
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.ERROR,
+        "Error setting status for node Bathroom Heater",
+    )
+
+    # away status is also updated optimistically
+    away_callback = MagicMock()
+    device.subscribe(INTEREST_AWAY, away_callback)
+    await node.async_update_device_away_status(hass, True)
+    assert node.away
+    away_callback.assert_called_once_with()
+    await hass.async_block_till_done()
+    mock_session.set_device_away_status.assert_called_once_with(dev_id, {"away": True})
+
+    # as are power limit and setup
+    await device.async_set_power_limit(hass, 1000)
+    assert device.power_limit == 1000
+    await node.async_set_window_mode(hass, True)
+    assert node.window_mode
+    await hass.async_block_till_done()
+    mock_session.set_device_power_limit.assert_called_once_with(dev_id, 1000)
+    mock_session.set_setup.assert_called_once_with(
+        dev_id, node_info, {"window_mode_enabled": True}
+    )
+
+    # setup is reverted if setting it fails
+    mock_session.set_setup.side_effect = Exception("Test error")
+    await node.async_set_window_mode(hass, False)
+    assert not node.window_mode
+    await hass.async_block_till_done()
+    assert node.window_mode
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.ERROR,
+        "Error setting setup for node Bathroom Heater",
+    )
+
+    # all commands went through the device's command queue
+    metrics = device.command_queue.metrics
+    assert metrics.completed == 5
+    assert metrics.failed == 2
+    assert metrics.depth == 0
+
+
+async def test_smartbox_node_async_set_status_debounced(hass):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    command_debounce = 0.05
+    device = SmartboxDevice(
+        dev_id,
+        "Device 1",
+        mock_session,
+        replace(TEST_SETTINGS, command_debounce=command_debounce),
+    )
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    node = SmartboxNode(
+        device, node_info, mock_session, {"mtemp": "20.0", "stemp": "21.0"}, {}
+    )
+
+    # a burst of commands is sent as one, with the latest args winning
+    await node.async_set_status(hass, stemp="21.5", units="C")
+    await node.async_set_status(hass, mode="manual")
+    await node.async_set_status(hass, stemp="22.5", units="C")
+    assert node.status["stemp"] == "22.5"
+    await hass.async_block_till_done()
+    mock_session.set_status.assert_not_called()
+
+    await asyncio.sleep(command_debounce * 2)
+    await hass.async_block_till_done()
+    mock_session.set_status.assert_called_once_with(
+        dev_id, node_info, {"stemp": "22.5", "units": "C", "mode": "manual"}
+    )
+
+    # later commands start a new burst
+    await node.async_set_status(hass, stemp="23.0", units="C")
+    await asyncio.sleep(command_debounce * 2)
+    await hass.async_block_till_done()
+    assert mock_session.set_status.call_count == 2
+    mock_session.set_status.assert_called_with(
+        dev_id, node_info, {"stemp": "23.0", "units": "C"}
+    )
+
+
+async def test_smartbox_node_setup_batching(hass):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    command_debounce = 0.05
+    device = SmartboxDevice(
+        dev_id,
+        "Device 1",
+        mock_session,
+        replace(TEST_SETTINGS, command_debounce=command_debounce),
+    )
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    node = SmartboxNode(
+        device,
+        node_info,
+        mock_session,
+        {},
+        {"true_radiant_enabled": False, "window_mode_enabled": False},
+    )
+    device._nodes = {(HEATER_NODE_TYPE_HTR, 1): node}
+
+    # setup writes within the window are sent together
+    await node.async_set_window_mode(hass, True)
+    await node.async_set_true_radiant(hass, True)
+    await node.async_set_window_mode(hass, False)
+    assert not node.window_mode
+    assert node.true_radiant
+    await hass.async_block_till_done()
+    mock_session.set_setup.assert_not_called()
+
+    await asyncio.sleep(command_debounce * 2)
+    await hass.async_block_till_done()
+    mock_session.set_setup.assert_called_once_with(
+        dev_id,
+        node_info,
+        {"window_mode_enabled": False, "true_radiant_enabled": True},
+    )
+    assert node.setup_calls_saved == 2
+    assert device.setup_calls_saved == 2
+
+    # a failed batch restores the setup from before it
+    mock_session.set_setup.side_effect = Exception("Test error")
+    await node.async_set_window_mode(hass, True)
+    await node.async_set_true_radiant(hass, False)
+    await asyncio.sleep(command_debounce * 2)
+    await hass.async_block_till_done()
+    assert not node.window_mode
+    assert node.true_radiant
+    assert device.setup_calls_saved == 3
+
+
+async def test_smartbox_node_pending_writes(hass, caplog):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    pending_write_timeout = 0.05
+    device = SmartboxDevice(
+        dev_id,
+        "Device 1",
+        mock_session,
+        replace(TEST_SETTINGS, pending_write_timeout=pending_write_timeout),
+    )
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    node = SmartboxNode(
+        device, node_info, mock_session, {"mtemp": "20.0", "stemp": "21.0"}, {}
+    )
+    status_callback = MagicMock()
+    node.subscribe(INTEREST_STATUS, status_callback)
+
+    await node.async_set_status(hass, stemp="22.0")
+    await hass.async_block_till_done()
+    assert node.pending_writes == 1
+    assert status_callback.call_count == 1
+
+    # updates from before the write took effect don't revert it
+    assert node.update_status({"mtemp": "20.5", "stemp": "21.0"}) == frozenset(
+        ["mtemp"]
+    )
+    assert node.status["stemp"] == "22.0"
+    assert node.pending_writes == 1
+    # the echo confirms the write without another state change
+    assert node.update_status({"mtemp": "20.5", "stemp": "22.0"}) == frozenset()
+    assert node.pending_writes == 0
+    assert status_callback.call_count == 2
+    # once confirmed, updates apply as normal
+    assert node.update_status({"stemp": "21.5"}) == frozenset(["stemp"])
+
+    # unconfirmed writes are rolled back to the last reported value
+    await node.async_set_status(hass, stemp="23.0")
+    await hass.async_block_till_done()
+    node.update_status({"stemp": "22.5"})
+    assert node.status["stemp"] == "23.0"
+    await asyncio.sleep(pending_write_timeout * 2)
+    assert node.status["stemp"] == "22.5"
+    assert node.pending_writes == 0
+    assert_log_message(
+        caplog,
+        "custom_components.smartbox.model",
+        logging.WARNING,
+        "Status for node Bathroom Heater was not confirmed within "
+        f"{pending_write_timeout}s; reverting {{'stemp': '22.5'}}",
+    )
+
+    # failed writes are rolled back straight away
+    mock_session.set_status.side_effect = Exception("Test error")
+    mock_session.get_status.side_effect = Exception("Test error")
+    await node.async_set_status(hass, stemp="24.0", units="C")
+    assert node.status["stemp"] == "24.0"
+    await hass.async_block_till_done()
+    assert node.status["stemp"] == "22.5"
+    assert node.pending_writes == 0
+
+
+async def test_smartbox_node_pending_write_timeout_starts_when_sent(hass, caplog):
+    dev_id = "test_device_id_1"
+    mock_session = MagicMock()
+    pending_write_timeout = 0.05
+    device = SmartboxDevice(
+        dev_id,
+        "Device 1",
+        mock_session,
+        replace(TEST_SETTINGS, pending_write_timeout=pending_write_timeout),
+    )
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    node = SmartboxNode(device, node_info, mock_session, {"stemp": "21.0"}, {})
+
+    # fill the device's command queue with slow commands for other nodes
+    release = threading.Event()
+    blockers = [
+        hass.async_create_task(
+            device.async_run_command(
+                hass, COMMAND_PRIORITY_NODE, ("htr", addr), release.wait, 5
+            )
+        )
+        for addr in range(2, 2 + MAX_CONCURRENT_DEVICE_COMMANDS)
+    ]
+    await asyncio.sleep(0)
+
+    # the write isn't reverted while its command waits in the queue
+    await node.async_set_status(hass, stemp="22.0")
+    await asyncio.sleep(pending_write_timeout * 3)
+    assert node.status["stemp"] == "22.0"
+    assert node.pending_writes == 1
+    assert "was not confirmed within" not in caplog.text
+    mock_session.set_status.assert_not_called()
+
+    # but is once it's been sent and not confirmed within the timeout
+    release.set()
+    await asyncio.gather(*blockers)
+    await hass.async_block_till_done()
+    mock_session.set_status.assert_called_once_with(
+        dev_id, node_info, {"stemp": "22.0"}
+    )
+    assert node.status["stemp"] == "22.0"
+    await asyncio.sleep(pending_write_timeout * 2)
+    assert node.status["stemp"] == "21.0"
+    assert node.pending_writes == 0
+    assert "was not confirmed within" in caplog.text
+
+
+def test_smartbox_node_climate_state():
+    mock_device = MagicMock()
+    mock_device.dev_id = "test_device_id_1"
+    mock_device.away = False
+    node_info = {"addr": 1, "name": "Heater", "type": HEATER_NODE_TYPE_HTR_MOD}
+    status = {
+        "mode": "manual",
+        "on": True,
+        "selected_temp": "comfort",
+        "comfort_temp": "22",
+        "eco_offset": "2",
+        "active": True,
+    }
+    node = SmartboxNode(mock_device, node_info, MagicMock(), status, {})
+
+    climate_state = node.climate_state
+    assert climate_state.hvac_mode == HVAC_MODE_HEAT
+    assert climate_state.hvac_action == HVACAction.HEATING
+    assert climate_state.preset_mode == PRESET_COMFORT
+    assert climate_state.target_temperature == 22.0
+    # cached until the status or away status changes
+    assert node.climate_state is climate_state
+    node.update_status({"mode": "manual"})
+    assert node.climate_state is climate_state
+
+    node.update_status({"selected_temp": "eco"})
+    climate_state = node.climate_state
+    assert climate_state.preset_mode == PRESET_ECO
+    assert climate_state.target_temperature == 20.0
+
+    mock_device.away = True
+    assert node.climate_state is not climate_state
+    assert node.climate_state.preset_mode == PRESET_AWAY
+
+
+async def test_smartbox_node_subscribe(hass):
+    mock_device = MagicMock()
+    mock_device.dev_id = "test_device_id_1"
+    mock_device.command_debounce = 0
+    mock_device.pending_write_timeout = 0
+    mock_device.async_run_command = AsyncMock(
+        side_effect=lambda hass, priority, key, func, *args: func(*args)
+    )
+    node_info = {"addr": 1, "name": "Bathroom Heater", "type": HEATER_NODE_TYPE_HTR}
+    mock_session = MagicMock()
+    node = SmartboxNode(
+        mock_device,
+        node_info,
+        mock_session,
+        {"mtemp": "21.4", "stemp": "22.5"},
+        {"true_radiant_enabled": False, "window_mode_enabled": False},
+    )
+
+    status_callback_1 = MagicMock()
+    status_callback_2 = MagicMock()
+    setup_callback = MagicMock()
+    unsubscribe_status_1 = node.subscribe(INTEREST_STATUS, status_callback_1)
+    node.subscribe(INTEREST_STATUS, status_callback_2)
+    node.subscribe(INTEREST_SETUP, setup_callback)
+
+    node.update_status({"mtemp": "21.6", "stemp": "22.5"})
+    assert status_callback_1.call_count == 1
+    assert status_callback_2.call_count == 1
+    assert setup_callback.call_count == 0
+    await node.async_send_status(hass, stemp="23.5")
+    assert status_callback_1.call_count == 2
+
+    node.update_setup({"true_radiant_enabled": True, "window_mode_enabled": False})
+    assert setup_callback.call_count == 1
+    await node.async_set_window_mode(hass, True)
+    assert setup_callback.call_count == 2
+    await node.async_set_true_radiant(hass, False)
+    assert setup_callback.call_count == 3
+    await hass.async_block_till_done()
+    assert status_callback_1.call_count == 2
+
+    unsubscribe_status_1()
+    node.update_status({"mtemp": "21.8", "stemp": "23.5"})
+    assert status_callback_1.call_count == 2
+    assert status_callback_2.call_count == 3
+
+    # unchanged updates aren't notified
+    node.update_status({"mtemp": "21.8", "stemp": "23.5"})
+    assert status_callback_2.call_count == 3
+
+    # keyed subscribers are only notified when their keys change
+    mtemp_callback = MagicMock()
+    node.subscribe(INTEREST_STATUS, mtemp_callback, ["mtemp"])
+    node.update_status({"mtemp": "21.8", "stemp": "24.5"})
+    assert status_callback_2.call_count == 4
+    assert mtemp_callback.call_count == 0
+    node.update_status({"mtemp": "22.0", "stemp": "24.5"})
+    assert mtemp_callback.call_count == 1
+    # partial updates which don't include mtemp don't notify
+    node.update_status({"stemp": "24.5"})
+    assert mtemp_callback.call_count == 1
+
+    # away subscriptions are delegated to the device
+    away_callback = MagicMock()
+    assert node.subscribe(INTEREST_AWAY, away_callback) == (
+        mock_device.subscribe.return_value
+    )
+    mock_device.subscribe.assert_called_once_with(INTEREST_AWAY, away_callback)
+
+    with pytest.raises(ValueError):
+        node.subscribe(INTEREST_POWER_LIMIT, MagicMock())
+
+
 def test_is_heater_node():
     dev_id = "test_device_id_1"
     addr = 1
@@ -365,14 +1002,13 @@ def test_is_supported_node():
 
 
 def test_get_target_temperature():
-    assert get_target_temperature(HEATER_NODE_TYPE_HTR, {"stemp": "22.5"}) == 22.5
-    assert get_target_temperature(HEATER_NODE_TYPE_ACM, {"stemp": "12.6"}) == 12.6
+    assert HTR_STRATEGY.target_temperature({"stemp": "22.5"}) == 22.5
+    assert ACM_STRATEGY.target_temperature({"stemp": "12.6"}) == 12.6
     with pytest.raises(KeyError):
-        get_target_temperature(HEATER_NODE_TYPE_HTR, {"xxx": "22.5"})
+        HTR_STRATEGY.target_temperature({"xxx": "22.5"})
 
     assert (
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "comfort",
                 "comfort_temp": "17.2",
@@ -381,8 +1017,7 @@ def test_get_target_temperature():
         == 17.2
     )
     assert (
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "eco",
                 "comfort_temp": "17.2",
@@ -392,8 +1027,7 @@ def test_get_target_temperature():
         == 13.2
     )
     assert (
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "ice",
                 "ice_temp": "7",
@@ -403,16 +1037,14 @@ def test_get_target_temperature():
     )
 
     with pytest.raises(KeyError) as exc_info:
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "comfort",
             },
         )
     assert "comfort_temp" in exc_info.exconly()
     with pytest.raises(KeyError) as exc_info:
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "eco",
                 "comfort_temp": "17.2",
@@ -420,16 +1052,14 @@ def test_get_target_temperature():
         )
     assert "eco_offset" in exc_info.exconly()
     with pytest.raises(KeyError) as exc_info:
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "ice",
             },
         )
     assert "ice_temp" in exc_info.exconly()
     with pytest.raises(KeyError) as exc_info:
-        get_target_temperature(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.target_temperature(
             {
                 "selected_temp": "blah",
             },
@@ -438,20 +1068,19 @@ def test_get_target_temperature():
 
 
 def test_set_temperature_args():
-    assert set_temperature_args(HEATER_NODE_TYPE_HTR, {"units": "C"}, 21.7) == {
+    assert HTR_STRATEGY.set_temperature_args({"units": "C"}, 21.7) == {
         "stemp": "21.7",
         "units": "C",
     }
-    assert set_temperature_args(HEATER_NODE_TYPE_ACM, {"units": "F"}, 78) == {
+    assert ACM_STRATEGY.set_temperature_args({"units": "F"}, 78) == {
         "stemp": "78",
         "units": "F",
     }
     with pytest.raises(KeyError) as exc_info:
-        set_temperature_args(HEATER_NODE_TYPE_HTR, {}, 24.7)
+        HTR_STRATEGY.set_temperature_args({}, 24.7)
     assert "units" in exc_info.exconly()
 
-    assert set_temperature_args(
-        HEATER_NODE_TYPE_HTR_MOD,
+    assert HTR_MOD_STRATEGY.set_temperature_args(
         {
             "mode": "auto",
             "selected_temp": "comfort",
@@ -468,8 +1097,7 @@ def test_set_temperature_args():
         "eco_offset": "4",
         "units": "C",
     }
-    assert set_temperature_args(
-        HEATER_NODE_TYPE_HTR_MOD,
+    assert HTR_MOD_STRATEGY.set_temperature_args(
         {
             "mode": "auto",
             "selected_temp": "eco",
@@ -487,8 +1115,7 @@ def test_set_temperature_args():
         "units": "C",
     }
     with pytest.raises(ValueError) as exc_info:
-        set_temperature_args(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.set_temperature_args(
             {
                 "mode": "auto",
                 "selected_temp": "ice",
@@ -500,8 +1127,7 @@ def test_set_temperature_args():
     assert "ice mode" in exc_info.exconly()
 
     with pytest.raises(KeyError) as exc_info:
-        set_temperature_args(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.set_temperature_args(
             {
                 "mode": "auto",
                 "selected_temp": "eco",
@@ -512,8 +1138,7 @@ def test_set_temperature_args():
         )
     assert "eco_offset" in exc_info.exconly()
     with pytest.raises(KeyError) as exc_info:
-        set_temperature_args(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.set_temperature_args(
             {
                 "mode": "auto",
                 "selected_temp": "blah",
@@ -526,82 +1151,55 @@ def test_set_temperature_args():
 
 
 def test_get_hvac_mode():
-    assert get_hvac_mode(HEATER_NODE_TYPE_HTR, {"mode": "off"}) == HVAC_MODE_OFF
-    assert get_hvac_mode(HEATER_NODE_TYPE_ACM, {"mode": "auto"}) == HVAC_MODE_AUTO
-    assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR, {"mode": "modified_auto"}) == HVAC_MODE_AUTO
-    )
-    assert get_hvac_mode(HEATER_NODE_TYPE_ACM, {"mode": "manual"}) == HVAC_MODE_HEAT
+    assert HTR_STRATEGY.hvac_mode({"mode": "off"}) == HVAC_MODE_OFF
+    assert ACM_STRATEGY.hvac_mode({"mode": "auto"}) == HVAC_MODE_AUTO
+    assert HTR_STRATEGY.hvac_mode({"mode": "modified_auto"}) == HVAC_MODE_AUTO
+    assert ACM_STRATEGY.hvac_mode({"mode": "manual"}) == HVAC_MODE_HEAT
     with pytest.raises(ValueError):
-        get_hvac_mode(HEATER_NODE_TYPE_HTR, {"mode": "blah"})
-    assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": True, "mode": "auto"})
-        == HVAC_MODE_AUTO
-    )
+        HTR_STRATEGY.hvac_mode({"mode": "blah"})
+    assert HTR_MOD_STRATEGY.hvac_mode({"on": True, "mode": "auto"}) == HVAC_MODE_AUTO
     assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": True, "mode": "self_learn"})
-        == HVAC_MODE_AUTO
+        HTR_MOD_STRATEGY.hvac_mode({"on": True, "mode": "self_learn"}) == HVAC_MODE_AUTO
     )
     assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": True, "mode": "presence"})
-        == HVAC_MODE_AUTO
+        HTR_MOD_STRATEGY.hvac_mode({"on": True, "mode": "presence"}) == HVAC_MODE_AUTO
     )
+    assert HTR_MOD_STRATEGY.hvac_mode({"on": True, "mode": "manual"}) == HVAC_MODE_HEAT
+    assert HTR_MOD_STRATEGY.hvac_mode({"on": False, "mode": "auto"}) == HVAC_MODE_OFF
     assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": True, "mode": "manual"})
-        == HVAC_MODE_HEAT
+        HTR_MOD_STRATEGY.hvac_mode({"on": False, "mode": "self_learn"}) == HVAC_MODE_OFF
     )
     assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": False, "mode": "auto"})
-        == HVAC_MODE_OFF
-    )
-    assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": False, "mode": "self_learn"})
-        == HVAC_MODE_OFF
-    )
-    assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": False, "mode": "presence"})
-        == HVAC_MODE_OFF
-    )
-    assert (
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": False, "mode": "manual"})
-        == HVAC_MODE_OFF
+        HTR_MOD_STRATEGY.hvac_mode({"on": False, "mode": "presence"}) == HVAC_MODE_OFF
     )
+    assert HTR_MOD_STRATEGY.hvac_mode({"on": False, "mode": "manual"}) == HVAC_MODE_OFF
     with pytest.raises(ValueError):
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"on": True, "mode": "blah"})
+        HTR_MOD_STRATEGY.hvac_mode({"on": True, "mode": "blah"})
     with pytest.raises(KeyError) as exc_info:
-        get_hvac_mode(HEATER_NODE_TYPE_HTR_MOD, {"mode": "manual"})
+        HTR_MOD_STRATEGY.hvac_mode({"mode": "manual"})
     assert "on" in exc_info.exconly()
 
 
 def test_set_hvac_mode_args():
-    assert set_hvac_mode_args(HEATER_NODE_TYPE_HTR, {}, HVAC_MODE_OFF) == {
-        "mode": "off"
-    }
-    assert set_hvac_mode_args(HEATER_NODE_TYPE_ACM, {}, HVAC_MODE_AUTO) == {
-        "mode": "auto"
-    }
-    assert set_hvac_mode_args(HEATER_NODE_TYPE_HTR, {}, HVAC_MODE_HEAT) == {
-        "mode": "manual"
-    }
+    assert HTR_STRATEGY.set_hvac_mode_args({}, HVAC_MODE_OFF) == {"mode": "off"}
+    assert ACM_STRATEGY.set_hvac_mode_args({}, HVAC_MODE_AUTO) == {"mode": "auto"}
+    assert HTR_STRATEGY.set_hvac_mode_args({}, HVAC_MODE_HEAT) == {"mode": "manual"}
     with pytest.raises(ValueError):
-        set_hvac_mode_args(HEATER_NODE_TYPE_HTR, {}, "blah")
-    assert set_hvac_mode_args(
-        HEATER_NODE_TYPE_HTR_MOD,
+        HTR_STRATEGY.set_hvac_mode_args({}, "blah")
+    assert HTR_MOD_STRATEGY.set_hvac_mode_args(
         {},
         HVAC_MODE_OFF,
     ) == {
         "on": False,
     }
-    assert set_hvac_mode_args(
-        HEATER_NODE_TYPE_HTR_MOD,
+    assert HTR_MOD_STRATEGY.set_hvac_mode_args(
         {},
         HVAC_MODE_AUTO,
     ) == {
         "on": True,
         "mode": "auto",
     }
-    assert set_hvac_mode_args(
-        HEATER_NODE_TYPE_HTR_MOD,
+    assert HTR_MOD_STRATEGY.set_hvac_mode_args(
         {
             "selected_temp": "comfort",
         },
@@ -612,14 +1210,12 @@ def test_set_hvac_mode_args():
         "selected_temp": "comfort",
     }
     with pytest.raises(ValueError):
-        set_hvac_mode_args(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.set_hvac_mode_args(
             {},
             "blah",
         )
     with pytest.raises(KeyError) as exc_info:
-        set_hvac_mode_args(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.set_hvac_mode_args(
             {},
             HVAC_MODE_HEAT,
         )
@@ -627,70 +1223,62 @@ def test_set_hvac_mode_args():
 
 
 def test_get_preset_mode():
-    assert get_preset_mode(HEATER_NODE_TYPE_HTR, {}, away=True) == PRESET_AWAY
-    assert get_preset_mode(HEATER_NODE_TYPE_ACM, {}, away=True) == PRESET_AWAY
-    assert get_preset_mode(HEATER_NODE_TYPE_HTR_MOD, {}, away=True) == PRESET_AWAY
-    assert get_preset_mode(HEATER_NODE_TYPE_HTR, {}, away=False) == PRESET_HOME
-    assert get_preset_mode(HEATER_NODE_TYPE_ACM, {}, away=False) == PRESET_HOME
+    assert HTR_STRATEGY.preset_mode({}, away=True) == PRESET_AWAY
+    assert ACM_STRATEGY.preset_mode({}, away=True) == PRESET_AWAY
+    assert HTR_MOD_STRATEGY.preset_mode({}, away=True) == PRESET_AWAY
+    assert HTR_STRATEGY.preset_mode({}, away=False) == PRESET_HOME
+    assert ACM_STRATEGY.preset_mode({}, away=False) == PRESET_HOME
 
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "manual", "selected_temp": "comfort"},
             away=False,
         )
         == PRESET_COMFORT
     )
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "manual", "selected_temp": "eco"},
             away=False,
         )
         == PRESET_ECO
     )
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "manual", "selected_temp": "ice"},
             away=False,
         )
         == PRESET_FROST
     )
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "auto", "selected_temp": "comfort"},
             away=False,
         )
         == PRESET_SCHEDULE
     )
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "presence", "selected_temp": "comfort"},
             away=False,
         )
         == PRESET_ACTIVITY
     )
     assert (
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "self_learn", "selected_temp": "comfort"},
             away=False,
         )
         == PRESET_SELF_LEARN
     )
     with pytest.raises(ValueError) as exc_info:
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "blah", "selected_temp": "comfort"},
             away=False,
         )
     assert "Unknown smartbox node mode" in exc_info.exconly()
     with pytest.raises(ValueError) as exc_info:
-        get_preset_mode(
-            HEATER_NODE_TYPE_HTR_MOD,
+        HTR_MOD_STRATEGY.preset_mode(
             {"mode": "manual", "selected_temp": "blah"},
             away=False,
         )
@@ -698,9 +1286,9 @@ def test_get_preset_mode():
 
 
 def test_get_preset_modes():
-    assert get_preset_modes(HEATER_NODE_TYPE_HTR) == [PRESET_AWAY, PRESET_HOME]
-    assert get_preset_modes(HEATER_NODE_TYPE_ACM) == [PRESET_AWAY, PRESET_HOME]
-    assert get_preset_modes(HEATER_NODE_TYPE_HTR_MOD) == [
+    assert HTR_STRATEGY.preset_modes() == [PRESET_AWAY, PRESET_HOME]
+    assert ACM_STRATEGY.preset_modes() == [PRESET_AWAY, PRESET_HOME]
+    assert HTR_MOD_STRATEGY.preset_modes() == [
         PRESET_ACTIVITY,
         PRESET_AWAY,
         PRESET_COMFORT,
@@ -712,48 +1300,111 @@ def test_get_preset_modes():
 
 
 def test_set_preset_mode_status_update():
-    assert set_preset_mode_status_update(
-        HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_SCHEDULE
-    ) == {"on": True, "mode": "auto"}
-    assert set_preset_mode_status_update(
-        HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_SELF_LEARN
-    ) == {"on": True, "mode": "self_learn"}
-    assert set_preset_mode_status_update(
-        HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_ACTIVITY
-    ) == {"on": True, "mode": "presence"}
-    assert set_preset_mode_status_update(
-        HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_COMFORT
-    ) == {"on": True, "mode": "manual", "selected_temp": "comfort"}
-    assert set_preset_mode_status_update(HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_ECO) == {
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_SCHEDULE) == {
+        "on": True,
+        "mode": "auto",
+    }
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_SELF_LEARN) == {
+        "on": True,
+        "mode": "self_learn",
+    }
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_ACTIVITY) == {
+        "on": True,
+        "mode": "presence",
+    }
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_COMFORT) == {
+        "on": True,
+        "mode": "manual",
+        "selected_temp": "comfort",
+    }
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_ECO) == {
         "on": True,
         "mode": "manual",
         "selected_temp": "eco",
     }
-    assert set_preset_mode_status_update(
-        HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_FROST
-    ) == {"on": True, "mode": "manual", "selected_temp": "ice"}
+    assert HTR_MOD_STRATEGY.set_preset_mode_status_update({}, PRESET_FROST) == {
+        "on": True,
+        "mode": "manual",
+        "selected_temp": "ice",
+    }
 
     with pytest.raises(ValueError):
-        set_preset_mode_status_update(HEATER_NODE_TYPE_HTR, {}, PRESET_SCHEDULE)
+        HTR_STRATEGY.set_preset_mode_status_update({}, PRESET_SCHEDULE)
     with pytest.raises(ValueError):
-        set_preset_mode_status_update(HEATER_NODE_TYPE_ACM, {}, PRESET_ACTIVITY)
+        ACM_STRATEGY.set_preset_mode_status_update({}, PRESET_ACTIVITY)
 
     with pytest.raises(ValueError):
-        set_preset_mode_status_update(HEATER_NODE_TYPE_HTR_MOD, {}, "fake_preset")
-    with pytest.raises(AssertionError):
-        set_preset_mode_status_update(HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_HOME)
-    with pytest.raises(AssertionError):
-        set_preset_mode_status_update(HEATER_NODE_TYPE_HTR_MOD, {}, PRESET_AWAY)
-
-
-def test_status_to_hvac_action():
-    assert is_heating(HEATER_NODE_TYPE_HTR, {"active": True})
-    assert not is_heating(HEATER_NODE_TYPE_HTR, {"active": False})
-    assert is_heating(HEATER_NODE_TYPE_ACM, {"charging": True})
-    assert not is_heating(HEATER_NODE_TYPE_ACM, {"charging": False})
-    assert is_heating(HEATER_NODE_TYPE_HTR_MOD, {"active": True})
-    assert not is_heating(HEATER_NODE_TYPE_HTR_MOD, {"active": False})
+        HTR_MOD_STRATEGY.set_preset_mode_status_update({}, "fake_preset")
+
+    # home and away are set via the device's away status
+    for strategy in (HTR_STRATEGY, ACM_STRATEGY, HTR_MOD_STRATEGY):
+        assert strategy.set_preset_mode_status_update({}, PRESET_HOME) == {}
+        assert strategy.set_preset_mode_status_update({}, PRESET_AWAY) == {}
+
+
+def test_decode_status():
+    snapshot = HTR_STRATEGY.decode_status(
+        {
+            "sync_status": "ok",
+            "locked": False,
+            "units": "C",
+            "mtemp": "19.5",
+            "stemp": "20",
+            "mode": "auto",
+            "active": True,
+            "power": "854",
+            "duty": 18,
+        },
+    )
+    assert snapshot.available
+    assert snapshot.locked is False
+    assert snapshot.units == TemperatureUnit.CELSIUS
+    assert snapshot.units.ha_unit == TEMP_CELSIUS
+    assert snapshot.mtemp == 19.5
+    assert snapshot.target_temp == 20.0
+    assert snapshot.mode == "auto"
+    assert snapshot.heating
+    assert snapshot.power == 854.0
+    assert snapshot.duty == 18
+    assert snapshot.charge_level is None
+
+    snapshot = HTR_MOD_STRATEGY.decode_status(
+        {
+            "sync_status": "ok",
+            "units": "F",
+            "selected_temp": "eco",
+            "comfort_temp": "70",
+            "eco_offset": "4",
+            "active": False,
+        },
+    )
+    assert snapshot.units.ha_unit == TEMP_FAHRENHEIT
+    assert snapshot.target_temp == 66.0
+    assert not snapshot.heating
+
+    snapshot = ACM_STRATEGY.decode_status({"charging": True, "charge_level": "2.5"})
+    assert snapshot.heating
+    assert snapshot.charge_level == 2.5
+
+    # missing or invalid values decode as None
+    snapshot = HTR_STRATEGY.decode_status(
+        {"sync_status": "lost", "units": "K", "mtemp": "bad"},
+    )
+    assert not snapshot.available
+    assert snapshot.units is None
+    assert snapshot.mtemp is None
+    assert snapshot.target_temp is None
+    assert snapshot.heating is None
+
+
+def test_is_heating():
+    assert HTR_STRATEGY.is_heating({"active": True})
+    assert not HTR_STRATEGY.is_heating({"active": False})
+    assert ACM_STRATEGY.is_heating({"charging": True})
+    assert not ACM_STRATEGY.is_heating({"charging": False})
+    assert HTR_MOD_STRATEGY.is_heating({"active": True})
+    assert not HTR_MOD_STRATEGY.is_heating({"active": False})
     with pytest.raises(KeyError):
-        is_heating(HEATER_NODE_TYPE_HTR, {})
+        HTR_STRATEGY.is_heating({})
     with pytest.raises(KeyError):
-        is_heating(HEATER_NODE_TYPE_ACM, {"active": True})
+        ACM_STRATEGY.is_heating({"active": True})
@@ -0,0 +1,45 @@
+from custom_components.smartbox.const import (
+    HEATER_NODE_TYPE_ACM,
+    HEATER_NODE_TYPE_HTR,
+    HEATER_NODE_TYPE_HTR_MOD,
+    SENSOR_CHARGE_LEVEL,
+    SENSOR_DUTY_CYCLE,
+    SENSOR_POWER,
+    SENSOR_TEMPERATURE,
+    SWITCH_WINDOW_MODE,
+)
+from custom_components.smartbox.node_index import NodeIndex
+
+from mocks import mock_node
+
+
+def test_node_index():
+    dev_id = "test_device_id_1"
+    htr_node = mock_node(dev_id, 1, HEATER_NODE_TYPE_HTR)
+    htr_mod_node = mock_node(dev_id, 2, HEATER_NODE_TYPE_HTR_MOD)
+    acm_node = mock_node(dev_id, 3, HEATER_NODE_TYPE_ACM)
+    acm_node.capabilities = acm_node.strategy.capabilities(
+        {"factory_options": {"window_mode_available": True}}
+    )
+    unsupported_node = mock_node(dev_id, 4, "test_unsupported_node")
+
+    node_index = NodeIndex()
+    assert len(node_index) == 0
+    assert node_index.with_sensor(SENSOR_TEMPERATURE) == []
+
+    node_index.extend([htr_node, htr_mod_node, acm_node, unsupported_node])
+    assert len(node_index) == 4
+    assert node_index.nodes == [htr_node, htr_mod_node, acm_node, unsupported_node]
+    assert node_index.heaters == [htr_node, htr_mod_node, acm_node]
+    assert node_index.of_type(HEATER_NODE_TYPE_HTR_MOD) == [htr_mod_node]
+    assert node_index.of_type("test_unsupported_node") == [unsupported_node]
+    assert node_index.of_type("pmo") == []
+    assert node_index.with_sensor(SENSOR_TEMPERATURE) == [
+        htr_node,
+        htr_mod_node,
+        acm_node,
+    ]
+    assert node_index.with_sensor(SENSOR_POWER) == [htr_node, acm_node]
+    assert node_index.with_sensor(SENSOR_DUTY_CYCLE) == [htr_node]
+    assert node_index.with_sensor(SENSOR_CHARGE_LEVEL) == [acm_node]
+    assert node_index.with_switch(SWITCH_WINDOW_MODE) == [acm_node]
@@ -0,0 +1,106 @@
+from unittest.mock import MagicMock
+
+from homeassistant.components.climate.const import (
+    ClimateEntityFeature,
+    HVACMode,
+    PRESET_AWAY,
+    PRESET_HOME,
+)
+
+from custom_components.smartbox.const import (
+    HEATER_NODE_TYPE_ACM,
+    HEATER_NODE_TYPE_HTR,
+    HEATER_NODE_TYPE_HTR_MOD,
+    SENSOR_CHARGE_LEVEL,
+    SENSOR_DUTY_CYCLE,
+    SENSOR_ENERGY,
+    SENSOR_POWER,
+    SENSOR_TEMPERATURE,
+    SWITCH_TRUE_RADIANT,
+    SWITCH_WINDOW_MODE,
+)
+from custom_components.smartbox.model import SmartboxNode
+from custom_components.smartbox.node_types import (
+    _STRATEGIES,
+    AcmStrategy,
+    get_node_type_strategy,
+    HtrModStrategy,
+    HtrStrategy,
+    NodeTypeStrategy,
+    register_node_type,
+)
+
+
+def test_get_node_type_strategy():
+    assert isinstance(get_node_type_strategy(HEATER_NODE_TYPE_ACM), AcmStrategy)
+    assert isinstance(get_node_type_strategy(HEATER_NODE_TYPE_HTR_MOD), HtrModStrategy)
+    htr_strategy = get_node_type_strategy(HEATER_NODE_TYPE_HTR)
+    assert isinstance(htr_strategy, HtrStrategy)
+    assert htr_strategy is get_node_type_strategy(HEATER_NODE_TYPE_HTR)
+
+    # unregistered node types get the default behaviour
+    strategy = get_node_type_strategy("pmo")
+    assert type(strategy) is NodeTypeStrategy
+    assert strategy.node_type == "pmo"
+    assert strategy.preset_modes() == [PRESET_AWAY, PRESET_HOME]
+
+
+def test_capabilities():
+    capabilities = get_node_type_strategy(HEATER_NODE_TYPE_HTR).capabilities({})
+    assert capabilities.heater
+    assert capabilities.hvac_modes == (HVACMode.HEAT, HVACMode.AUTO, HVACMode.OFF)
+    assert capabilities.preset_modes == (PRESET_AWAY, PRESET_HOME)
+    assert capabilities.climate_features == (
+        ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
+    )
+    assert capabilities.sensors == frozenset(
+        [SENSOR_DUTY_CYCLE, SENSOR_ENERGY, SENSOR_POWER, SENSOR_TEMPERATURE]
+    )
+    assert capabilities.switches == frozenset()
+
+    capabilities = get_node_type_strategy(HEATER_NODE_TYPE_ACM).capabilities(
+        {"factory_options": {"window_mode_available": True}}
+    )
+    assert capabilities.sensors == frozenset(
+        [SENSOR_CHARGE_LEVEL, SENSOR_POWER, SENSOR_TEMPERATURE]
+    )
+    assert capabilities.switches == frozenset([SWITCH_WINDOW_MODE])
+
+    capabilities = get_node_type_strategy(HEATER_NODE_TYPE_HTR_MOD).capabilities(
+        {
+            "factory_options": {
+                "true_radiant_available": True,
+                "window_mode_available": False,
+            }
+        }
+    )
+    assert len(capabilities.preset_modes) == 7
+    assert capabilities.sensors == frozenset([SENSOR_TEMPERATURE])
+    assert capabilities.switches == frozenset([SWITCH_TRUE_RADIANT])
+
+    capabilities = get_node_type_strategy("pmo").capabilities({})
+    assert not capabilities.heater
+    assert capabilities.hvac_modes == ()
+    assert capabilities.sensors == frozenset()
+
+
+def test_register_node_type():
+    class ThmStrategy(NodeTypeStrategy):
+        heating_key = "heating"
+
+    strategy = ThmStrategy("thm")
+    register_node_type(strategy)
+    try:
+        assert get_node_type_strategy("thm") is strategy
+
+        mock_device = MagicMock()
+        mock_device.dev_id = "test_device_id_1"
+        node_info = {"addr": 1, "name": "Thermostat", "type": "thm"}
+        node = SmartboxNode(
+            mock_device, node_info, MagicMock(), {"heating": True, "stemp": "20"}, {}
+        )
+        assert node.strategy is strategy
+        assert node.snapshot.heating
+        assert node.snapshot.target_temp == 20.0
+    finally:
+        del _STRATEGIES["thm"]
@@ -42,13 +42,13 @@ async def test_power_limit(hass, mock_smartbox):
     )
 
     entity_id = get_power_limit_number_entity_id(mock_device_1)
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "1000"
 
     mock_device_2 = mock_smartbox.session.get_devices()[1]
     entity_id = get_power_limit_number_entity_id(mock_device_2)
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "0"
 
@@ -60,7 +60,7 @@ async def test_power_limit(hass, mock_smartbox):
         {ATTR_ENTITY_ID: entity_id, ATTR_VALUE: 0},
         blocking=True,
     )
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "0"
 
@@ -72,6 +72,6 @@ async def test_power_limit(hass, mock_smartbox):
         {ATTR_ENTITY_ID: entity_id, ATTR_VALUE: 500},
         blocking=True,
     )
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "500"
@@ -3,7 +3,10 @@ import logging
 from pytest import approx
 
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.components.switch import SERVICE_TURN_ON
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_LOCKED,
     STATE_UNAVAILABLE,
@@ -12,6 +15,8 @@ from homeassistant.setup import async_setup_component
 
 from mocks import (
     active_or_charging_update,
+    get_away_status_switch_entity_id,
+    get_device_unique_id,
     get_entity_id_from_unique_id,
     get_object_id,
     get_sensor_entity_id,
@@ -76,7 +81,7 @@ async def test_basic_temp(hass, mock_smartbox):
                 {"mtemp": str(float(mock_node_status["mtemp"]) + 1)},
             )
 
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             new_state = hass.states.get(entity_id)
             assert new_state.state != state.state
             _check_temp_state(hass, mock_node_status, new_state)
@@ -85,14 +90,14 @@ async def test_basic_temp(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state != STATE_UNAVAILABLE
 
@@ -126,7 +131,7 @@ async def test_basic_power(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], True),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             mock_node_status = mock_smartbox.session.get_status(
                 mock_device["dev_id"], mock_node
@@ -140,7 +145,7 @@ async def test_basic_power(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], False),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             mock_node_status = mock_smartbox.session.get_status(
                 mock_device["dev_id"], mock_node
@@ -151,14 +156,14 @@ async def test_basic_power(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state != STATE_UNAVAILABLE
 
@@ -198,7 +203,7 @@ async def test_basic_duty_cycle(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], True),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.attributes[ATTR_LOCKED] == mock_node_status["locked"]
             assert float(state.state) == approx(float(mock_node_status["duty"]))
@@ -209,7 +214,7 @@ async def test_basic_duty_cycle(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], False),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert float(state.state) == 0
 
@@ -217,14 +222,14 @@ async def test_basic_duty_cycle(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state != STATE_UNAVAILABLE
 
@@ -263,7 +268,7 @@ async def test_basic_energy(hass, mock_smartbox):
                     mock_node,
                     active_or_charging_update(mock_node["type"], True),
                 )
-                await hass.helpers.entity_component.async_update_entity(entity_id)
+                await hass.async_block_till_done()
                 state = hass.states.get(entity_id)
                 assert state.attributes[ATTR_LOCKED] == mock_node_status["locked"]
                 assert float(state.state) == approx(
@@ -281,7 +286,7 @@ async def test_basic_energy(hass, mock_smartbox):
                     mock_node,
                     active_or_charging_update(mock_node["type"], False),
                 )
-                await hass.helpers.entity_component.async_update_entity(entity_id)
+                await hass.async_block_till_done()
                 state = hass.states.get(entity_id)
                 assert float(state.state) == 0
 
@@ -289,14 +294,14 @@ async def test_basic_energy(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state != STATE_UNAVAILABLE
 
@@ -359,7 +364,7 @@ async def test_basic_charge_level(hass, mock_smartbox):
                 mock_node,
                 active_or_charging_update(mock_node["type"], True),
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             mock_node_status = mock_smartbox.session.get_status(
                 mock_device["dev_id"], mock_node
@@ -371,7 +376,7 @@ async def test_basic_charge_level(hass, mock_smartbox):
             mock_smartbox.generate_socket_status_update(
                 mock_device, mock_node, {"charge_level": 5}
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             mock_node_status = mock_smartbox.session.get_status(
                 mock_device["dev_id"], mock_node
@@ -382,13 +387,75 @@ async def test_basic_charge_level(hass, mock_smartbox):
             mock_node_status = mock_smartbox.generate_socket_node_unavailable(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == STATE_UNAVAILABLE
 
             mock_node_status = mock_smartbox.generate_new_socket_status(
                 mock_device, mock_node
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state != STATE_UNAVAILABLE
+
+
+async def test_unrelated_status_change(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+
+    for mock_device in mock_smartbox.session.get_devices():
+        for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"]):
+            entity_id = get_sensor_entity_id(mock_node, "temperature")
+            with patch(
+                "custom_components.smartbox.sensor.TemperatureSensor.async_update",
+                autospec=True,
+            ) as async_update_mock:
+                # a resend of the same status doesn't update the sensor
+                mock_smartbox.generate_socket_status_update(mock_device, mock_node, {})
+                await hass.async_block_till_done()
+                async_update_mock.assert_not_called()
+
+                # nor does a change to a field it doesn't depend on
+                mock_smartbox.generate_socket_status_update(
+                    mock_device, mock_node, {"power": "1234"}
+                )
+                await hass.async_block_till_done()
+                async_update_mock.assert_not_called()
+
+                mock_smartbox.generate_socket_status_update(
+                    mock_device, mock_node, {"mtemp": "25.5"}
+                )
+                await hass.async_block_till_done()
+                async_update_mock.assert_called_once()
+            # check the entity is still there
+            assert hass.states.get(entity_id) is not None
+
+
+async def test_command_queue(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+
+    mock_device = mock_smartbox.session.get_devices()[0]
+    entity_id = get_entity_id_from_unique_id(
+        hass, SENSOR_DOMAIN, get_device_unique_id(mock_device, "command_queue")
+    )
+    state = hass.states.get(entity_id)
+    assert state.name == f"{mock_device['name']} Command Queue"
+    assert state.state == "0"
+    assert state.attributes["completed"] == 0
+    assert state.attributes["failed"] == 0
+    assert state.attributes["setup_calls_saved"] == 0
+
+    await hass.services.async_call(
+        SWITCH_DOMAIN,
+        SERVICE_TURN_ON,
+        {ATTR_ENTITY_ID: get_away_status_switch_entity_id(mock_device)},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    # metrics are polled rather than pushed
+    await hass.helpers.entity_component.async_update_entity(entity_id)
+    state = hass.states.get(entity_id)
+    assert state.state == "0"
+    assert state.attributes["completed"] == 1
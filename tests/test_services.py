@@ -0,0 +1,215 @@
+from homeassistant.components.climate import HVACMode
+import pytest
+import voluptuous as vol
+from homeassistant.components.climate.const import (
+    ATTR_HVAC_MODE,
+    ATTR_PRESET_MODE,
+    PRESET_AWAY,
+    PRESET_ECO,
+)
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    ENTITY_MATCH_ALL,
+)
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.smartbox.const import (
+    ATTR_DEVICE_IDS,
+    DOMAIN,
+    EVENT_BULK_SET_RESULT,
+    HEATER_NODE_TYPE_HTR_MOD,
+    SERVICE_BULK_SET,
+)
+
+from mocks import get_away_status_switch_entity_id, get_climate_entity_id
+
+
+async def test_bulk_set_device_temperature(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    mock_device = mock_smartbox.session.get_devices()[0]
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_DEVICE_IDS: [mock_device["dev_id"]], ATTR_TEMPERATURE: 18.5},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    mock_nodes = mock_smartbox.session.get_nodes(mock_device["dev_id"])
+    assert events[0].data["succeeded"] == len(mock_nodes)
+    assert events[0].data["failed"] == 0
+    assert sorted(result["addr"] for result in events[0].data["results"]) == sorted(
+        mock_node["addr"] for mock_node in mock_nodes
+    )
+    for mock_node in mock_nodes:
+        status = mock_smartbox.session.get_status(mock_device["dev_id"], mock_node)
+        assert status["stemp"] == "18.5"
+
+
+async def test_bulk_set_all_hvac_mode(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_ENTITY_ID: ENTITY_MATCH_ALL, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["failed"] == 0
+    num_nodes = 0
+    for mock_device in mock_smartbox.session.get_devices():
+        for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"]):
+            num_nodes += 1
+            state = hass.states.get(get_climate_entity_id(mock_node))
+            assert state.state == HVACMode.OFF
+    assert events[0].data["succeeded"] == num_nodes
+
+
+async def test_bulk_set_entities(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    mock_device = mock_smartbox.session.get_devices()[1]
+    mock_nodes = [
+        mock_node
+        for mock_node in mock_smartbox.session.get_nodes(mock_device["dev_id"])
+        if mock_node["type"] == HEATER_NODE_TYPE_HTR_MOD
+    ][:2]
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {
+            ATTR_ENTITY_ID: [get_climate_entity_id(node) for node in mock_nodes],
+            ATTR_PRESET_MODE: PRESET_ECO,
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["succeeded"] == len(mock_nodes)
+    for mock_node in mock_nodes:
+        state = hass.states.get(get_climate_entity_id(mock_node))
+        assert state.attributes[ATTR_PRESET_MODE] == PRESET_ECO
+
+
+async def test_bulk_set_failures(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_ENTITY_ID: ENTITY_MATCH_ALL, ATTR_TEMPERATURE: 20},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    # htr_mod nodes in ice mode can't have their temperature set, but this
+    # doesn't stop the other nodes being set
+    assert len(events) == 1
+    results = events[0].data["results"]
+    failed = [result for result in results if not result["success"]]
+    assert failed
+    assert events[0].data["failed"] == len(failed)
+    assert events[0].data["succeeded"] == len(results) - len(failed)
+    for result in failed:
+        assert "ice mode" in result["error"]
+
+
+async def test_bulk_set_unsupported_preset_keeps_away(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    # Device 1 only has htr and acm nodes, which don't support eco
+    mock_device = mock_smartbox.session.get_devices()[0]
+    mock_smartbox.dev_data_update(mock_device, {"away_status": {"away": True}})
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_DEVICE_IDS: [mock_device["dev_id"]], ATTR_PRESET_MODE: PRESET_ECO},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["succeeded"] == 0
+    assert events[0].data["failed"] == len(
+        mock_smartbox.session.get_nodes(mock_device["dev_id"])
+    )
+    mock_smartbox.session.set_device_away_status.assert_not_called()
+    state = hass.states.get(get_away_status_switch_entity_id(mock_device))
+    assert state.state == "on"
+
+
+async def test_bulk_set_away_failure(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+    mock_smartbox.session.set_device_away_status.side_effect = Exception(
+        "Test away error"
+    )
+
+    mock_device = mock_smartbox.session.get_devices()[1]
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_DEVICE_IDS: [mock_device["dev_id"]], ATTR_PRESET_MODE: PRESET_AWAY},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    results = events[0].data["results"]
+    assert len(results) == len(mock_smartbox.session.get_nodes(mock_device["dev_id"]))
+    assert events[0].data["succeeded"] == 0
+    for result in results:
+        assert not result["success"]
+        assert result["error"] == "Test away error"
+    # the optimistic away status is reverted
+    state = hass.states.get(get_away_status_switch_entity_id(mock_device))
+    assert state.state == "off"
+
+
+async def test_bulk_set_no_heaters_selected(hass, mock_smartbox):
+    assert await async_setup_component(hass, "smartbox", mock_smartbox.config)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_BULK_SET_RESULT)
+
+    # Smartbox entities have no Home Assistant device to target
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_SET,
+            {ATTR_DEVICE_ID: "test_ha_device_id", ATTR_TEMPERATURE: 20},
+            blocking=True,
+        )
+
+    with pytest.raises(ValueError) as exc_info:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_SET,
+            {ATTR_AREA_ID: "test_empty_area", ATTR_TEMPERATURE: 20},
+            blocking=True,
+        )
+    assert "No Smartbox heaters selected" in exc_info.exconly()
+    await hass.async_block_till_done()
+    assert not events
@@ -47,13 +47,13 @@ async def test_away_status(hass, mock_smartbox):
     mock_smartbox.dev_data_update(mock_device_1, {"away_status": {"away": True}})
 
     entity_id = get_away_status_switch_entity_id(mock_device_1)
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "on"
 
     mock_device_2 = mock_smartbox.session.get_devices()[1]
     entity_id = get_away_status_switch_entity_id(mock_device_2)
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "off"
 
@@ -65,7 +65,7 @@ async def test_away_status(hass, mock_smartbox):
         {ATTR_ENTITY_ID: entity_id},
         blocking=True,
     )
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "off"
 
@@ -77,7 +77,7 @@ async def test_away_status(hass, mock_smartbox):
         {ATTR_ENTITY_ID: entity_id},
         blocking=True,
     )
-    await hass.helpers.entity_component.async_update_entity(entity_id)
+    await hass.async_block_till_done()
     state = hass.states.get(entity_id)
     assert state.state == "on"
 
@@ -131,7 +131,7 @@ async def test_basic_window_mode(hass, mock_smartbox, caplog):
             mock_smartbox.generate_socket_setup_update(
                 mock_device, mock_node, {"window_mode_enabled": True}
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "on"
 
@@ -139,7 +139,7 @@ async def test_basic_window_mode(hass, mock_smartbox, caplog):
             mock_smartbox.generate_socket_setup_update(
                 mock_device, mock_node, {"window_mode_enabled": False}
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "off"
 
@@ -150,7 +150,7 @@ async def test_basic_window_mode(hass, mock_smartbox, caplog):
                 {ATTR_ENTITY_ID: entity_id},
                 blocking=True,
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "on"
 
@@ -161,7 +161,7 @@ async def test_basic_window_mode(hass, mock_smartbox, caplog):
                 {ATTR_ENTITY_ID: entity_id},
                 blocking=True,
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "off"
 
@@ -218,7 +218,7 @@ async def test_basic_true_radiant(hass, mock_smartbox, caplog):
             mock_smartbox.generate_socket_setup_update(
                 mock_device, mock_node, {"true_radiant_enabled": True}
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "on"
 
@@ -226,7 +226,7 @@ async def test_basic_true_radiant(hass, mock_smartbox, caplog):
             mock_smartbox.generate_socket_setup_update(
                 mock_device, mock_node, {"true_radiant_enabled": False}
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "off"
 
@@ -237,7 +237,7 @@ async def test_basic_true_radiant(hass, mock_smartbox, caplog):
                 {ATTR_ENTITY_ID: entity_id},
                 blocking=True,
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "on"
 
@@ -248,6 +248,6 @@ async def test_basic_true_radiant(hass, mock_smartbox, caplog):
                 {ATTR_ENTITY_ID: entity_id},
                 blocking=True,
             )
-            await hass.helpers.entity_component.async_update_entity(entity_id)
+            await hass.async_block_till_done()
             state = hass.states.get(entity_id)
             assert state.state == "off"